@@ -0,0 +1,11 @@
+"""Benchmarks of the hcc package.
+
+The benchmarks are not part of the test suite. Run them as modules from the repository root,
+for example `python -m benchmarks.log_overhead`. The throughput benchmark sends real requests to
+a local stand-in server, and writes its results as JSON:
+```
+python -m benchmarks.throughput --output before.json
+python -m benchmarks.throughput --output after.json
+python -m benchmarks.compare before.json after.json
+```
+"""
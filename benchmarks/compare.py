@@ -0,0 +1,76 @@
+"""Comparison of two result files of `benchmarks.throughput`.
+
+For every scenario of both files, the throughput, the latency percentiles, the CPU time per
+request and the number of attempts per request of the current run are printed next to the ones
+of the baseline run, with their relative change. A change beyond the threshold is flagged as a
+regression or an improvement, taking into account whether a metric is better higher or lower.
+
+Usage:
+    python -m benchmarks.compare BASELINE CURRENT [--threshold PERCENT]
+"""
+
+from typing import Any, Dict, Optional
+import argparse
+import json
+
+# The compared metrics, their path in the results of a scenario, and whether higher is better.
+METRICS = {
+    "req/s": (("req_per_s",), True),
+    "p50 ms": (("latency_ms", "p50"), False),
+    "p99 ms": (("latency_ms", "p99"), False),
+    "p999 ms": (("latency_ms", "p999"), False),
+    "cpu us/req": (("cpu_us_per_request",), False),
+    "attempts/req": (("attempts_per_request",), False),
+}
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def value(results: Dict[str, Any], path: tuple[str, ...]) -> Optional[float]:
+    """Return the value of a metric in the results of a scenario, if it is there."""
+    current: Any = results
+    for key in path:
+        if not isinstance(current, dict) or key not in current:
+            return None
+        current = current[key]
+    return current
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> None:
+    print(f"baseline: {baseline.get('commit')} ({baseline.get('timestamp')})")
+    print(f"current:  {current.get('commit')} ({current.get('timestamp')})")
+    for name, results in current["scenarios"].items():
+        baseline_results = baseline["scenarios"].get(name)
+        if baseline_results is None:
+            print(f"\n{name}: not in the baseline")
+            continue
+        print(f"\n{name}")
+        for label, (path, higher_is_better) in METRICS.items():
+            old, new = value(baseline_results, path), value(results, path)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            verdict = ""
+            if abs(change) > threshold:
+                verdict = (
+                    "improved" if (change > 0) == higher_is_better else "REGRESSED"
+                )
+            print(f"  {label:<13} {old:12.3f} {new:12.3f} {change:+8.1f}%  {verdict}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=5.0)
+    arguments = parser.parse_args()
+    compare(load(arguments.baseline), load(arguments.current), arguments.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark of the per-request logging overhead of Channel.
+
+The session of the channel is replaced by a stub returning a canned response, so only the
+client side work is measured: the retry loop and the request logging. The overhead of each
+logging mode is the difference from the run with logging disabled.
+
+Usage:
+    python -m benchmarks.log_overhead [--requests N] [--body-items N]
+"""
+
+from typing import Any, Callable, Optional
+import argparse
+import io
+import logging
+import time
+import requests
+
+from hcc import BodyLogMode, Channel, LogPolicy
+
+
+class StubSession(requests.Session):
+    """A session which answers every request with the same response."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.response = requests.Response()
+        self.response.status_code = 200
+
+    def request(self, *_: Any, **__: Any) -> requests.Response:  # type: ignore[override]
+        return self.response
+
+
+def measure(send: Callable[[], Any], count: int) -> float:
+    """Return the mean duration of a call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(count):
+        send()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def run(count: int, body_items: int) -> None:
+    body = {f"key{i}": "x" * 32 for i in range(body_items)}
+    headers = {"Authorization": "Bearer secret"}
+    logger = logging.getLogger("hcc")
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    cases: list[tuple[str, Optional[int], LogPolicy]] = [
+        ("disabled", None, LogPolicy()),
+        ("INFO, full bodies", logging.INFO, LogPolicy()),
+        ("INFO, body previews", logging.INFO, LogPolicy(body_mode=BodyLogMode.PREVIEW)),
+        ("INFO, body digests", logging.INFO, LogPolicy(body_mode=BodyLogMode.DIGEST)),
+    ]
+    baseline = 0.0
+    print(f"{count} POST requests with a {body_items} item JSON body")
+    for name, level, policy in cases:
+        channel = Channel(url="http://stub", log_policy=policy, session=StubSession())
+        if level is None:
+            logger.setLevel(logging.WARNING)
+        else:
+            logger.setLevel(level)
+            logger.addHandler(handler)
+        try:
+            mean = measure(lambda: channel.post(json=body, headers=headers), count)
+        finally:
+            logger.removeHandler(handler)
+            stream.seek(0)
+            stream.truncate()
+        if level is None:
+            baseline = mean
+            print(f"{name:<22} {mean:10.2f} us/request")
+        else:
+            print(f"{name:<22} {mean:10.2f} us/request ({mean - baseline:+.2f} us)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--body-items", type=int, default=200)
+    arguments = parser.parse_args()
+    run(arguments.requests, arguments.body_items)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""A local HTTP stand-in server for the benchmarks.
+
+The server runs in a child process, so its CPU time and memory are not counted as the ones of
+the client under measurement. Every request is answered after a configurable latency, with a
+503 status at a configurable error rate, and with a body of a configurable size. The
+connections are kept alive, like the ones of a real service.
+
+Usage:
+    python -m benchmarks.server [--port N] [--latency SECONDS] [--error-rate RATE]
+                                [--body-size BYTES]
+"""
+
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Optional
+import argparse
+import multiprocessing
+import multiprocessing.sharedctypes
+import random
+import time
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """The behaviour of the stand-in server.
+
+    Attributes:
+        latency: The number of seconds before every response is sent (default is 0.0).
+        jitter: The maximum random number of seconds added to the latency (default is 0.0).
+        error_rate: The share of the requests answered with a 503 status (default is 0.0).
+        body_size: The number of bytes of the body of the successful responses (default is 256).
+        seed: The seed of the random errors and jitter (default is 0).
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    body_size: int = 256
+    seed: int = 0
+
+    def to_json(self) -> dict[str, Any]:
+        """Return the configuration as JSON serializable data."""
+        return asdict(self)
+
+
+def make_handler(
+    config: ServerConfig, served: "multiprocessing.sharedctypes.Synchronized[int]"
+) -> type[BaseHTTPRequestHandler]:
+    """Return the request handler class of a server configuration."""
+    body = b'{"data": "' + b"x" * max(0, config.body_size - 12) + b'"}'
+    error_body = b'{"error": "unavailable"}'
+    rng = random.Random(config.seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # The headers and the body are written separately, which Nagle's algorithm would
+        # delay until the client acknowledges the headers.
+        disable_nagle_algorithm = True
+
+        def _respond(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            with served.get_lock():
+                served.value += 1
+            delay = config.latency + rng.uniform(0.0, config.jitter)
+            if delay > 0:
+                time.sleep(delay)
+            failed = rng.random() < config.error_rate
+            payload = error_body if failed else body
+            self.send_response(503 if failed else 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+        def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=W0622
+            pass
+
+    return Handler
+
+
+def serve(
+    config: ServerConfig,
+    port: int,
+    served: "multiprocessing.sharedctypes.Synchronized[int]",
+    ready: Any,
+) -> None:
+    """Serve the requests until the process is terminated."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(config, served))
+    server.daemon_threads = True
+    ready.send(server.server_address[1])
+    server.serve_forever()
+
+
+class StandInServer:
+    """The StandInServer class runs the stand-in server in a child process.
+
+    The StandInServer class takes the following parameters:
+        config: The behaviour of the server (default is ServerConfig()).
+        port: The port to listen on (default is 0, which means a free port).
+    """
+
+    def __init__(self, config: Optional[ServerConfig] = None, port: int = 0):
+        self.config = config or ServerConfig()
+        self.port = port
+        self._served = multiprocessing.Value("q", 0)
+        self._process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """The base URL of the server."""
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def served(self) -> int:
+        """The number of the requests served so far, including the failed attempts."""
+        return self._served.value
+
+    def start(self) -> None:
+        """Start the server, and wait until it listens."""
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=serve,
+            args=(self.config, self.port, self._served, sender),
+            daemon=True,
+        )
+        self._process.start()
+        self.port = receiver.recv()
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--body-size", type=int, default=256)
+    arguments = parser.parse_args()
+    config = ServerConfig(
+        latency=arguments.latency,
+        jitter=arguments.jitter,
+        error_rate=arguments.error_rate,
+        body_size=arguments.body_size,
+    )
+    with StandInServer(config, arguments.port) as server:
+        print(f"Serving on {server.url} with {config}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""Benchmark of the throughput, latency and retry overhead of hcc against a local server.
+
+Every scenario sends real HTTP requests to a stand-in server running in a child process (see
+`benchmarks.server`), so the connection handling, the retry loop and the response parsing are
+measured end to end. The scenarios cover the sequential Channel methods, the one-shot functions,
+the concurrent `Channel.map`, the asynchronous `AsyncChannel.map`, and the retries of a server
+answering a share of the attempts with 503.
+
+For every scenario, the benchmark reports the requests per second, the exact p50, p99 and p999
+latencies of the calls, the CPU time per request of the client process, its peak resident
+memory, and optionally the peak of the memory allocated by Python during the scenario. The
+results are written as JSON with the commit they were measured on, so that two runs can be
+compared with `python -m benchmarks.compare`.
+
+Usage:
+    python -m benchmarks.throughput [--requests N] [--concurrency N] [--latency SECONDS]
+                                    [--body-size BYTES] [--error-rate RATE]
+                                    [--scenario NAME ...] [--tracemalloc] [--output FILE]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import requests
+
+import hcc
+from hcc import AsyncChannel, Channel, ImmediateBackoff, RequestSpec
+
+from .server import ServerConfig, StandInServer
+
+try:
+    import resource
+except ImportError:  # The resource module is only available on Unix.
+    resource = None  # type: ignore[assignment]
+
+SUCCESS_STATUS_CODES = (200, 201)
+PERCENTILES = {"p50": 0.5, "p99": 0.99, "p999": 0.999}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """The settings of a benchmark run.
+
+    Attributes:
+        requests: The number of calls of every scenario.
+        concurrency: The number of concurrent calls of the concurrent scenarios.
+        warmup: The number of calls sent before every scenario is measured.
+        server: The behaviour of the server of the scenarios without errors.
+        error_rate: The share of the attempts failed by the server of the retry scenario.
+        tracemalloc: Whether to trace the peak of the memory allocated by Python.
+    """
+
+    requests: int
+    concurrency: int
+    warmup: int
+    server: ServerConfig
+    error_rate: float
+    tracemalloc: bool
+
+
+class Recorder:
+    """Record the latencies and the outcome of the calls of a scenario."""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def record(self, start: float, response: Optional[requests.Response]) -> None:
+        self.latencies.append(time.perf_counter() - start)
+        if response is None or response.status_code not in SUCCESS_STATUS_CODES:
+            self.errors += 1
+
+    def call(self, send: Callable[[], requests.Response]) -> requests.Response:
+        start = time.perf_counter()
+        response: Optional[requests.Response] = None
+        try:
+            response = send()
+            return response
+        finally:
+            self.record(start, response)
+
+    async def async_call(
+        self, send: Callable[[], Awaitable[requests.Response]]
+    ) -> requests.Response:
+        start = time.perf_counter()
+        response: Optional[requests.Response] = None
+        try:
+            response = await send()
+            return response
+        finally:
+            self.record(start, response)
+
+
+class TimedChannel(Channel):
+    """A Channel recording the latency of every GET call sent by `map`."""
+
+    recorder: Optional[Recorder] = None
+
+    def get(self, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        if self.recorder is None:
+            return super().get(**kwargs)
+        return self.recorder.call(lambda: super(TimedChannel, self).get(**kwargs))
+
+
+class TimedAsyncChannel(AsyncChannel):
+    """An AsyncChannel recording the latency of every GET call sent by `map`."""
+
+    recorder: Optional[Recorder] = None
+
+    async def get(self, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        if self.recorder is None:
+            return await super().get(**kwargs)
+        return await self.recorder.async_call(
+            lambda: super(TimedAsyncChannel, self).get(**kwargs)
+        )
+
+
+def percentile(latencies: List[float], quantile: float) -> float:
+    """Return the nearest-rank percentile of sorted latencies in milliseconds."""
+    index = max(0, math.ceil(quantile * len(latencies)) - 1)
+    return latencies[index] * 1000
+
+
+def max_rss_mib() -> Optional[float]:
+    """Return the peak resident memory of the process in MiB, if it is known."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # The peak is counted in bytes on macOS, and in KiB on the other systems.
+    return max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+Scenario = Callable[[int], Callable[[Recorder], None]]
+
+
+def measure(
+    name: str, scenario: Scenario, settings: Settings, server: StandInServer
+) -> Dict[str, Any]:
+    """Run a scenario after a warmup, and return its results."""
+    # The warmup opens the connections, and imports and caches what the calls need.
+    if settings.warmup:
+        scenario(settings.warmup)(Recorder())
+    run = scenario(settings.requests)
+    recorder = Recorder()
+    if settings.tracemalloc:
+        tracemalloc.start()
+    served = server.served
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    run(recorder)
+    seconds = time.perf_counter() - start
+    cpu_seconds = time.process_time() - cpu_start
+    attempts = server.served - served
+    peak = None
+    if settings.tracemalloc:
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    latencies = sorted(recorder.latencies)
+    count = len(latencies)
+    results: Dict[str, Any] = {
+        "requests": count,
+        "errors": recorder.errors,
+        "attempts_per_request": attempts / count,
+        "seconds": seconds,
+        "req_per_s": count / seconds,
+        "latency_ms": {
+            "mean": sum(latencies) / count * 1000,
+            **{key: percentile(latencies, q) for key, q in PERCENTILES.items()},
+            "max": latencies[-1] * 1000,
+        },
+        "cpu_us_per_request": cpu_seconds / count * 1e6,
+        "max_rss_mib": max_rss_mib(),
+        "tracemalloc_peak_mib": peak,
+    }
+    print(
+        f"{name:<18} {results['req_per_s']:9.1f} req/s"
+        f"  p50 {results['latency_ms']['p50']:7.3f} ms"
+        f"  p99 {results['latency_ms']['p99']:7.3f} ms"
+        f"  p999 {results['latency_ms']['p999']:7.3f} ms"
+        f"  cpu {results['cpu_us_per_request']:7.1f} us/req"
+        f"  attempts {results['attempts_per_request']:4.2f}"
+        f"  errors {results['errors']}"
+    )
+    return results
+
+
+def sequential(
+    send: Callable[[], requests.Response], count: int
+) -> Callable[[Recorder], None]:
+    """Return a scenario sending the calls one after the other."""
+
+    def run(recorder: Recorder) -> None:
+        for _ in range(count):
+            recorder.call(send)
+
+    return run
+
+
+def channel_map(channel: TimedChannel, count: int) -> Callable[[Recorder], None]:
+    """Return a scenario sending the calls concurrently with `Channel.map`."""
+
+    def run(recorder: Recorder) -> None:
+        channel.recorder = recorder
+        try:
+            # The failed calls are counted by the recorder of the channel.
+            for _ in channel.map(RequestSpec() for _ in range(count)):
+                pass
+        finally:
+            channel.recorder = None
+
+    return run
+
+
+def thread_pool(
+    send: Callable[[], requests.Response], count: int, workers: int
+) -> Callable[[Recorder], None]:
+    """Return a scenario sending the calls from a thread pool sharing one channel."""
+
+    def run(recorder: Recorder) -> None:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(lambda _: recorder.call(send), range(count)):
+                pass
+
+    return run
+
+
+def async_map(url: str, count: int, concurrency: int) -> Callable[[Recorder], None]:
+    """Return a scenario sending the calls concurrently with `AsyncChannel.map`."""
+
+    async def send_all(recorder: Recorder) -> None:
+        channel = TimedAsyncChannel(url=url, pool_maxsize=concurrency)
+        async with channel:
+            channel.recorder = recorder
+            async for _ in channel.map(RequestSpec() for _ in range(count)):
+                pass
+
+    def run(recorder: Recorder) -> None:
+        asyncio.run(send_all(recorder))
+
+    return run
+
+
+SCENARIOS = (
+    "channel_get",
+    "channel_post_json",
+    "oneshot_get",
+    "channel_threads",
+    "channel_map",
+    "async_map",
+    "channel_get_retries",
+)
+
+
+def run_scenarios(settings: Settings, names: List[str]) -> Dict[str, Any]:
+    """Run the selected scenarios, and return their results by name."""
+    body = {f"key{i}": "x" * 32 for i in range(20)}
+    results: Dict[str, Any] = {}
+    names = [name for name in SCENARIOS if not names or name in names]
+    with StandInServer(settings.server) as server:
+        url = server.url
+        channel = TimedChannel(url=url, pool_maxsize=settings.concurrency)
+        with channel:
+            scenarios: Dict[str, Scenario] = {
+                "channel_get": lambda n: sequential(channel.get, n),
+                "channel_post_json": lambda n: sequential(
+                    lambda: channel.post(json=body), n
+                ),
+                "oneshot_get": lambda n: sequential(lambda: hcc.get(url=url), n),
+                "channel_threads": lambda n: thread_pool(
+                    channel.get, n, settings.concurrency
+                ),
+                "channel_map": lambda n: channel_map(channel, n),
+                "async_map": lambda n: async_map(url, n, settings.concurrency),
+            }
+            for name in names:
+                if name in scenarios:
+                    results[name] = measure(name, scenarios[name], settings, server)
+    if "channel_get_retries" in names:
+        # The failed attempts are retried immediately, so the retry overhead is not hidden
+        # by the delays between the attempts.
+        config = replace(settings.server, error_rate=settings.error_rate)
+        with StandInServer(config) as server:
+            with Channel(
+                url=server.url, retry_policy=ImmediateBackoff()
+            ) as retry_channel:
+                results["channel_get_retries"] = measure(
+                    "channel_get_retries",
+                    lambda n: sequential(retry_channel.get, n),
+                    settings,
+                    server,
+                )
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """Return the commit of the working tree, if it is a git repository."""
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def run(settings: Settings, names: List[str], output: Optional[str]) -> None:
+    print(
+        f"{settings.requests} requests per scenario, concurrency "
+        f"{settings.concurrency}, server {settings.server}"
+    )
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "requests": requests.__version__,
+        "settings": {
+            "requests": settings.requests,
+            "concurrency": settings.concurrency,
+            "warmup": settings.warmup,
+            "server": settings.server.to_json(),
+            "error_rate": settings.error_rate,
+            "tracemalloc": settings.tracemalloc,
+        },
+        "scenarios": run_scenarios(settings, names),
+    }
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--body-size", type=int, default=256)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, default=[])
+    parser.add_argument("--tracemalloc", action="store_true")
+    parser.add_argument("--output")
+    arguments = parser.parse_args()
+    settings = Settings(
+        requests=arguments.requests,
+        concurrency=arguments.concurrency,
+        warmup=arguments.warmup,
+        server=ServerConfig(
+            latency=arguments.latency,
+            jitter=arguments.jitter,
+            body_size=arguments.body_size,
+        ),
+        error_rate=arguments.error_rate,
+        tracemalloc=arguments.tracemalloc,
+    )
+    run(settings, arguments.scenario, arguments.output)
+
+
+if __name__ == "__main__":
+    main()
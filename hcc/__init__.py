@@ -1,36 +1,139 @@
 """hcc package initialization.
 
-This package provides the Channel class for making HTTP requests with retry functionality.
-"""
+This package provides the Channel class for making HTTP requests with retry functionality,
+and the AsyncChannel class for doing the same from asyncio code.
 
-import logging.config
-import yaml
+Importing the package does not configure logging. The loggers of the package live under the
+`hcc` namespace and follow the configuration of the application, or `configure_logging` can be
+called to apply a YAML logging configuration.
+"""
 
+from .async_channel import AsyncChannel
+from .async_transport import AsyncTransport, StreamTransport
+from .backoff import (
+    BackoffStrategy,
+    DecorrelatedJitterBackoff,
+    ExponentialBackoff,
+    FullJitterBackoff,
+    ImmediateBackoff,
+    JitterBackoff,
+    LinearBackoff,
+)
+from .balancer import BalancingStrategy, Endpoint, LoadBalancer
+from .batch import BatchResult, RequestSpec
+from .outlier import OutlierDetector
+from .cache import CacheEntry, CacheStorage, MemoryStorage, ResponseCache
 from .channel import Channel
-from .single_request import get, post, put, delete, patch
-from .retry import retry_function, RetryPolicy
+from .single_request import get, post, put, delete, patch, batch
+from .retry import async_retry_function, retry_function, RetryPolicy
+from .retry_after import parse_retry_after, retry_after_hint
+from .coalescing import RequestCoalescer
+from .compression import RequestCompression
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .concurrency import (
+    AimdLimit,
+    ConcurrencyLimiter,
+    GradientLimit,
+    LimitAlgorithm,
+)
+from .hedging import HedgePolicy, LatencyTracker
+from .json_codec import (
+    JsonCodec,
+    MsgspecCodec,
+    OrjsonCodec,
+    StdlibJsonCodec,
+    decode_json,
+    fastest_json_codec,
+)
+from .rate_limit import RateLimiter
+from .log_policy import BodyLogMode, LogPolicy
+from .metrics import Histogram, Metrics
+from .streaming import StreamedResponse
+from .logging_config import configure_logging
+from .deadline import Deadline
+from .exceptions import (
+    CircuitOpenError,
+    ConcurrencyLimitExceededError,
+    DeadlineExceededError,
+    HccError,
+    RateLimitExceededError,
+    ResponseTooLargeError,
+    RetryBudgetExhaustedError,
+)
+from .retry_budget import RetryBudget
+from .sqlite_storage import SqliteStorage
+from .session_pool import SessionPool, default_pool
 from .custom_data_types import DataType, JsonType, HeaderType
 
 __all__ = [
     "Channel",
+    "AsyncChannel",
+    "AsyncTransport",
+    "StreamTransport",
     "get",
     "post",
     "put",
     "delete",
     "patch",
+    "batch",
+    "RequestSpec",
+    "BatchResult",
+    "ResponseCache",
+    "CacheEntry",
+    "CacheStorage",
+    "MemoryStorage",
+    "SqliteStorage",
+    "RequestCoalescer",
+    "RequestCompression",
+    "JsonCodec",
+    "StdlibJsonCodec",
+    "OrjsonCodec",
+    "MsgspecCodec",
+    "fastest_json_codec",
+    "decode_json",
     "retry_function",
+    "async_retry_function",
     "RetryPolicy",
+    "parse_retry_after",
+    "retry_after_hint",
+    "BackoffStrategy",
+    "ImmediateBackoff",
+    "LinearBackoff",
+    "JitterBackoff",
+    "ExponentialBackoff",
+    "FullJitterBackoff",
+    "DecorrelatedJitterBackoff",
     "DataType",
     "JsonType",
     "HeaderType",
+    "RetryBudget",
+    "HccError",
+    "RetryBudgetExhaustedError",
+    "CircuitBreaker",
+    "CircuitState",
+    "CircuitOpenError",
+    "Deadline",
+    "DeadlineExceededError",
+    "HedgePolicy",
+    "LatencyTracker",
+    "RateLimiter",
+    "RateLimitExceededError",
+    "ConcurrencyLimiter",
+    "ConcurrencyLimitExceededError",
+    "LimitAlgorithm",
+    "AimdLimit",
+    "GradientLimit",
+    "LoadBalancer",
+    "BalancingStrategy",
+    "Endpoint",
+    "OutlierDetector",
+    "Metrics",
+    "Histogram",
+    "StreamedResponse",
+    "ResponseTooLargeError",
+    "BodyLogMode",
+    "LogPolicy",
+    "configure_logging",
+    "SessionPool",
+    "default_pool",
 ]
-
-
-def initialize_logging():
-    """Initialize logging using the configuration file."""
-    with open("log_config.yaml", "r", encoding="utf-8") as file:
-        config = yaml.safe_load(file)
-        logging.config.dictConfig(config)
-
-
-initialize_logging()
@@ -0,0 +1,356 @@
+"""This module defines the transports used by the AsyncChannel class to send HTTP requests.
+
+A transport turns the arguments of a request into a `requests.Response`, so the retry
+functionality and `is_retry_needed` callbacks work on the same objects as with `Channel`.
+Any object that implements the `AsyncTransport` protocol can be plugged into an AsyncChannel.
+
+The default `StreamTransport` is a small HTTP/1.1 client built on asyncio streams. It keeps
+idle connections alive per origin, so many concurrent requests can share one event loop. Like a
+`requests.Session`, it follows redirects.
+"""
+
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+from urllib.parse import urljoin, urlsplit
+import asyncio
+import ssl
+import zlib
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.models import DEFAULT_REDIRECT_LIMIT
+from requests.utils import default_headers, get_encoding_from_headers
+
+from .compression import decompress
+from .custom_data_types import DataType, JsonType, HeaderType
+
+Origin = Tuple[str, str, int]
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+NO_BODY_STATUS_CODES = (204, 304)
+# The headers of a request body, which is dropped when a redirect changes the method to GET.
+BODY_HEADERS = ("Content-Length", "Content-Type", "Transfer-Encoding")
+
+
+class AsyncTransport(Protocol):
+    """The AsyncTransport protocol defines the interface of the AsyncChannel transports."""
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        timeout: float,
+        params: Optional[Dict[str, str]] = None,
+        data: Optional[DataType] = None,
+        json: Optional[JsonType] = None,
+        headers: Optional[HeaderType] = None,
+    ) -> requests.Response:
+        """Send a request and return its response."""
+
+    async def close(self) -> None:
+        """Release the resources of the transport."""
+
+
+class StreamTransport:
+    """The StreamTransport class is an HTTP/1.1 transport built on asyncio streams.
+
+    The requests are prepared by `requests.Request.prepare`, so the URL, query parameters,
+    headers and bodies are encoded exactly as by `Channel`. The responses are returned as fully
+    read `requests.Response` objects. Gzip and deflate encoded bodies are decoded, and zstd
+    encoded bodies where the standard library supports zstd.
+
+    Redirects are followed like by `requests.Session`: 301, 302 and 303 redirects of a POST
+    are sent as a GET without the body, 307 and 308 redirects resend the request as is, and the
+    Authorization header is dropped when the redirect leaves the host. The redirect responses
+    are kept in the `history` of the final response, and the timeout covers the whole chain.
+
+    The StreamTransport class takes the following parameters:
+        pool_maxsize: The maximum number of idle connections kept alive per origin
+                      (default is 10).
+        ssl_context: The SSL context of the HTTPS connections (default is None, which means
+                     the default context of the `ssl` module).
+        max_redirects: The maximum number of redirects followed by a request (default is 30,
+                       like `requests.Session`). Set it to 0 to return the redirect responses
+                       as they are.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_maxsize: int = 10,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        max_redirects: int = DEFAULT_REDIRECT_LIMIT,
+    ):
+        self.pool_maxsize = pool_maxsize
+        self.ssl_context = ssl_context
+        self.max_redirects = max_redirects
+        self._idle: Dict[Origin, List[Connection]] = {}
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        timeout: float,
+        params: Optional[Dict[str, str]] = None,
+        data: Optional[DataType] = None,
+        json: Optional[JsonType] = None,
+        headers: Optional[HeaderType] = None,
+    ) -> requests.Response:
+        """Send a request and return its response.
+
+        Raises:
+            requests.exceptions.Timeout: If the response does not arrive in time.
+            requests.exceptions.ConnectionError: If the connection fails, or the response is
+                                                 malformed or cannot be decoded.
+            requests.exceptions.TooManyRedirects: If the redirects exceed `max_redirects`.
+        """
+        request_headers = default_headers()
+        request_headers.update(headers or {})
+        prepared = requests.Request(
+            method,
+            url,
+            params=params,
+            data=data,
+            json=json,
+            headers=request_headers,
+        ).prepare()
+        history: List[requests.Response] = []
+        try:
+            async with asyncio.timeout(timeout):
+                # A file is read in a worker thread, so the event loop is not blocked.
+                await _load_body(prepared)
+                response = await self._exchange(prepared)
+                while response.is_redirect and len(history) < self.max_redirects:
+                    history.append(response)
+                    prepared = _redirect(prepared, response)
+                    response = await self._exchange(prepared)
+        except TimeoutError as e:
+            raise requests.exceptions.Timeout(
+                f"Request timed out after {timeout} seconds", request=prepared
+            ) from e
+        except (
+            OSError,
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ValueError,
+            zlib.error,
+        ) as e:
+            # A broken connection, a malformed or oversized message, or an undecodable body.
+            raise requests.exceptions.ConnectionError(e, request=prepared) from e
+        if history and response.is_redirect:
+            raise requests.exceptions.TooManyRedirects(
+                f"Exceeded {self.max_redirects} redirects", response=response
+            )
+        response.history = history
+        return response
+
+    @property
+    def idle_connections(self) -> int:
+        """The number of the idle connections kept alive."""
+        return sum(len(connections) for connections in self._idle.values())
+
+    async def close(self) -> None:
+        """Close the idle connections of the transport."""
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for _, writer in connections:
+                writer.close()
+
+    async def _exchange(self, prepared: requests.PreparedRequest) -> requests.Response:
+        """Send a prepared request over a pooled connection and read the response.
+
+        A reused keep-alive connection may have been closed by the server in the meantime,
+        therefore the request is resent once over a new connection if a reused connection
+        returns no response at all.
+        """
+        parts = urlsplit(str(prepared.url))
+        scheme = parts.scheme.lower()
+        origin = (scheme, parts.hostname or "", parts.port or DEFAULT_PORTS[scheme])
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        payload = _serialize(prepared, parts.netloc, target)
+        connection, reused = await self._connect(origin)
+        try:
+            try:
+                return await self._roundtrip(connection, origin, payload, prepared)
+            except asyncio.IncompleteReadError as e:
+                if not reused or e.partial:
+                    raise
+            connection[1].close()
+            connection = await self._open(origin)
+            return await self._roundtrip(connection, origin, payload, prepared)
+        except BaseException:
+            connection[1].close()
+            raise
+
+    async def _roundtrip(
+        self,
+        connection: Connection,
+        origin: Origin,
+        payload: bytes,
+        prepared: requests.PreparedRequest,
+    ) -> requests.Response:
+        reader, writer = connection
+        writer.write(payload)
+        await writer.drain()
+        status_line = await reader.readuntil(b"\r\n")
+        version, status, reason = (status_line.decode("latin-1").rstrip() + " ").split(
+            " ", 2
+        )
+        raw_headers: CaseInsensitiveDict[str] = CaseInsensitiveDict()
+        while line := (await reader.readuntil(b"\r\n")).rstrip(b"\r\n"):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name in raw_headers:
+                raw_headers[name] += ", " + value.strip()
+            else:
+                raw_headers[name] = value.strip()
+        status_code = int(status)
+        connection_options = {
+            option.strip().lower()
+            for option in raw_headers.get("Connection", "").split(",")
+        }
+        # An HTTP/1.0 connection is only kept alive if the server says so explicitly.
+        if version.upper() == "HTTP/1.0":
+            keep_alive = "keep-alive" in connection_options
+        else:
+            keep_alive = "close" not in connection_options
+        codings = [
+            coding.strip().lower()
+            for coding in raw_headers.get("Transfer-Encoding", "").split(",")
+            if coding.strip()
+        ]
+        if prepared.method == "HEAD" or status_code in NO_BODY_STATUS_CODES:
+            body = b""
+        elif codings and codings[-1] == "chunked":
+            body = await _read_chunked(reader)
+            codings.pop()
+        elif codings:
+            # Without chunked as the final coding, the body ends with the connection.
+            body = await reader.read()
+            keep_alive = False
+        elif "Content-Length" in raw_headers:
+            body = await reader.readexactly(int(raw_headers["Content-Length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        if keep_alive:
+            self._release(origin, connection)
+        else:
+            writer.close()
+        for coding in reversed(codings):
+            body = decompress(body, coding)
+        return _build_response(prepared, status_code, reason.strip(), raw_headers, body)
+
+    async def _connect(self, origin: Origin) -> Tuple[Connection, bool]:
+        """Return an idle connection of the origin, or a new one if there is none."""
+        connections = self._idle.get(origin, [])
+        while connections:
+            connection = connections.pop()
+            if not connection[0].at_eof() and not connection[1].is_closing():
+                return connection, True
+            connection[1].close()
+        return await self._open(origin), False
+
+    async def _open(self, origin: Origin) -> Connection:
+        scheme, host, port = origin
+        context = None
+        if scheme == "https":
+            context = self.ssl_context or ssl.create_default_context()
+        return await asyncio.open_connection(host, port, ssl=context)
+
+    def _release(self, origin: Origin, connection: Connection) -> None:
+        connections = self._idle.setdefault(origin, [])
+        if len(connections) < self.pool_maxsize:
+            connections.append(connection)
+        else:
+            connection[1].close()
+
+
+def _serialize(prepared: requests.PreparedRequest, host: str, target: str) -> bytes:
+    """Serialize a prepared request into an HTTP/1.1 message."""
+    body: Any = prepared.body
+    headers = CaseInsensitiveDict(prepared.headers)
+    headers.setdefault("Host", host)
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    elif body is not None and not isinstance(body, bytes):
+        body = b"".join(
+            b"%x\r\n%s\r\n" % (len(chunk), chunk)
+            for chunk in (c.encode("utf-8") if isinstance(c, str) else c for c in body)
+            if chunk
+        )
+        body += b"0\r\n\r\n"
+    lines = [f"{prepared.method} {target} HTTP/1.1"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return head + (body or b"")
+
+
+async def _load_body(prepared: requests.PreparedRequest) -> None:
+    """Read a file body in a worker thread, and send it with its length."""
+    body: Any = prepared.body
+    if body is None or isinstance(body, (str, bytes)) or not hasattr(body, "read"):
+        return
+    data = await asyncio.to_thread(body.read)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    prepared.body = data
+    prepared.headers.pop("Transfer-Encoding", None)
+    prepared.headers["Content-Length"] = str(len(data))
+
+
+def _redirect(
+    prepared: requests.PreparedRequest, response: requests.Response
+) -> requests.PreparedRequest:
+    """Prepare the request following a redirect, like `requests.Session` does."""
+    url = str(prepared.url)
+    redirected = prepared.copy()
+    redirected.prepare_url(urljoin(url, response.headers["Location"]), None)
+    status_code = response.status_code
+    if (status_code in (302, 303) and prepared.method != "HEAD") or (
+        status_code == 301 and prepared.method == "POST"
+    ):
+        redirected.method = "GET"
+    if status_code not in (307, 308):
+        for name in BODY_HEADERS:
+            redirected.headers.pop(name, None)
+        redirected.body = None
+    if urlsplit(url).netloc != urlsplit(str(redirected.url)).netloc:
+        redirected.headers.pop("Authorization", None)
+    return redirected
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    """Read a body sent with chunked transfer encoding."""
+    chunks: List[bytes] = []
+    while True:
+        size_line = await reader.readuntil(b"\r\n")
+        size = int(size_line.split(b";", 1)[0], 16)
+        if size == 0:
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+def _build_response(
+    prepared: requests.PreparedRequest,
+    status_code: int,
+    reason: str,
+    headers: CaseInsensitiveDict[str],
+    body: bytes,
+) -> requests.Response:
+    """Build a `requests.Response` from the parts of a received HTTP response."""
+    encoding = headers.get("Content-Encoding", "")
+    if body and encoding:
+        body = decompress(body, encoding)
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = headers
+    response._content = body  # pylint: disable=protected-access
+    response.encoding = get_encoding_from_headers(headers)
+    response.url = prepared.url or ""
+    response.request = prepared
+    return response
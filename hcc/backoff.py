@@ -0,0 +1,128 @@
+"""Backoff module defining the delay schedules between retries.
+
+A backoff strategy computes the delay before the next attempt from the number of the failed
+attempt and the previous delay. The strategies are stateless, so one instance can be shared by
+any number of concurrent retry loops. Custom schedules can be plugged into `retry_function`
+by subclassing `BackoffStrategy`.
+
+All the delays are configured in milliseconds, like the `base_delay` of `retry_function`, and
+returned in seconds. The exponential delays never exceed MAX_BACKOFF_DELAY, so they stay finite
+however many retries an unlimited retry loop makes.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+import math
+import random
+
+# The ceiling of the exponential delays in milliseconds (one day), which also applies without
+# a max_delay.
+MAX_BACKOFF_DELAY = 86_400_000
+
+
+class BackoffStrategy(ABC):
+    """The BackoffStrategy class is the base class of the retry delay schedules."""
+
+    @abstractmethod
+    def delay(self, attempt: int, previous_delay: float) -> float:
+        """Compute the delay before the next attempt.
+
+        Args:
+            attempt: The number of the failed attempt, starting from 1.
+            previous_delay: The previous delay in seconds (0 before the first retry).
+
+        Returns:
+            The delay in seconds.
+        """
+
+
+@dataclass(frozen=True)
+class ImmediateBackoff(BackoffStrategy):
+    """Retry immediately."""
+
+    def delay(self, attempt: int, previous_delay: float) -> float:
+        return 0
+
+
+@dataclass(frozen=True)
+class LinearBackoff(BackoffStrategy):
+    """Retry with a constant delay, which is equal to the base_delay.
+
+    Attributes:
+        base_delay: The delay in milliseconds (default is 200).
+    """
+
+    base_delay: int = 200
+
+    def delay(self, attempt: int, previous_delay: float) -> float:
+        return self.base_delay / 1000
+
+
+@dataclass(frozen=True)
+class JitterBackoff(BackoffStrategy):
+    """Retry with a random delay between 0.5 and 1.5 times the base_delay.
+
+    Attributes:
+        base_delay: The middle of the delay interval in milliseconds (default is 200).
+    """
+
+    base_delay: int = 200
+
+    def delay(self, attempt: int, previous_delay: float) -> float:
+        return self.base_delay / 1000 * random.uniform(0.5, 1.5)
+
+
+@dataclass(frozen=True)
+class ExponentialBackoff(BackoffStrategy):
+    """Retry with a delay growing exponentially: base_delay * multiplier ** (attempt - 1).
+
+    Attributes:
+        base_delay: The delay after the first attempt in milliseconds (default is 200).
+        multiplier: The growth factor of the delay (default is 2.0).
+        max_delay: The cap of the delay in milliseconds (default is None, which means only the
+                   MAX_BACKOFF_DELAY ceiling).
+    """
+
+    base_delay: int = 200
+    multiplier: float = 2.0
+    max_delay: Optional[int] = None
+
+    def delay(self, attempt: int, previous_delay: float) -> float:
+        try:
+            delay = self.base_delay * self.multiplier ** (attempt - 1)
+        except OverflowError:
+            delay = math.inf
+        return self._cap(delay) / 1000
+
+    def _cap(self, delay: float) -> float:
+        if self.max_delay is None:
+            return min(delay, MAX_BACKOFF_DELAY)
+        return min(delay, self.max_delay, MAX_BACKOFF_DELAY)
+
+
+@dataclass(frozen=True)
+class FullJitterBackoff(ExponentialBackoff):
+    """Retry with a random delay between 0 and the capped exponential delay.
+
+    Spreading the retries over the whole interval keeps a fleet of clients from retrying in
+    lockstep after a shared failure.
+    """
+
+    def delay(self, attempt: int, previous_delay: float) -> float:
+        return random.uniform(0, super().delay(attempt, previous_delay))
+
+
+@dataclass(frozen=True)
+class DecorrelatedJitterBackoff(ExponentialBackoff):
+    """Retry with a random delay between the base_delay and multiplier times the previous delay.
+
+    The multiplier of the decorrelated jitter is typically 3.0, and the delay is capped by
+    max_delay.
+    """
+
+    multiplier: float = 3.0
+
+    def delay(self, attempt: int, previous_delay: float) -> float:
+        upper = max(self.base_delay, previous_delay * 1000 * self.multiplier)
+        return self._cap(random.uniform(self.base_delay, upper)) / 1000
@@ -0,0 +1,244 @@
+"""This module defines the LoadBalancer class, which spreads the attempts over several endpoints.
+
+A Channel with a load balancer sends every attempt to one of the replicas of a service, so no
+proxy hop is needed in front of them. The URL of the channel is appended to the base URL of the
+chosen endpoint. The endpoint is chosen by one of the strategies:
+- ROUND_ROBIN: The endpoints are used in turn.
+- LEAST_OUTSTANDING: The endpoint with the fewest attempts in flight is used.
+- POWER_OF_TWO_CHOICES: Two random endpoints are compared, and the one with the lower cost is
+                        used. The cost is the peak EWMA latency of the endpoint multiplied by
+                        its attempts in flight, so slow and busy endpoints get less traffic,
+                        without the herding of always choosing the best endpoint.
+
+The retry of an attempt, and the hedged duplicate of an attempt, are sent to an endpoint which
+has not been tried yet by the call, while there is one. With an outlier detector, the ejected
+endpoints are left out of the rotation, unless every endpoint is ejected.
+"""
+
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Sequence
+import itertools
+import logging
+import math
+import random
+import threading
+import time
+
+from .outlier import OutlierDetector, is_failure
+
+logger = logging.getLogger("hcc.balancer")
+
+
+class BalancingStrategy(Enum):
+    """The BalancingStrategy enum defines the strategies of choosing an endpoint."""
+
+    ROUND_ROBIN = 1
+    LEAST_OUTSTANDING = 2
+    POWER_OF_TWO_CHOICES = 3
+
+
+class Endpoint:
+    """The Endpoint class holds the load statistics of one base URL of a load balancer.
+
+    Attributes:
+        url: The base URL of the endpoint.
+        outstanding: The number of attempts in flight.
+        latency: The peak EWMA latency of the attempts in seconds (0 before the first attempt).
+        requests: The number of attempts sent to the endpoint.
+        consecutive_failures: The number of the consecutive failed attempts.
+        outcomes: Whether the recent attempts failed, for the outlier detector.
+        ejected_until: The monotonic time when the ejection of the endpoint ends.
+        ejections: The number of the recent ejections, which doubles the ejection time.
+    """
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.latency = 0.0
+        self.requests = 0
+        self.consecutive_failures = 0
+        self.outcomes: Deque[bool] = deque()
+        self.ejected_until = -math.inf
+        self.ejections = 0
+        self._updated_at: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"Endpoint(url={self.url!r}, outstanding={self.outstanding}, "
+            f"latency={self.latency:.6f})"
+        )
+
+    @property
+    def cost(self) -> float:
+        """The expected wait of a new attempt on the endpoint."""
+        return self.latency * (self.outstanding + 1)
+
+    def is_ejected(self, now: float) -> bool:
+        """Return whether the endpoint is ejected from the rotation."""
+        return now < self.ejected_until
+
+    def join(self, path: str) -> str:
+        """Return the URL of a path on the endpoint."""
+        if not path:
+            return self.url
+        return f"{self.url}/{path.lstrip('/')}"
+
+    def observe(self, latency: float, now: float, decay: float) -> None:
+        """Update the peak EWMA latency with the latency of an attempt.
+
+        A higher latency is taken at once, while a lower one is averaged in with a weight that
+        grows with the time since the previous update.
+        """
+        if self._updated_at is None or latency > self.latency:
+            self.latency = latency
+        else:
+            weight = math.exp(-(now - self._updated_at) / decay)
+            self.latency = self.latency * weight + latency * (1 - weight)
+        self._updated_at = now
+
+
+class LoadBalancer:
+    """The LoadBalancer class is a thread-safe client-side load balancer.
+
+    The LoadBalancer class takes the following parameters:
+        urls: The base URLs of the endpoints.
+        strategy: The strategy of choosing an endpoint
+                  (default is BalancingStrategy.POWER_OF_TWO_CHOICES).
+        decay: The time constant of the EWMA latency in seconds (default is 10.0).
+        outlier_detector: The detector ejecting the failing and the slow endpoints
+                          (default is None, which means every endpoint stays in rotation).
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, LoadBalancer
+
+    balancer = LoadBalancer(["http://10.0.0.1:8080", "http://10.0.0.2:8080"])
+    channel = Channel(url="/config", balancer=balancer)
+    ```
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        *,
+        strategy: BalancingStrategy = BalancingStrategy.POWER_OF_TWO_CHOICES,
+        decay: float = 10.0,
+        outlier_detector: Optional[OutlierDetector] = None,
+    ):
+        assert urls, "At least one endpoint is needed"
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.strategy = strategy
+        self.decay = decay
+        self.outlier_detector = outlier_detector
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"LoadBalancer(strategy={self.strategy.name}, endpoints={self.endpoints})"
+        )
+
+    def pick(self, exclude: Sequence[Endpoint] = ()) -> Endpoint:
+        """Choose the endpoint of the next attempt.
+
+        Args:
+            exclude: The endpoints to avoid, such as the ones already tried (default is none).
+                     They are only used if there is no other endpoint.
+
+        Returns:
+            The chosen endpoint.
+        """
+        with self._lock:
+            return self._choose(exclude, time.monotonic())
+
+    def call(self, path: str, func: Callable[[str], Any], tried: List[Endpoint]) -> Any:
+        """Call a function with the URL of a path on the next endpoint.
+
+        Args:
+            path: The path appended to the base URL of the endpoint.
+            func: The function sending the attempt to a URL.
+            tried: The endpoints already tried by the call. The chosen endpoint is appended.
+
+        Returns:
+            The result of the function.
+        """
+        endpoint = self._start(tried)
+        start = time.monotonic()
+        try:
+            result = func(endpoint.join(path))
+        except Exception:
+            self._finish(endpoint, start, True)
+            raise
+        except BaseException:
+            self._finish(endpoint, start, None)
+            raise
+        self._finish(endpoint, start, is_failure(result))
+        return result
+
+    async def async_call(
+        self, path: str, func: Callable[[str], Awaitable[Any]], tried: List[Endpoint]
+    ) -> Any:
+        """Await a coroutine function with the URL of a path on the next endpoint.
+
+        It is the asyncio counterpart of `call`.
+
+        Args:
+            path: The path appended to the base URL of the endpoint.
+            func: The coroutine function sending the attempt to a URL.
+            tried: The endpoints already tried by the call. The chosen endpoint is appended.
+
+        Returns:
+            The result of the coroutine.
+        """
+        endpoint = self._start(tried)
+        start = time.monotonic()
+        try:
+            result = await func(endpoint.join(path))
+        except Exception:
+            self._finish(endpoint, start, True)
+            raise
+        except BaseException:
+            self._finish(endpoint, start, None)
+            raise
+        self._finish(endpoint, start, is_failure(result))
+        return result
+
+    def _choose(self, exclude: Sequence[Endpoint], now: float) -> Endpoint:
+        """Choose an endpoint by the strategy. The lock has to be held."""
+        available = [
+            e for e in self.endpoints if not e.is_ejected(now)
+        ] or self.endpoints
+        candidates = [e for e in available if e not in exclude] or available
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.strategy == BalancingStrategy.ROUND_ROBIN:
+            return candidates[next(self._next) % len(candidates)]
+        if self.strategy == BalancingStrategy.LEAST_OUTSTANDING:
+            return min(candidates, key=lambda e: (e.outstanding, e.requests))
+        first, second = random.sample(candidates, 2)
+        return min(first, second, key=lambda e: (e.cost, e.outstanding))
+
+    def _start(self, tried: List[Endpoint]) -> Endpoint:
+        """Choose an endpoint not tried yet, and count the attempt in flight."""
+        with self._lock:
+            endpoint = self._choose(tried, time.monotonic())
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+        tried.append(endpoint)
+        logger.debug("Endpoint picked: %s", endpoint)
+        return endpoint
+
+    def _finish(self, endpoint: Endpoint, start: float, failed: Optional[bool]) -> None:
+        """Count the attempt out, and record its latency and outcome.
+
+        The outcome is None if the attempt was cancelled, which tells nothing of the endpoint.
+        """
+        now = time.monotonic()
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed is None:
+                return
+            endpoint.observe(now - start, now, self.decay)
+            if self.outlier_detector is not None:
+                self.outlier_detector.record(endpoint, self.endpoints, failed, now)
@@ -0,0 +1,200 @@
+"""This module defines the building blocks of the batch API.
+
+A batch is an iterable of `RequestSpec` objects which are sent concurrently with bounded
+parallelism by `Channel.map`, `AsyncChannel.map` or `hcc.batch`. Every request is retried on
+its own, and its outcome is captured in a `BatchResult`, so one failing request does not abort
+the rest of the batch. The results are yielded as soon as they are available, either in the
+order of the specs or in the order of completion.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+)
+import asyncio
+import requests
+
+from .custom_data_types import DataType, JsonType, HeaderType
+
+
+@dataclass(frozen=True)
+class RequestSpec:
+    """The RequestSpec class describes one request of a batch.
+
+    Attributes:
+        method: The HTTP method of the request (default is "GET").
+        url: The URL of the request (default is None). It is required by `hcc.batch`, and must
+             be None or the URL of the channel in `Channel.map` and `AsyncChannel.map`.
+        params: The query parameters of a GET request (default is None).
+        data: The data to be sent in the body of the request (default is None).
+        json: The JSON data to be sent in the body of the request (default is None).
+        headers: The headers of the request (default is None).
+    """
+
+    method: str = "GET"
+    url: Optional[str] = None
+    params: Optional[Dict[str, str]] = None
+    data: Optional[DataType] = None
+    json: Optional[JsonType] = None
+    headers: Optional[HeaderType] = None
+
+    def arguments(self) -> Dict[str, Any]:
+        """Return the keyword arguments of the matching Channel method."""
+        method = self.method.upper()
+        if method == "GET":
+            return {"params": self.params, "headers": self.headers}
+        if method == "DELETE":
+            return {"headers": self.headers}
+        return {"data": self.data, "json": self.json, "headers": self.headers}
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """The BatchResult class holds the outcome of one request of a batch.
+
+    Attributes:
+        index: The position of the request in the batch.
+        spec: The specification of the request.
+        response: The HTTP response from the first successful or last request, if there was no
+                  exception.
+        exception: The exception raised by the last request, if there was any.
+    """
+
+    index: int
+    spec: RequestSpec
+    response: Optional[requests.Response] = None
+    exception: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the request returned a response instead of raising an exception."""
+        return self.exception is None
+
+
+def _capture(
+    index: int, spec: RequestSpec, send: Callable[[RequestSpec], Any]
+) -> BatchResult:
+    try:
+        return BatchResult(index=index, spec=spec, response=send(spec))
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return BatchResult(index=index, spec=spec, exception=e)
+
+
+async def _async_capture(
+    index: int, spec: RequestSpec, send: Callable[[RequestSpec], Awaitable[Any]]
+) -> BatchResult:
+    try:
+        return BatchResult(index=index, spec=spec, response=await send(spec))
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return BatchResult(index=index, spec=spec, exception=e)
+
+
+def run_batch(
+    send: Callable[[RequestSpec], requests.Response],
+    specs: Iterable[RequestSpec],
+    *,
+    max_workers: int,
+    ordered: bool = True,
+) -> Iterator[BatchResult]:
+    """Send the requests of a batch over a bounded thread pool.
+
+    At most `max_workers` requests are in flight, and the specs are consumed lazily, so the
+    batch can be a generator of any length.
+
+    Args:
+        send: The function that sends one request with retry functionality.
+        specs: The specifications of the requests.
+        max_workers: The maximum number of concurrent requests.
+        ordered: Whether to yield the results in the order of the specs (default is True).
+                 Otherwise the results are yielded in the order of completion.
+
+    Returns:
+        An iterator of the results.
+    """
+    pending: Set[Future[BatchResult]] = set()
+    finished: Dict[int, BatchResult] = {}
+    next_index = 0
+    spec_iterator = enumerate(specs)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while True:
+                for index, spec in spec_iterator:
+                    pending.add(executor.submit(_capture, index, spec, send))
+                    if len(pending) >= max_workers:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if not ordered:
+                        yield result
+                        continue
+                    finished[result.index] = result
+                while next_index in finished:
+                    yield finished.pop(next_index)
+                    next_index += 1
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def async_run_batch(
+    send: Callable[[RequestSpec], Awaitable[requests.Response]],
+    specs: Iterable[RequestSpec],
+    *,
+    max_concurrency: int,
+    ordered: bool = True,
+) -> AsyncIterator[BatchResult]:
+    """Send the requests of a batch concurrently on the running event loop.
+
+    It is the asyncio counterpart of `run_batch`: at most `max_concurrency` requests are in
+    flight, and the specs are consumed lazily.
+
+    Args:
+        send: The coroutine function that sends one request with retry functionality.
+        specs: The specifications of the requests.
+        max_concurrency: The maximum number of concurrent requests.
+        ordered: Whether to yield the results in the order of the specs (default is True).
+                 Otherwise the results are yielded in the order of completion.
+
+    Returns:
+        An asynchronous iterator of the results.
+    """
+
+    pending: Set[asyncio.Task[BatchResult]] = set()
+    finished: Dict[int, BatchResult] = {}
+    next_index = 0
+    spec_iterator = enumerate(specs)
+    try:
+        while True:
+            for index, spec in spec_iterator:
+                pending.add(asyncio.create_task(_async_capture(index, spec, send)))
+                if len(pending) >= max_concurrency:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result = task.result()
+                if not ordered:
+                    yield result
+                    continue
+                finished[result.index] = result
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,459 @@
+"""This module defines the ResponseCache class, an HTTP cache for the GET requests of a Channel.
+
+The cache follows the HTTP caching semantics of a shared cache, as it may be shared by channels
+sending requests on behalf of different users:
+- A 200 response is stored, unless its Cache-Control forbids it with no-store or private. It is
+  fresh for its max-age, or until its Expires date, or for the default TTL of the cache.
+- The response to a request with an Authorization header is only stored if its Cache-Control
+  allows it with public, s-maxage or must-revalidate (RFC 9111, section 3.5).
+- A fresh response is returned without sending a request.
+- A stale response with an ETag or Last-Modified validator is revalidated with a conditional
+  request (If-None-Match / If-Modified-Since), and a 304 Not Modified answer returns the cached
+  body.
+- The responses are kept in a storage bounded by the number of entries, the total size of the
+  bodies, and the maximum TTL of an entry.
+
+The storage is pluggable: any `CacheStorage` implementation can be given to the cache. The
+default `MemoryStorage` is an in-process LRU storage, while `SqliteStorage` persists the
+responses on disk, so they survive restarts and are shared by the processes of a host.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Mapping, Optional
+from urllib.parse import urlencode
+import logging
+import threading
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .custom_data_types import HeaderType
+
+logger = logging.getLogger("hcc.cache")
+
+CACHEABLE_STATUS_CODES = (200,)
+# The directives allowing a response to a request with credentials to be shared.
+AUTHORIZED_SHARING_DIRECTIVES = ("public", "s-maxage", "must-revalidate")
+# The headers of a stored response not updated by a 304 Not Modified, which describes no body.
+NOT_MODIFIED_KEPT_HEADERS = (
+    "Content-Encoding",
+    "Content-Length",
+    "Content-Type",
+    "Transfer-Encoding",
+)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """The CacheEntry class holds a cached response.
+
+    Attributes:
+        url: The URL of the response.
+        status_code: The status code of the response.
+        reason: The reason phrase of the response.
+        headers: The headers of the response, with one value per case-insensitive name.
+        content: The body of the response.
+        stored_at: The Unix time when the response was stored.
+        expires_at: The Unix time until the response is fresh.
+        vary: The values of the request headers listed in the Vary header of the response.
+    """
+
+    url: str
+    status_code: int
+    reason: str
+    headers: Dict[str, str]
+    content: bytes
+    stored_at: float
+    expires_at: float
+    vary: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        """The size of the body in bytes."""
+        return len(self.content)
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """The conditional request headers revalidating the entry."""
+        headers: CaseInsensitiveDict[str] = CaseInsensitiveDict(self.headers)
+        validators = {}
+        if "ETag" in headers:
+            validators["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            validators["If-Modified-Since"] = headers["Last-Modified"]
+        return validators
+
+    def response(self) -> requests.Response:
+        """Build a `requests.Response` from the entry."""
+        headers: CaseInsensitiveDict[str] = CaseInsensitiveDict(self.headers)
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.reason = self.reason
+        response.headers = headers
+        response._content = self.content  # pylint: disable=protected-access
+        response.encoding = get_encoding_from_headers(headers)
+        response.url = self.url
+        return response
+
+
+class CacheStorage(ABC):
+    """The CacheStorage class is the base class of the storages of cache entries.
+
+    The implementations have to be thread-safe, and bound their size by evicting entries.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of entries."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry of a key, or None if there is none."""
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store the entry of a key, and evict entries if needed."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete the entry of a key, if there is one."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Delete every entry."""
+
+
+class MemoryStorage(CacheStorage):
+    """The MemoryStorage class is a thread-safe in-memory LRU storage of cache entries.
+
+    The MemoryStorage class takes the following parameters:
+        max_entries: The maximum number of entries (default is 1024).
+        max_bytes: The maximum total size of the bodies in bytes (default is 32 MiB).
+    """
+
+    def __init__(self, *, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry of a key, or None if there is none."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store the entry of a key, and evict the least recently used entries if needed."""
+        if entry.size > self.max_bytes:
+            self.delete(key)
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        """Delete the entry of a key, if there is one."""
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+@dataclass
+class CacheLookup:
+    """The CacheLookup class holds the outcome of looking up a GET request in the cache.
+
+    Attributes:
+        key: The cache key of the request.
+        headers: The headers to send, including the conditional headers of a stale entry.
+        entry: The stored entry of the request, if there is one.
+        response: The fresh cached response, if there is one. No request is needed then.
+        store: Whether the response of the request may be stored.
+    """
+
+    key: str
+    headers: HeaderType
+    entry: Optional[CacheEntry] = None
+    response: Optional[requests.Response] = None
+    store: bool = True
+
+    @property
+    def conditional(self) -> bool:
+        """Whether the request revalidates a stored entry."""
+        return self.entry is not None and self.response is None
+
+    def retry_check(
+        self, is_retry_needed: Callable[[requests.Response], bool]
+    ) -> Optional[Callable[[requests.Response], bool]]:
+        """Return the retry check of the request.
+
+        A conditional request is not retried when the server answers 304 Not Modified.
+
+        Args:
+            is_retry_needed: The retry check of the channel.
+
+        Returns:
+            The retry check of a conditional request, or None if the request is not
+            conditional, which means the retry check of the channel.
+        """
+        if not self.conditional:
+            return None
+        return lambda response: (
+            response.status_code != 304 and is_retry_needed(response)
+        )
+
+
+class ResponseCache:
+    """The ResponseCache class is an HTTP cache of the GET responses of Channels.
+
+    The ResponseCache class takes the following parameters:
+        max_entries: The maximum number of cached responses (default is 1024).
+        max_bytes: The maximum total size of the cached bodies in bytes (default is 32 MiB).
+        default_ttl: The freshness lifetime in seconds of the responses without max-age or
+                     Expires (default is 0.0, which means they are always revalidated).
+        max_ttl: The maximum number of seconds a response is kept, fresh or stale
+                 (default is 86400.0).
+        storage: The storage of the responses (default is None, which means a MemoryStorage
+                 bounded by max_entries and max_bytes).
+
+    Attributes:
+        hits: The number of requests answered by a fresh cached response.
+        misses: The number of requests answered by the server with a full response.
+        revalidations: The number of requests answered by a cached response after a 304.
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, ResponseCache
+
+    cache = ResponseCache(max_entries=256, default_ttl=5.0)
+    channel = Channel(url="https://api.example.com/config", cache=cache)
+    channel.get()
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        default_ttl: float = 0.0,
+        max_ttl: float = 86400.0,
+        storage: Optional[CacheStorage] = None,
+    ):
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.storage = (
+            storage
+            if storage is not None
+            else MemoryStorage(max_entries=max_entries, max_bytes=max_bytes)
+        )
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"ResponseCache(entries={len(self.storage)}, hits={self.hits}, "
+            f"misses={self.misses}, revalidations={self.revalidations})"
+        )
+
+    @staticmethod
+    def key(url: str, params: Optional[Mapping[str, str]] = None) -> str:
+        """Return the cache key of a GET request."""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def lookup(
+        self,
+        url: str,
+        params: Optional[Mapping[str, str]] = None,
+        headers: Optional[HeaderType] = None,
+    ) -> CacheLookup:
+        """Look up a GET request in the cache.
+
+        Args:
+            url: The URL of the request.
+            params: The query parameters of the request (default is None).
+            headers: The headers of the request (default is None).
+
+        Returns:
+            The outcome of the lookup.
+        """
+        headers = headers or {}
+        request_directives = _cache_control(CaseInsensitiveDict(headers))
+        key = self.key(url, params)
+        if "no-store" in request_directives:
+            return CacheLookup(key=key, headers=headers, store=False)
+        now = time.time()
+        entry = self.storage.get(key)
+        if entry is not None and now - entry.stored_at > self.max_ttl:
+            self.storage.delete(key)
+            entry = None
+        if entry is None or not _vary_matches(entry, headers):
+            return CacheLookup(key=key, headers=headers)
+        if now < entry.expires_at and "no-cache" not in request_directives:
+            self._count("hits")
+            logger.debug("Cache hit: %s", key)
+            return CacheLookup(
+                key=key, headers=headers, entry=entry, response=entry.response()
+            )
+        if not entry.validators:
+            return CacheLookup(key=key, headers=headers)
+        return CacheLookup(
+            key=key, headers={**headers, **entry.validators}, entry=entry
+        )
+
+    def complete(
+        self, lookup: CacheLookup, response: requests.Response
+    ) -> requests.Response:
+        """Update the cache with the response of a request.
+
+        Args:
+            lookup: The outcome of the lookup of the request.
+            response: The response of the request.
+
+        Returns:
+            The cached response if the server answered 304 Not Modified, otherwise the
+            response itself.
+        """
+        if lookup.entry is not None and response.status_code == 304:
+            self._count("revalidations")
+            logger.debug("Cache revalidated: %s", lookup.key)
+            # The headers of the 304 replace the stored ones whatever the case of their names,
+            # except the ones describing the body, and the freshness lifetime is the one of
+            # the merged headers, as a 304 may omit Cache-Control and Expires.
+            headers: CaseInsensitiveDict[str] = CaseInsensitiveDict(
+                lookup.entry.headers
+            )
+            headers.pop("Age", None)
+            headers.update(
+                (name, value)
+                for name, value in response.headers.items()
+                if name.title() not in NOT_MODIFIED_KEPT_HEADERS
+            )
+            now = time.time()
+            entry = replace(
+                lookup.entry,
+                headers=dict(headers),
+                stored_at=now,
+                expires_at=now + self._lifetime(headers),
+            )
+            self.storage.set(lookup.key, entry)
+            return entry.response()
+        self._count("misses")
+        if response.status_code not in CACHEABLE_STATUS_CODES:
+            return response
+        stored = self._entry(lookup, response) if lookup.store else None
+        if stored is None:
+            self.storage.delete(lookup.key)
+        else:
+            self.storage.set(lookup.key, stored)
+        return response
+
+    def clear(self) -> None:
+        """Delete every cached response."""
+        self.storage.clear()
+
+    def _entry(
+        self, lookup: CacheLookup, response: requests.Response
+    ) -> Optional[CacheEntry]:
+        """Create the entry of a response, or return None if it may not be stored."""
+        headers: CaseInsensitiveDict[str] = CaseInsensitiveDict(response.headers)
+        directives = _cache_control(headers)
+        vary = [
+            name.strip() for name in headers.get("Vary", "").split(",") if name.strip()
+        ]
+        if "no-store" in directives or "private" in directives or "*" in vary:
+            return None
+        if "Authorization" in CaseInsensitiveDict(lookup.headers) and not any(
+            name in directives for name in AUTHORIZED_SHARING_DIRECTIVES
+        ):
+            return None
+        now = time.time()
+        lifetime = self._lifetime(headers)
+        entry = CacheEntry(
+            url=response.url or lookup.key,
+            status_code=response.status_code,
+            reason=response.reason or "",
+            headers=dict(headers),
+            content=response.content,
+            stored_at=now,
+            expires_at=now + lifetime,
+            vary={name: CaseInsensitiveDict(lookup.headers).get(name) for name in vary},
+        )
+        if lifetime <= 0 and not entry.validators:
+            return None
+        return entry
+
+    def _lifetime(self, headers: Mapping[str, str]) -> float:
+        """Return the freshness lifetime of a response in seconds."""
+        headers = CaseInsensitiveDict(headers)
+        directives = _cache_control(headers)
+        if "no-cache" in directives:
+            lifetime = 0.0
+        elif _is_number(directives.get("max-age")):
+            lifetime = float(directives["max-age"] or 0)
+        elif "Expires" in headers:
+            expires = _parse_http_date(headers["Expires"])
+            date = _parse_http_date(headers.get("Date", "")) or time.time()
+            lifetime = expires - date if expires is not None else 0.0
+        else:
+            lifetime = self.default_ttl
+        age = headers.get("Age", "0")
+        lifetime -= float(age) if _is_number(age) else 0.0
+        return min(max(0.0, lifetime), self.max_ttl)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def _cache_control(headers: Mapping[str, str]) -> Dict[str, Optional[str]]:
+    """Parse the directives of the Cache-Control header."""
+    directives: Dict[str, Optional[str]] = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def _vary_matches(entry: CacheEntry, headers: HeaderType) -> bool:
+    request_headers = CaseInsensitiveDict(headers)
+    return all(request_headers.get(name) == value for name, value in entry.vary.items())
+
+
+def _is_number(value: Optional[str]) -> bool:
+    return value is not None and value.strip().isdigit()
+
+
+def _parse_http_date(value: str) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
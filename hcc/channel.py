@@ -5,11 +5,33 @@ The Channel class provides methods for sending HTTP requests (GET, POST, PUT, DE
 and automatically retries requests in case of failure, based on a configurable retry policy.
 """
 
-from typing import Callable, Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from types import TracebackType
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Dict
 import logging
 import requests
-from .retry import retry_function, RetryPolicy
+from .balancer import LoadBalancer
+from .cache import ResponseCache
+from .coalescing import RequestCoalescer
+from .batch import BatchResult, RequestSpec, run_batch
+from .retry import retry_function, RetryPolicyType
 from .custom_data_types import DataType, JsonType, HeaderType
+from .retry_budget import RetryBudget
+from .circuit_breaker import CircuitBreaker
+from .compression import RequestCompression
+from .concurrency import ConcurrencyLimiter
+from .deadline import Deadline, attempt_arguments
+from .hedging import HedgePolicy
+from .json_codec import JsonCodec, decode_json
+from .rate_limit import RateLimiter
+from .log_policy import DEFAULT_LOG_POLICY, LogPolicy
+from .metrics import Metrics
+from .request_preparation import prepare_body, record_bytes
+from .retry_after import retry_after_hint
+from .session_pool import connection_usage, create_session
+from .streaming import StreamedResponse
 
 
 logger = logging.getLogger("hcc.request")
@@ -24,20 +46,72 @@ class Channel:
     policies, and delay between retries.
 
     The Channel class takes the following parameters:
-        url: The URL to which the requests will be sent.
+        url: The URL to which the requests will be sent. With a load balancer, it is the path
+             appended to the base URL of the endpoint of every attempt.
         timeout: The timeout for the requests (default is 2.0 seconds).
         max_retry_count: The maximum number of retries for failed requests (default is 5).
                          If set to None, there is no limit on the number of retries.
         retry_policy: The retry policy for failed requests (default is None).
+                      It is either a RetryPolicy or a BackoffStrategy.
         base_delay: The base delay for retries in milliseconds (default is None).
+        multiplier: The growth factor of the exponential retry policies (default is None).
+        max_delay: The cap of the retry delay in milliseconds (default is None).
+        retry_budget: The retry budget limiting the retries of the channel (default is None).
+                      It can be shared between channels.
+        circuit_breaker: The circuit breaker guarding the attempts of the channel
+                         (default is None). It can be shared by the channels of a host.
+        max_retry_after: The cap of the delay requested by the Retry-After or rate limit
+                         headers of a failed response in seconds (default is 60.0).
+        deadline: The total time budget of a call in seconds, including every retry and the
+                  delays between them (default is None, which means no deadline). The timeout
+                  of every attempt is shrunk to the remaining time.
+        deadline_header: The name of the header carrying the remaining time of the deadline
+                         in milliseconds to the server (default is None, which means no
+                         header).
+        hedging: The hedge policy of the idempotent requests (default is None, which means
+                 no hedging).
+        log_policy: The policy of logging the request bodies and headers (default is None,
+                    which means full bodies and redacted credential headers).
+        cache: The HTTP cache of the GET requests (default is None, which means no caching).
+               It can be shared between channels.
+        coalescing: The coalescer sharing one call between identical concurrent GET requests
+                    (default is None, which means no coalescing).
+        rate_limiter: The rate limiter which every attempt of the channel waits for
+                      (default is None, which means no rate limit). It can be shared between
+                      channels, for example by the channels of one host.
+        concurrency_limiter: The adaptive limiter of the concurrent attempts of the channel
+                             (default is None, which means no limit besides the pool). It can
+                             be shared between channels.
+        balancer: The load balancer spreading the attempts over the base URLs of several
+                  endpoints (default is None, which means the URL is used as is). A retry is
+                  sent to another endpoint than the failed attempt, while there is one.
+        metrics: The metrics of the calls and the attempts of the channel (default is None,
+                 which means no metrics). It can be shared between channels.
+        compression: The compression of the request bodies above a size threshold (default is
+                     None, which means the bodies are sent as is).
+        json_codec: The codec serializing the JSON data of the requests once per call, and
+                    decoding the responses of `decode_json` (default is None, which means
+                    the JSON data is serialized by the `json` module of the standard library,
+                    and `response.json()` decodes the responses). `fastest_json_codec()`
+                    returns the fastest installed codec.
+        pool_connections: The number of per-host connection pools to cache (default is 10).
+        pool_maxsize: The maximum number of connections kept alive per host (default is 10).
+        pool_block: Whether to block when no free connection is available instead of
+                    opening a new, non-pooled one (default is False).
+        session: A shared session to send the requests with (default is None).
+                 If set, the pool parameters are ignored and `close()` leaves the session open.
+
+    Unless a shared session is given, every Channel owns a `requests.Session`, so keep-alive
+    connections are reused across requests and retries. Call `close()` or use the Channel as a
+    context manager to release the pooled connections.
 
     Typical usage example:
     ```python
     from hcc import Channel
 
-    channel = Channel(url="https://api.example.com")
-    response = channel.get()
-    print(response.json())
+    with Channel(url="https://api.example.com") as channel:
+        response = channel.get()
+        print(response.json())
     ```
     """
 
@@ -47,18 +121,77 @@ class Channel:
         url: str,
         timeout: float = 2.0,
         max_retry_count: Optional[int] = 5,
-        retry_policy: Optional[RetryPolicy] = None,
+        retry_policy: Optional[RetryPolicyType] = None,
         base_delay: Optional[int] = None,
+        multiplier: Optional[float] = None,
+        max_delay: Optional[int] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        max_retry_after: Optional[float] = 60.0,
+        deadline: Optional[float] = None,
+        deadline_header: Optional[str] = None,
+        hedging: Optional[HedgePolicy] = None,
+        log_policy: Optional[LogPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        coalescing: Optional[RequestCoalescer] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        balancer: Optional[LoadBalancer] = None,
+        metrics: Optional[Metrics] = None,
+        compression: Optional[RequestCompression] = None,
+        json_codec: Optional[JsonCodec] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        session: Optional[requests.Session] = None,
     ):
         self.url = url
         self.timeout = timeout
         self.max_retry_count = max_retry_count
         self.retry_policy = retry_policy
         self.base_delay = base_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.circuit_breaker = circuit_breaker
+        self.max_retry_after = max_retry_after
+        self.deadline = deadline
+        self.deadline_header = deadline_header
+        self.hedging = hedging
+        self.log_policy = log_policy or DEFAULT_LOG_POLICY
+        self.cache = cache
+        self.coalescing = coalescing
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.balancer = balancer
+        self.metrics = metrics
+        self.compression = compression
+        self.json_codec = json_codec
+        self.pool_maxsize = pool_maxsize
         self.success_status_codes = [200, 201]
         self.is_retry_needed: Callable[[requests.Response], bool] = (
             lambda response: response.status_code not in self.success_status_codes
         )
+        self._owns_session = session is None
+        if balancer is not None:
+            # Every endpoint keeps its own pool of connections.
+            pool_connections = max(pool_connections, len(balancer.endpoints))
+        self.session = session or create_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        if metrics is not None:
+            metrics.add_gauge("pool_in_use", self._pool_in_use)
+            metrics.add_gauge("pool_capacity", self._pool_capacity)
+            if concurrency_limiter is not None:
+                metrics.add_gauge("concurrency_limit", self._concurrency_limit)
+                metrics.add_gauge("concurrency_inflight", self._concurrency_inflight)
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        if hedging is not None:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=2 * pool_maxsize, thread_name_prefix="hcc-hedge"
+            )
         logger.info(
             (
                 "Channel created: id: %s, URL: %s, timeout: %s, "
@@ -72,6 +205,200 @@ class Channel:
             self.base_delay,
         )
 
+    def __enter__(self) -> "Channel":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """The close method closes the session and its pooled connections.
+
+        A shared session given at construction is left open.
+        """
+        if self._owns_session:
+            self.session.close()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        if self.metrics is not None:
+            self.metrics.remove_gauge("pool_in_use", self._pool_in_use)
+            self.metrics.remove_gauge("pool_capacity", self._pool_capacity)
+            if self.concurrency_limiter is not None:
+                self.metrics.remove_gauge("concurrency_limit", self._concurrency_limit)
+                self.metrics.remove_gauge(
+                    "concurrency_inflight", self._concurrency_inflight
+                )
+        logger.info("Channel closed: id: %s", id(self))
+
+    def _pool_in_use(self) -> int:
+        """Return the number of the connections of the session in use."""
+        return connection_usage(self.session)[0]
+
+    def _pool_capacity(self) -> int:
+        """Return the total size of the connection pools of the session."""
+        return connection_usage(self.session)[1]
+
+    def _concurrency_limit(self) -> int:
+        """Return the number of concurrent attempts allowed by the concurrency limiter."""
+        assert self.concurrency_limiter is not None
+        return self.concurrency_limiter.limit
+
+    def _concurrency_inflight(self) -> int:
+        """Return the number of attempts in flight in the concurrency limiter."""
+        assert self.concurrency_limiter is not None
+        return self.concurrency_limiter.inflight
+
+    def decode_json(self, response: requests.Response) -> Any:
+        """The decode_json method deserializes the JSON body of a response.
+
+        Args:
+            response: The response of a request of the channel.
+
+        Returns:
+            The JSON data, decoded by the JSON codec of the channel if there is one.
+
+        Raises:
+            ValueError: If the body is not valid JSON.
+        """
+        return decode_json(response, self.json_codec)
+
+    def _send(
+        self,
+        method: str,
+        is_retry_needed: Optional[Callable[[requests.Response], bool]] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send a request through the session of the channel with retry functionality.
+
+        Args:
+            method: The HTTP method of the request.
+            is_retry_needed: The function that determines if a retry is needed (default is
+                             None, which means the `is_retry_needed` of the channel).
+            **kwargs: Additional arguments passed to `requests.Session.request`. With
+                      `stream=True`, the requests are not hedged, and the response of every
+                      failed attempt is closed. A file object or a generator as `data` is
+                      rewound or spooled before every attempt, and is not hedged either.
+
+        Returns:
+            The HTTP response from the first successful or last request.
+        """
+        deadline = None if self.deadline is None else Deadline(self.deadline)
+        stream = kwargs.get("stream", False)
+        opened: List[requests.Response] = []
+        prepared, body = prepare_body(
+            kwargs,
+            json_codec=self.json_codec,
+            compression=self.compression,
+            replay=self.max_retry_count != 1,
+        )
+
+        def send(url: str) -> requests.Response:
+            # The body of a failed streamed attempt is not read, so its connection is released
+            # before the retry.
+            while opened:
+                opened.pop().close()
+            body.rewind()
+            response = self.session.request(
+                method,
+                url,
+                **attempt_arguments(
+                    kwargs,
+                    timeout=self.timeout,
+                    deadline=deadline,
+                    header=self.deadline_header,
+                ),
+            )
+            if stream:
+                opened.append(response)
+            record_bytes(self.metrics, prepared, None if stream else response)
+            return response
+
+        func: Callable[[], requests.Response] = partial(send, self.url)
+        if self.balancer is not None:
+            func = partial(self.balancer.call, self.url, send, [])
+        if self.concurrency_limiter is not None:
+            func = partial(self.concurrency_limiter.call, func, deadline)
+        if (
+            self.hedging is not None
+            and self._hedge_executor is not None
+            and self.hedging.applies_to(method)
+            and not stream
+            and not body.streamed
+        ):
+            func = partial(self.hedging.call, func, self._hedge_executor)
+        is_retry_needed = is_retry_needed or self.is_retry_needed
+        send_call = partial(
+            retry_function,
+            func=func,
+            is_retry_needed=is_retry_needed,
+            # A body too large to be spooled can only be sent once.
+            max_retry_count=self.max_retry_count if body.replayable else 1,
+            retry_policy=self.retry_policy,
+            base_delay=self.base_delay,
+            multiplier=self.multiplier,
+            max_delay=self.max_delay,
+            retry_budget=self.retry_budget,
+            circuit_breaker=self.circuit_breaker,
+            retry_after=retry_after_hint,
+            max_retry_after=self.max_retry_after,
+            deadline=deadline,
+            rate_limiter=self.rate_limiter,
+            metrics=self.metrics,
+        )
+        try:
+            if self.metrics is None:
+                return send_call()
+            return self.metrics.call(send_call, is_retry_needed)
+        except BaseException:
+            while opened:
+                opened.pop().close()
+            raise
+        finally:
+            body.close()
+
+    def map(
+        self,
+        specs: Iterable[RequestSpec],
+        *,
+        max_workers: Optional[int] = None,
+        ordered: bool = True,
+    ) -> Iterator[BatchResult]:
+        """The map method sends a batch of requests concurrently over a bounded thread pool.
+
+        Every request is sent by the method of the channel matching its HTTP method, so it is
+        retried on its own and reuses the connection pool of the channel. Exceptions are
+        captured in the results instead of aborting the batch.
+
+        Args:
+            specs: The specifications of the requests. Their URL must be None or the URL of
+                the channel.
+            max_workers: The maximum number of concurrent requests (default is None, which means
+                the `pool_maxsize` of the channel, so every thread can keep a connection alive).
+            ordered: Whether to yield the results in the order of the specs (default is True).
+                Otherwise the results are yielded in the order of completion.
+
+        Returns:
+            An iterator of the results.
+        """
+        return run_batch(
+            self._send_spec,
+            specs,
+            max_workers=max_workers or self.pool_maxsize,
+            ordered=ordered,
+        )
+
+    def _send_spec(self, spec: RequestSpec) -> requests.Response:
+        assert spec.url is None or spec.url == self.url, (
+            "The URL of the request must match the URL of the channel"
+        )
+        method_to_call = getattr(self, spec.method.lower())
+        return method_to_call(**spec.arguments())
+
     def get(
         self,
         *,
@@ -94,26 +421,95 @@ class Channel:
             params = {}
         if headers is None:
             headers = {}
-        logger.info(
-            "GET request: channel: %s, params: %s, headers: %s",
-            id(self),
-            params,
-            headers,
-        )
-        response = retry_function(
-            func=lambda: requests.get(
-                self.url,
-                timeout=self.timeout,
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "GET request: channel: %s, params: %s, headers: %s",
+                id(self),
+                params,
+                self.log_policy.headers(headers),
+            )
+        if self.coalescing is None:
+            response = self._get(params, headers)
+        else:
+            response = self.coalescing.call(
+                self.coalescing.key("GET", self.url, params, headers),
+                partial(self._get, params, headers),
+            )
+        logger.info("GET response: %s", response)
+        return response
+
+    @contextmanager
+    def stream_get(
+        self,
+        *,
+        params: Optional[Dict[str, str]] = None,
+        headers: Optional[HeaderType] = None,
+        max_body_size: Optional[int] = None,
+    ) -> Iterator[StreamedResponse]:
+        """The stream_get method sends a GET request and streams the body of its response.
+
+        The response is returned as soon as its headers have arrived, and its body is read in
+        chunks by the caller. The retries only cover the connection and the status of the
+        response, not a broken body. The cache and the coalescing of the channel are bypassed.
+        The connection is released when the context is exited.
+
+        Args:
+            params: The query parameters for the request (default is an empty dictionary).
+            headers: The headers for the request (default is an empty dictionary).
+            max_body_size: The maximum number of bytes of the decoded body (default is None,
+                           which means no limit).
+
+        Returns:
+            A context manager of the streamed response of the first successful or last
+            request.
+
+        Raises:
+            ResponseTooLargeError: If the body of the response exceeds the max body size.
+            Exception: If the maximum retry count is reached and the request still fails.
+        """
+        if params is None:
+            params = {}
+        if headers is None:
+            headers = {}
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "GET stream request: channel: %s, params: %s, headers: %s",
+                id(self),
+                params,
+                self.log_policy.headers(headers),
+            )
+        response = self._send("GET", params=params, headers=headers, stream=True)
+        logger.info("GET stream response: %s", response)
+        with StreamedResponse(
+            response, max_body_size=max_body_size, metrics=self.metrics
+        ) as streamed:
+            yield streamed
+
+    def _get(self, params: Dict[str, str], headers: HeaderType) -> requests.Response:
+        """Send a GET request, through the cache of the channel if there is one."""
+        if self.cache is None:
+            return self._send(
+                "GET",
                 params=params,
                 headers=headers,
-            ),
-            is_retry_needed=self.is_retry_needed,
-            max_retry_count=self.max_retry_count,
-            retry_policy=self.retry_policy,
-            base_delay=self.base_delay,
+            )
+        return self._cached_get(params, headers)
+
+    def _cached_get(
+        self, params: Dict[str, str], headers: HeaderType
+    ) -> requests.Response:
+        """Send a GET request through the cache of the channel."""
+        assert self.cache is not None
+        lookup = self.cache.lookup(self.url, params, headers)
+        if lookup.response is not None:
+            return lookup.response
+        response = self._send(
+            "GET",
+            is_retry_needed=lookup.retry_check(self.is_retry_needed),
+            params=params,
+            headers=lookup.headers,
         )
-        logger.info("GET response: %s", response)
-        return response
+        return self.cache.complete(lookup, response)
 
     def post(
         self,
@@ -145,25 +541,19 @@ class Channel:
             data = None
         if headers is None:
             headers = {}
-        logger.info(
-            "POST request: channel: %s, data: %s, json: %s, headers: %s",
-            id(self),
-            data,
-            json,
-            headers,
-        )
-        response = retry_function(
-            func=lambda: requests.post(
-                self.url,
-                timeout=self.timeout,
-                data=data,
-                json=json,
-                headers=headers,
-            ),
-            is_retry_needed=self.is_retry_needed,
-            max_retry_count=self.max_retry_count,
-            retry_policy=self.retry_policy,
-            base_delay=self.base_delay,
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "POST request: channel: %s, data: %s, json: %s, headers: %s",
+                id(self),
+                self.log_policy.body(data),
+                self.log_policy.body(json),
+                self.log_policy.headers(headers),
+            )
+        response = self._send(
+            "POST",
+            data=data,
+            json=json,
+            headers=headers,
         )
         logger.info("POST response: %s", response)
         return response
@@ -198,25 +588,19 @@ class Channel:
             data = None
         if headers is None:
             headers = {}
-        logger.info(
-            "PUT request: channel: %s, data: %s, json: %s, headers: %s",
-            id(self),
-            data,
-            json,
-            headers,
-        )
-        response = retry_function(
-            func=lambda: requests.put(
-                self.url,
-                timeout=self.timeout,
-                data=data,
-                json=json,
-                headers=headers,
-            ),
-            is_retry_needed=self.is_retry_needed,
-            max_retry_count=self.max_retry_count,
-            retry_policy=self.retry_policy,
-            base_delay=self.base_delay,
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "PUT request: channel: %s, data: %s, json: %s, headers: %s",
+                id(self),
+                self.log_policy.body(data),
+                self.log_policy.body(json),
+                self.log_policy.headers(headers),
+            )
+        response = self._send(
+            "PUT",
+            data=data,
+            json=json,
+            headers=headers,
         )
         logger.info("PUT response: %s", response)
         return response
@@ -239,21 +623,15 @@ class Channel:
         """
         if headers is None:
             headers = {}
-        logger.info(
-            "DELETE request: channel: %s, headers: %s",
-            id(self),
-            headers,
-        )
-        response = retry_function(
-            func=lambda: requests.delete(
-                self.url,
-                timeout=self.timeout,
-                headers=headers,
-            ),
-            is_retry_needed=self.is_retry_needed,
-            max_retry_count=self.max_retry_count,
-            retry_policy=self.retry_policy,
-            base_delay=self.base_delay,
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "DELETE request: channel: %s, headers: %s",
+                id(self),
+                self.log_policy.headers(headers),
+            )
+        response = self._send(
+            "DELETE",
+            headers=headers,
         )
         logger.info("DELETE response: %s", response)
         return response
@@ -288,25 +666,19 @@ class Channel:
             data = None
         if headers is None:
             headers = {}
-        logger.info(
-            "PATCH request: channel: %s, data: %s, json: %s, headers: %s",
-            id(self),
-            data,
-            json,
-            headers,
-        )
-        response = retry_function(
-            func=lambda: requests.patch(
-                self.url,
-                timeout=self.timeout,
-                data=data,
-                json=json,
-                headers=headers,
-            ),
-            is_retry_needed=self.is_retry_needed,
-            max_retry_count=self.max_retry_count,
-            retry_policy=self.retry_policy,
-            base_delay=self.base_delay,
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "PATCH request: channel: %s, data: %s, json: %s, headers: %s",
+                id(self),
+                self.log_policy.body(data),
+                self.log_policy.body(json),
+                self.log_policy.headers(headers),
+            )
+        response = self._send(
+            "PATCH",
+            data=data,
+            json=json,
+            headers=headers,
         )
         logger.info("PATCH response: %s", response)
         return response
@@ -0,0 +1,178 @@
+"""This module defines the CircuitBreaker class, which rejects requests to a failing dependency.
+
+The circuit breaker is a state machine in front of every attempt of `retry_function`:
+- CLOSED: The attempts are let through, and their outcomes are recorded in a sliding window.
+          When the failure rate of the window reaches the threshold, the circuit opens.
+- OPEN: The attempts are rejected immediately with a `CircuitOpenError`. After the cooldown
+        the circuit becomes half-open.
+- HALF_OPEN: A limited number of probe attempts are let through. If all of them succeed, the
+             circuit closes, and if any of them fails, the circuit opens again.
+
+A circuit breaker can be attached to one Channel, or shared by the Channels of one host.
+"""
+
+from collections import deque
+from enum import Enum
+from typing import Deque
+import logging
+import threading
+import time
+
+from .exceptions import CircuitOpenError
+
+logger = logging.getLogger("hcc.circuit")
+
+
+class CircuitState(Enum):
+    """The CircuitState enum defines the states of a circuit breaker."""
+
+    CLOSED = 1
+    OPEN = 2
+    HALF_OPEN = 3
+
+
+class CircuitBreaker:
+    """The CircuitBreaker class is a thread-safe circuit breaker with a sliding window.
+
+    The CircuitBreaker class takes the following parameters:
+        failure_rate_threshold: The failure rate of the window which opens the circuit
+                                (default is 0.5).
+        window_size: The number of the most recent outcomes in the sliding window (default is 20).
+        minimum_calls: The number of outcomes needed before the failure rate is evaluated
+                       (default is 10).
+        cooldown: The number of seconds the circuit stays open (default is 30.0).
+        half_open_max_calls: The number of probe attempts let through in the half-open state
+                             (default is 1).
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, CircuitBreaker
+
+    breaker = CircuitBreaker(failure_rate_threshold=0.5, cooldown=10.0)
+    channel = Channel(url="https://api.example.com", circuit_breaker=breaker)
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        cooldown: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.cooldown = cooldown
+        self.half_open_max_calls = half_open_max_calls
+        self._window: Deque[bool] = deque(maxlen=window_size)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"CircuitBreaker(state={self.state.name}, "
+            f"failure_rate_threshold={self.failure_rate_threshold}, "
+            f"cooldown={self.cooldown})"
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state of the circuit."""
+        with self._lock:
+            self._check_cooldown()
+            return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        """The failure rate of the sliding window."""
+        with self._lock:
+            return self._failure_rate()
+
+    def acquire(self) -> bool:
+        """Ask permission for an attempt.
+
+        Returns:
+            True if the attempt is a probe of the half-open circuit. The outcome of a probe
+            has to be recorded, or the probe released if the attempt is abandoned.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or the half-open circuit has no free
+                              probe.
+        """
+        with self._lock:
+            self._check_cooldown()
+            if self._state == CircuitState.CLOSED:
+                return False
+            if (
+                self._state == CircuitState.HALF_OPEN
+                and self._probes < self.half_open_max_calls
+            ):
+                self._probes += 1
+                return True
+            state = self._state
+            remaining = max(0.0, self._opened_at + self.cooldown - time.monotonic())
+        raise CircuitOpenError(
+            f"Circuit is {state.name}, retry in {remaining:.3f} seconds",
+            remaining=remaining,
+        )
+
+    def release_probe(self) -> None:
+        """Release the probe of an attempt abandoned without an outcome.
+
+        A probe cancelled or rejected before its outcome is known is neither a success nor a
+        failure, so its slot is given to the next attempt.
+        """
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        """Record a successful attempt."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_max_calls:
+                    self._transition(CircuitState.CLOSED)
+                return
+            self._window.append(True)
+
+    def record_failure(self) -> None:
+        """Record a failed attempt."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._transition(CircuitState.OPEN)
+                return
+            self._window.append(False)
+            if (
+                self._state == CircuitState.CLOSED
+                and len(self._window) >= self.minimum_calls
+                and self._failure_rate() >= self.failure_rate_threshold
+            ):
+                self._transition(CircuitState.OPEN)
+
+    def _failure_rate(self) -> float:
+        if not self._window:
+            return 0.0
+        return self._window.count(False) / len(self._window)
+
+    def _check_cooldown(self) -> None:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.cooldown
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        logger.warning("Circuit %s: %s -> %s", id(self), self._state.name, state.name)
+        self._state = state
+        self._probes = 0
+        self._probe_successes = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CircuitState.CLOSED:
+            self._window.clear()
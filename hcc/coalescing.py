@@ -0,0 +1,147 @@
+"""This module defines the RequestCoalescer class, which collapses identical concurrent GETs.
+
+When many callers request the same resource at the same time, only the first one (the leader)
+sends the request with its whole retry loop, and the others wait for its outcome. Every caller
+gets the same response object, or the same exception. Requests are identical if their method,
+URL, query parameters, credentials (the Authorization and Cookie headers) and the selected
+headers are equal, so the response of one caller is never shared with a caller using other
+credentials.
+
+Coalescing is only applied to the GET requests of a Channel, as they are safe to share. The
+shared response is fully read, but it is the same object for every caller, so it should not be
+modified.
+"""
+
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Mapping, Optional
+import asyncio
+import logging
+import threading
+
+from .custom_data_types import HeaderType
+
+logger = logging.getLogger("hcc.request")
+
+# The request headers always distinguishing requests, as the responses depend on the caller.
+CREDENTIAL_HEADERS = ("authorization", "cookie")
+
+
+class RequestCoalescer:
+    """The RequestCoalescer class shares one in-flight call between identical requests.
+
+    The RequestCoalescer class takes the following parameters:
+        headers: The names of the request headers which distinguish requests, such as Accept,
+                 in addition to Authorization and Cookie (default is none). The other headers
+                 are ignored.
+
+    Attributes:
+        calls: The number of calls actually made.
+        collapsed: The number of calls which waited for the outcome of an identical call.
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, RequestCoalescer
+
+    channel = Channel(
+        url="https://api.example.com/config",
+        coalescing=RequestCoalescer(headers=["Accept"]),
+    )
+    ```
+    """
+
+    def __init__(self, *, headers: Iterable[str] = ()):
+        self.headers = tuple(
+            sorted({*CREDENTIAL_HEADERS, *(name.lower() for name in headers)})
+        )
+        self.calls = 0
+        self.collapsed = 0
+        self._flights: Dict[Hashable, Future[Any]] = {}
+        self._tasks: Dict[Hashable, asyncio.Future[Any]] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"RequestCoalescer(calls={self.calls}, collapsed={self.collapsed})"
+
+    def key(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, str]] = None,
+        headers: Optional[HeaderType] = None,
+    ) -> Hashable:
+        """Return the key identifying a request."""
+        lowered = {name.lower(): value for name, value in (headers or {}).items()}
+        return (
+            method.upper(),
+            url,
+            tuple(sorted((params or {}).items())),
+            tuple(lowered.get(name) for name in self.headers),
+        )
+
+    def call(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Call a function, unless an identical call is in flight, then wait for its outcome.
+
+        Args:
+            key: The key of the request.
+            func: The function sending the request.
+
+        Returns:
+            The result of the shared call.
+
+        Raises:
+            Exception: The exception of the shared call.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = Future()
+                self.calls += 1
+                leader = True
+            else:
+                self.collapsed += 1
+                leader = False
+        if not leader:
+            logger.debug("Request coalesced: %s", key)
+            return flight.result()
+        try:
+            result = func()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    async def async_call(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Await a coroutine function, unless an identical call is in flight.
+
+        It is the asyncio counterpart of `call`. The shared call runs in its own task, so it
+        is not cancelled with the caller which started it.
+
+        Args:
+            key: The key of the request.
+            func: The coroutine function sending the request.
+
+        Returns:
+            The result of the shared call.
+
+        Raises:
+            Exception: The exception of the shared call.
+        """
+        flight_key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(flight_key)
+        if task is None:
+            task = self._tasks[flight_key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._tasks.pop(flight_key, None))
+            with self._lock:
+                self.calls += 1
+        else:
+            with self._lock:
+                self.collapsed += 1
+            logger.debug("Request coalesced: %s", key)
+        return await asyncio.shield(task)
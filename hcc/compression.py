@@ -0,0 +1,186 @@
+"""This module defines the RequestCompression class, which compresses the request bodies.
+
+Large JSON and text payloads compress well, so compressing them saves bandwidth between zones
+at the cost of a little CPU. A body is compressed once per call, before the first attempt, and
+the compressed bytes are resent by every retry. Only the bodies given as bytes, a string or
+JSON data are compressed; form fields and streamed bodies are sent as is.
+
+The supported content codings are gzip and deflate, and zstd where the standard library
+provides it (from Python 3.14). The responses are decompressed transparently: by urllib3 for
+the Channel class, incrementally while a streamed body is read, and by the StreamTransport for
+the AsyncChannel class.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+import importlib
+import json as jsonlib
+import zlib
+
+import requests
+
+from .custom_data_types import HeaderType
+
+try:  # pragma: no cover
+    zstd: Any = importlib.import_module("compression.zstd")
+except ImportError:  # pragma: no cover
+    zstd = None
+
+ENCODINGS = ("gzip", "deflate") + (("zstd",) if zstd is not None else ())
+
+# The window bits of zlib for a gzip stream, a zlib stream, or the detection of both.
+WBITS = {"gzip": 31, "deflate": 15, "auto": 47}
+
+
+@dataclass(frozen=True)
+class PreparedBody:
+    """The PreparedBody class is a request body encoded once for every attempt of a call.
+
+    Attributes:
+        data: The bytes sent on the wire, compressed or not.
+        headers: The headers of the request, with the Content-Type of JSON data and the
+                 Content-Encoding of a compressed body.
+        size: The number of bytes of the uncompressed body.
+    """
+
+    data: bytes
+    headers: HeaderType
+    size: int
+
+
+@dataclass(frozen=True)
+class RequestCompression:
+    """The RequestCompression class compresses the request bodies above a size threshold.
+
+    Attributes:
+        encoding: The content coding of the compressed bodies, "gzip", "deflate" or "zstd"
+                  (default is "gzip").
+        min_size: The minimum number of bytes of a body to be compressed (default is 1024).
+                  Smaller bodies are sent as is, as compression would not pay off.
+        level: The compression level (default is None, which means the default level of the
+               coding).
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, RequestCompression
+
+    channel = Channel(
+        url="https://api.example.com/events",
+        compression=RequestCompression(min_size=4096),
+    )
+    channel.post(json=events)
+    ```
+    """
+
+    encoding: str = "gzip"
+    min_size: int = 1024
+    level: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        assert self.encoding in ENCODINGS, (
+            f"The encoding must be one of {', '.join(ENCODINGS)}"
+        )
+
+    def prepare(
+        self, data: Any, json: Any, headers: Optional[HeaderType]
+    ) -> Optional[PreparedBody]:
+        """Encode a request body, and compress it if it reaches the size threshold.
+
+        A body whose Content-Encoding is set by the caller is left to the caller.
+
+        Args:
+            data: The data of the request body.
+            json: The JSON data of the request body.
+            headers: The headers of the request.
+
+        Returns:
+            The prepared body, or None if the body is not compressible.
+        """
+        prepared_headers = dict(headers or {})
+        if any(name.lower() == "content-encoding" for name in prepared_headers):
+            return None
+        if isinstance(data, str):
+            body = data.encode("utf-8")
+        elif isinstance(data, bytes):
+            body = data
+        elif data is None and json is not None:
+            body = jsonlib.dumps(json, allow_nan=False).encode("utf-8")
+            if not any(name.lower() == "content-type" for name in prepared_headers):
+                prepared_headers["Content-Type"] = "application/json"
+        else:
+            return None
+        if len(body) < self.min_size:
+            return PreparedBody(body, prepared_headers, len(body))
+        prepared_headers["Content-Encoding"] = self.encoding
+        return PreparedBody(
+            compress(body, self.encoding, self.level), prepared_headers, len(body)
+        )
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress bytes with a content coding.
+
+    Args:
+        data: The bytes to compress.
+        encoding: The content coding, "gzip", "deflate" or "zstd".
+        level: The compression level (default is None, which means the default level).
+
+    Returns:
+        The compressed bytes.
+    """
+    if encoding == "zstd":  # pragma: no cover
+        return zstd.compress(data) if level is None else zstd.compress(data, level)
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION if level is None else level,
+        zlib.DEFLATED,
+        WBITS[encoding],
+    )
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Decompress bytes with a content coding.
+
+    A "deflate" body is accepted with or without its zlib header, like urllib3 does.
+
+    Args:
+        data: The compressed bytes.
+        encoding: The case-insensitive content coding of the bytes.
+
+    Returns:
+        The decompressed bytes, or the bytes as is if the coding is not supported.
+    """
+    encoding = encoding.lower()
+    if encoding == "zstd" and zstd is not None:  # pragma: no cover
+        return zstd.decompress(data)
+    if encoding == "gzip":
+        return zlib.decompressobj(wbits=WBITS["auto"]).decompress(data)
+    if encoding == "deflate":
+        try:
+            return zlib.decompressobj(wbits=WBITS["auto"]).decompress(data)
+        except zlib.error:
+            return zlib.decompressobj(wbits=-15).decompress(data)
+    return data
+
+
+def received_sizes(response: requests.Response) -> Optional[Tuple[int, int]]:
+    """Return the number of bytes of a read response body on the wire and decoded.
+
+    The size on the wire is counted by urllib3, or taken from the Content-Length header.
+
+    Args:
+        response: The response, whose body has been read.
+
+    Returns:
+        The size on the wire and the decoded size, or None if they are not known.
+    """
+    content = response.content
+    if not isinstance(content, bytes):
+        return None
+    tell = getattr(response.raw, "tell", None)
+    if tell is not None:
+        return tell(), len(content)
+    content_length = response.headers.get("Content-Length", "")
+    if content_length.isdigit():
+        return int(content_length), len(content)
+    return None
@@ -0,0 +1,385 @@
+"""This module defines the ConcurrencyLimiter class, which adapts the number of in-flight requests.
+
+A static pool size is either too small, so the throughput is limited, or too large, so the
+backend is overloaded when it slows down. The concurrency limiter allows a number of concurrent
+attempts, and adjusts it after every attempt from its latency and its outcome:
+- AimdLimit: The limit grows by one while the attempts succeed, and it is cut by a ratio when an
+             attempt is dropped (additive increase, multiplicative decrease, as in TCP).
+- GradientLimit: The limit follows the ratio of the long-term and the recent latency, so it
+                 shrinks as soon as requests queue up in the backend (as in TCP Vegas), and it
+                 is cut by a ratio when an attempt is dropped.
+
+An attempt is dropped if it raises an exception, such as a timeout, or its response is one of
+the overload status codes. The attempts beyond the limit wait for a slot up to a timeout, and
+then they are rejected with a `ConcurrencyLimitExceededError`. A rejected attempt is never sent,
+so it is not retried, and it is not recorded by the circuit breaker or the retry budget.
+
+A concurrency limiter can be attached to one Channel, or shared by the Channels of one host,
+from threads and from asyncio code alike.
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Optional, Tuple
+import asyncio
+import logging
+import math
+import threading
+import time
+
+from .deadline import MIN_ATTEMPT_TIME, Deadline
+from .exceptions import ConcurrencyLimitExceededError
+
+logger = logging.getLogger("hcc.concurrency")
+
+# The status codes of the responses which signal an overloaded backend.
+OVERLOAD_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+class LimitAlgorithm(ABC):
+    """The LimitAlgorithm class is the base class of the concurrency limit algorithms."""
+
+    @abstractmethod
+    def update(self, limit: float, rtt: float, inflight: int, dropped: bool) -> float:
+        """Compute the new limit after an attempt.
+
+        Args:
+            limit: The current limit.
+            rtt: The latency of the attempt in seconds.
+            inflight: The number of the attempts in flight when the attempt completed,
+                      including the attempt.
+            dropped: Whether the attempt was dropped.
+
+        Returns:
+            The new limit, before it is clamped between the bounds of the limiter.
+        """
+
+
+@dataclass(frozen=True)
+class AimdLimit(LimitAlgorithm):
+    """Grow the limit by one after a success, and cut it by a ratio after a drop.
+
+    The limit only grows while at least half of it is in use, so an idle channel does not
+    accumulate a limit it has never tested.
+
+    Attributes:
+        backoff_ratio: The factor of the limit after a drop (default is 0.9).
+        latency_threshold: The latency in seconds which counts as a drop (default is None,
+                           which means only the failures are drops).
+    """
+
+    backoff_ratio: float = 0.9
+    latency_threshold: Optional[float] = None
+
+    def update(self, limit: float, rtt: float, inflight: int, dropped: bool) -> float:
+        if dropped or (
+            self.latency_threshold is not None and rtt > self.latency_threshold
+        ):
+            return limit * self.backoff_ratio
+        if inflight * 2 >= limit:
+            return limit + 1
+        return limit
+
+
+@dataclass
+class GradientLimit(LimitAlgorithm):
+    """Follow the gradient of the long-term and the recent latency.
+
+    The long-term latency is an exponential moving average which approximates the latency of
+    the unloaded backend. While the recent latency stays within `tolerance` times of it, the
+    limit grows by its square root, which is the room left for queueing; beyond that, the limit
+    shrinks in proportion, by half at most.
+
+    Attributes:
+        tolerance: The ratio of the recent and the long-term latency which is still considered
+                   normal (default is 1.5).
+        smoothing: The weight of the new limit in the moving average of the limit
+                   (default is 0.2).
+        window: The number of attempts in the moving average of the long-term latency
+                (default is 600).
+        backoff_ratio: The factor of the limit after a drop (default is 0.9).
+    """
+
+    tolerance: float = 1.5
+    smoothing: float = 0.2
+    window: int = 600
+    backoff_ratio: float = 0.9
+    long_rtt: float = field(default=0.0, init=False, repr=False)
+
+    def update(self, limit: float, rtt: float, inflight: int, dropped: bool) -> float:
+        if dropped:
+            return limit * self.backoff_ratio
+        if self.long_rtt == 0.0:
+            self.long_rtt = rtt
+        else:
+            self.long_rtt += (rtt - self.long_rtt) / self.window
+        if self.long_rtt > 2 * rtt:
+            # The backend has recovered, so the long-term latency decays faster.
+            self.long_rtt *= 0.95
+        if inflight * 2 < limit or rtt <= 0.0:
+            return limit
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / rtt))
+        target = limit * gradient + math.sqrt(limit)
+        return limit * (1 - self.smoothing) + target * self.smoothing
+
+
+def is_dropped(result: Any) -> bool:
+    """Return whether a response signals an overloaded backend."""
+    return getattr(result, "status_code", None) in OVERLOAD_STATUS_CODES
+
+
+class ConcurrencyLimiter:
+    """The ConcurrencyLimiter class is a thread-safe adaptive concurrency limiter.
+
+    The ConcurrencyLimiter class takes the following parameters:
+        algorithm: The algorithm adjusting the limit (default is None, which means a
+                   GradientLimit with its defaults).
+        initial_limit: The number of concurrent attempts allowed at first (default is 10).
+        min_limit: The lower bound of the limit (default is 1).
+        max_limit: The upper bound of the limit (default is 100).
+        timeout: The maximum number of seconds an attempt waits for a slot (default is None,
+                 which means waiting as long as needed). If set to 0, the attempts beyond the
+                 limit are rejected immediately.
+
+    Attributes:
+        rejected: The number of attempts rejected because of the timeout.
+
+    Typical usage example:
+    ```python
+    from hcc import AimdLimit, Channel, ConcurrencyLimiter
+
+    limiter = ConcurrencyLimiter(algorithm=AimdLimit(), max_limit=50, timeout=0.5)
+    channel = Channel(url="https://api.example.com", concurrency_limiter=limiter)
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        algorithm: Optional[LimitAlgorithm] = None,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        timeout: Optional[float] = None,
+    ):
+        assert 1 <= min_limit <= initial_limit <= max_limit, (
+            "The limits must satisfy 1 <= min_limit <= initial_limit <= max_limit"
+        )
+        self.algorithm = algorithm if algorithm is not None else GradientLimit()
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.timeout = timeout
+        self.rejected = 0
+        self._limit = float(initial_limit)
+        self._inflight = 0
+        self._condition = threading.Condition()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = (
+            deque()
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"ConcurrencyLimiter(limit={self.limit}, inflight={self.inflight}, "
+            f"rejected={self.rejected})"
+        )
+
+    @property
+    def limit(self) -> int:
+        """The number of concurrent attempts currently allowed."""
+        return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        """The number of attempts in flight."""
+        return self._inflight
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """Wait for a free slot.
+
+        Args:
+            timeout: The maximum number of seconds to wait (default is None, which means the
+                     timeout of the limiter).
+
+        Returns:
+            The start time of the attempt, to be passed to `release`.
+
+        Raises:
+            ConcurrencyLimitExceededError: If no slot is free before the timeout.
+        """
+        end = time.monotonic() + self._timeout(timeout)
+        with self._condition:
+            while not self._try_enter():
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    self._reject()
+                self._condition.wait(None if remaining == math.inf else remaining)
+        return time.monotonic()
+
+    async def async_acquire(self, timeout: Optional[float] = None) -> float:
+        """Wait for a free slot without blocking the event loop.
+
+        It is the asyncio counterpart of `acquire`.
+
+        Args:
+            timeout: The maximum number of seconds to wait (default is None, which means the
+                     timeout of the limiter).
+
+        Returns:
+            The start time of the attempt, to be passed to `release`.
+
+        Raises:
+            ConcurrencyLimitExceededError: If no slot is free before the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        end = time.monotonic() + self._timeout(timeout)
+        while True:
+            with self._condition:
+                if self._try_enter():
+                    return time.monotonic()
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    self._reject()
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(
+                    waiter[1], None if remaining == math.inf else remaining
+                )
+            except TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                # The slot this waiter may have been woken for is passed on.
+                with self._condition:
+                    self._wake()
+                raise
+            finally:
+                with self._condition:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def release(self, start: float, *, dropped: bool, sample: bool = True) -> None:
+        """Release the slot of an attempt, and adjust the limit from its outcome.
+
+        Args:
+            start: The start time of the attempt returned by `acquire`.
+            dropped: Whether the attempt was dropped.
+            sample: Whether the attempt adjusts the limit (default is True). Cancelled
+                    attempts tell nothing about the backend.
+        """
+        rtt = time.monotonic() - start
+        with self._condition:
+            inflight = self._inflight
+            self._inflight -= 1
+            if sample:
+                previous = self.limit
+                self._limit = min(
+                    max(
+                        self.algorithm.update(self._limit, rtt, inflight, dropped),
+                        self.min_limit,
+                    ),
+                    self.max_limit,
+                )
+                if self.limit != previous:
+                    logger.debug("Concurrency limit changed: %d -> %s", previous, self)
+            self._wake()
+
+    def call(self, func: Callable[[], Any], deadline: Optional[Deadline] = None) -> Any:
+        """Call a function in a slot of the limiter.
+
+        Args:
+            func: The function sending the attempt.
+            deadline: The deadline of the call, which bounds the wait for a slot
+                      (default is None, which means no deadline).
+
+        Returns:
+            The result of the function.
+
+        Raises:
+            ConcurrencyLimitExceededError: If no slot is free before the timeout.
+        """
+        start = self.acquire(self._deadline_timeout(deadline))
+        try:
+            result = func()
+        except Exception:
+            self.release(start, dropped=True)
+            raise
+        except BaseException:
+            self.release(start, dropped=False, sample=False)
+            raise
+        self.release(start, dropped=is_dropped(result))
+        return result
+
+    async def async_call(
+        self, func: Callable[[], Awaitable[Any]], deadline: Optional[Deadline] = None
+    ) -> Any:
+        """Await a coroutine function in a slot of the limiter.
+
+        It is the asyncio counterpart of `call`.
+
+        Args:
+            func: The coroutine function sending the attempt.
+            deadline: The deadline of the call, which bounds the wait for a slot
+                      (default is None, which means no deadline).
+
+        Returns:
+            The result of the coroutine.
+
+        Raises:
+            ConcurrencyLimitExceededError: If no slot is free before the timeout.
+        """
+        start = await self.async_acquire(self._deadline_timeout(deadline))
+        try:
+            result = await func()
+        except Exception:
+            self.release(start, dropped=True)
+            raise
+        except BaseException:
+            self.release(start, dropped=False, sample=False)
+            raise
+        self.release(start, dropped=is_dropped(result))
+        return result
+
+    def _timeout(self, timeout: Optional[float]) -> float:
+        """Return the timeout of a wait, or infinity if it is unbounded."""
+        if timeout is not None:
+            return timeout
+        return self.timeout if self.timeout is not None else math.inf
+
+    def _deadline_timeout(self, deadline: Optional[Deadline]) -> Optional[float]:
+        """Return the timeout of a wait bounded by the deadline of the call."""
+        if deadline is None:
+            return None
+        return min(
+            self._timeout(None), max(0.0, deadline.remaining() - MIN_ATTEMPT_TIME)
+        )
+
+    def _try_enter(self) -> bool:
+        """Take a slot if one is free. The lock has to be held."""
+        if self._inflight < self.limit:
+            self._inflight += 1
+            return True
+        return False
+
+    def _reject(self) -> None:
+        """Reject an attempt. The lock has to be held."""
+        self.rejected += 1
+        raise ConcurrencyLimitExceededError(
+            f"Concurrency limit of {self.limit} reached", limit=self.limit
+        )
+
+    def _wake(self) -> None:
+        """Wake as many waiters as there are free slots. The lock has to be held."""
+        free = self.limit - self._inflight
+        if free <= 0:
+            return
+        self._condition.notify(free)
+        while free > 0 and self._waiters:
+            loop, future = self._waiters.popleft()
+            loop.call_soon_threadsafe(_set_result, future)
+            free -= 1
+
+
+def _set_result(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -3,18 +3,31 @@
 Type Aliases:
     HeaderType: Represents HTTP headers.
     JsonType: Represents any JSON-compatible data type, that can be sent in an HTTP request body.
-    DataType: Represents any data type, that can be sent in an HTTP request body.
+    DataType: Represents any data type, that can be sent in an HTTP request body, including
+              file objects and generators streamed in constant memory.
+
+Protocols:
+    SupportsRead: Represents a file object, such as an open file or an mmap.
 """
 
-from typing import Any, Iterable, Mapping, TypeAlias
+from typing import Any, Iterable, Mapping, Protocol, TypeAlias, TypeVar
+
+T_co = TypeVar("T_co", covariant=True)
+
+
+class SupportsRead(Protocol[T_co]):
+    """The SupportsRead protocol defines the file objects that can be read in blocks."""
+
+    def read(self, size: int = ..., /) -> T_co:
+        """Read at most size bytes or characters, or everything if size is negative."""
 
 
 DataType: TypeAlias = (
     Iterable[bytes]
     | str
     | bytes
-    # TODO Add support for SupportsRead
-    # | SupportsRead[str | bytes]
+    | SupportsRead[str]
+    | SupportsRead[bytes]
     | list[tuple[Any, Any]]
     | tuple[tuple[Any, Any], ...]
     | Mapping[Any, Any]
@@ -0,0 +1,102 @@
+"""This module defines the Deadline class, which bounds the total duration of a call.
+
+The timeout of a Channel applies to every attempt, so without a deadline the worst case of a
+call is roughly `timeout * max_retry_count` plus the delays between the attempts. A deadline is
+the total time budget of the call: the timeout of every attempt is shrunk to the remaining time,
+and no retry is started if its delay does not fit in the remaining time. The remaining time
+can be propagated to the downstream services in a header, so they can give up in time, too.
+"""
+
+from typing import Any, Dict, Optional
+import time
+
+from .exceptions import DeadlineExceededError
+
+# The minimum number of seconds left by the deadline to send an attempt after waiting for it.
+MIN_ATTEMPT_TIME = 0.001
+
+
+class Deadline:
+    """The Deadline class is a point in time by which a call has to complete.
+
+    The Deadline class takes the following parameters:
+        timeout: The total time budget in seconds, starting at the creation of the deadline.
+
+    Typical usage example:
+    ```python
+    from hcc import Deadline, retry_function
+
+    deadline = Deadline(5.0)
+    retry_function(
+        func=lambda: session.get(url, timeout=deadline.timeout(2.0)),
+        is_retry_needed=lambda response: response.status_code != 200,
+        deadline=deadline,
+    )
+    ```
+    """
+
+    def __init__(self, timeout: float):
+        self.expires_at = time.monotonic() + timeout
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f})"
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.remaining() <= 0
+
+    def remaining(self) -> float:
+        """Return the remaining time in seconds, or 0 if the deadline has passed."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def timeout(self, timeout: float) -> float:
+        """Shrink the timeout of an attempt to the remaining time.
+
+        Args:
+            timeout: The timeout of the attempt in seconds.
+
+        Returns:
+            The smaller of the timeout and the remaining time.
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed, as a timeout of 0 is invalid.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError("Deadline exceeded before the request was sent")
+        return min(timeout, remaining)
+
+
+def attempt_arguments(
+    arguments: Dict[str, Any],
+    *,
+    timeout: float,
+    deadline: Optional[Deadline],
+    header: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Return the keyword arguments of one attempt of a request.
+
+    Args:
+        arguments: The keyword arguments of the request.
+        timeout: The timeout of an attempt in seconds.
+        deadline: The deadline of the call, if there is one.
+        header: The name of the header carrying the remaining time in milliseconds
+                (default is None, which means the remaining time is not sent).
+
+    Returns:
+        The keyword arguments with the timeout shrunk to the remaining time.
+
+    Raises:
+        DeadlineExceededError: If the deadline has passed since the start of the attempt.
+    """
+    if deadline is None:
+        return {"timeout": timeout, **arguments}
+    remaining = deadline.remaining()
+    arguments = {**arguments, "timeout": deadline.timeout(timeout)}
+    if header is not None:
+        arguments["headers"] = {
+            **(arguments.get("headers") or {}),
+            header: str(int(remaining * 1000)),
+        }
+    return arguments
@@ -0,0 +1,79 @@
+"""This module defines the exceptions raised by the package.
+
+Every exception raised by the package itself derives from `HccError`, while the exceptions of
+the requests library are passed through unchanged.
+"""
+
+from typing import Any, Optional
+
+
+class HccError(Exception):
+    """The HccError class is the base class of the exceptions raised by the package."""
+
+
+class RetryBudgetExhaustedError(HccError):
+    """The RetryBudgetExhaustedError is raised when a retry is denied by the retry budget.
+
+    Attributes:
+        last_result: The result of the last attempt, or None if it raised an exception. The
+                     exception of the last attempt is chained as the cause.
+    """
+
+    def __init__(self, message: str, last_result: Optional[Any] = None):
+        super().__init__(message)
+        self.last_result = last_result
+
+
+class CircuitOpenError(HccError):
+    """The CircuitOpenError is raised when an attempt is rejected by the circuit breaker.
+
+    Attributes:
+        remaining: The number of seconds until the circuit becomes half-open.
+    """
+
+    def __init__(self, message: str, remaining: float = 0.0):
+        super().__init__(message)
+        self.remaining = remaining
+
+
+class DeadlineExceededError(HccError, TimeoutError):
+    """The DeadlineExceededError is raised when an attempt would start after the deadline."""
+
+
+class RateLimitExceededError(HccError):
+    """The RateLimitExceededError is raised when a request would wait longer than the timeout
+    of the rate limiter.
+
+    Attributes:
+        retry_after: The number of seconds until the next free slot.
+    """
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimitExceededError(HccError):
+    """The ConcurrencyLimitExceededError is raised when an attempt finds no free slot in the
+    concurrency limiter before the timeout.
+
+    Attributes:
+        limit: The concurrency limit when the attempt was rejected.
+    """
+
+    def __init__(self, message: str, limit: int = 0):
+        super().__init__(message)
+        self.limit = limit
+
+
+class ResponseTooLargeError(HccError):
+    """The ResponseTooLargeError is raised when the body of a streamed response exceeds the max
+    body size.
+
+    Attributes:
+        limit: The max body size in bytes.
+    """
+
+    def __init__(self, message: str, limit: int = 0):
+        super().__init__(message)
+        self.limit = limit
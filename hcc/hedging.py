@@ -0,0 +1,272 @@
+"""This module defines the HedgePolicy class, which reduces the tail latency of idempotent calls.
+
+When a hedged attempt does not complete within the hedge delay, a second copy of the request
+is sent, and whichever copy completes first successfully is used. The hedge delay is either
+fixed or derived from a percentile of the recently observed latencies. The extra load is
+bounded by a hedge budget: every request earns `max_hedge_ratio` hedges, so at most that
+fraction of the requests are hedged.
+
+In the blocking `Channel` both copies run on a thread pool, and the losing response is closed
+when it arrives. In the `AsyncChannel` the losing task is cancelled. A call which cannot be
+hedged, because no hedge delay is known yet or the hedge budget is empty, runs inline.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Awaitable, Callable, Deque, Iterable, Optional, Set
+import asyncio
+import logging
+import math
+import threading
+import time
+
+from .retry_budget import RetryBudget
+
+logger = logging.getLogger("hcc.request")
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class LatencyTracker:
+    """The LatencyTracker class keeps a sliding window of latencies to compute percentiles.
+
+    The percentiles are computed from a sorted copy of the window, which is rebuilt once
+    `refresh_interval` latencies have been recorded since the previous one, so the window is
+    not sorted on every call.
+
+    The LatencyTracker class takes the following parameters:
+        window_size: The number of the most recent latencies kept (default is 1000).
+        refresh_interval: The number of recorded latencies after which the sorted copy is
+                          rebuilt (default is 16).
+    """
+
+    def __init__(self, *, window_size: int = 1000, refresh_interval: int = 16):
+        self.refresh_interval = refresh_interval
+        self._latencies: Deque[float] = deque(maxlen=window_size)
+        self._sorted: list[float] = []
+        self._unsorted = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def record(self, latency: float) -> None:
+        """Record a latency in seconds."""
+        with self._lock:
+            self._latencies.append(latency)
+            self._unsorted += 1
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Return a percentile of the recorded latencies.
+
+        Args:
+            percentile: The percentile between 0 and 100.
+
+        Returns:
+            The latency in seconds, or None if no latency has been recorded yet.
+        """
+        with self._lock:
+            if not self._latencies:
+                return None
+            latencies = self._sorted
+            window = None
+            if not latencies or self._unsorted >= self.refresh_interval:
+                window = list(self._latencies)
+                self._unsorted = 0
+        if window is not None:
+            # The window is sorted outside of the lock, so recording is not blocked.
+            latencies = sorted(window)
+            with self._lock:
+                self._sorted = latencies
+        index = math.ceil(percentile / 100 * len(latencies)) - 1
+        return latencies[max(0, index)]
+
+
+class HedgePolicy:
+    """The HedgePolicy class configures hedged requests for the idempotent methods.
+
+    The HedgePolicy class takes the following parameters:
+        delay: The fixed hedge delay in seconds (default is None, which means the delay is the
+               `percentile` of the observed latencies).
+        percentile: The percentile of the observed latencies used as the hedge delay
+                    (default is 95.0).
+        min_samples: The number of observed latencies needed before hedging with a percentile
+                     delay (default is 20).
+        max_hedge_ratio: The maximum ratio of the hedged requests (default is 0.1).
+        methods: The HTTP methods to hedge (default is GET, PUT and DELETE). Only idempotent
+                 methods are allowed.
+        window_size: The number of the most recent latencies observed (default is 1000).
+
+    Attributes:
+        hedge_count: The number of hedge requests sent.
+        hedge_wins: The number of calls answered by the hedge request.
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, HedgePolicy
+
+    channel = Channel(
+        url="https://api.example.com",
+        hedging=HedgePolicy(percentile=95.0, max_hedge_ratio=0.05),
+    )
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        delay: Optional[float] = None,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        max_hedge_ratio: float = 0.1,
+        methods: Iterable[str] = ("GET", "PUT", "DELETE"),
+        window_size: int = 1000,
+    ):
+        self.methods = frozenset(method.upper() for method in methods)
+        assert self.methods <= IDEMPOTENT_METHODS, (
+            "Only idempotent methods can be hedged"
+        )
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.latencies = LatencyTracker(window_size=window_size)
+        self.hedge_count = 0
+        self.hedge_wins = 0
+        self._budget = RetryBudget(
+            ratio=max_hedge_ratio, min_retries_per_second=0.0, capacity=10.0
+        )
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"HedgePolicy(delay={self.delay}, percentile={self.percentile}, "
+            f"max_hedge_ratio={self.max_hedge_ratio})"
+        )
+
+    def applies_to(self, method: str) -> bool:
+        """Whether the requests of an HTTP method are hedged."""
+        return method.upper() in self.methods
+
+    def hedge_delay(self) -> Optional[float]:
+        """Return the current hedge delay in seconds, or None if hedging is not possible yet."""
+        if self.delay is not None:
+            return self.delay
+        if len(self.latencies) < self.min_samples:
+            return None
+        return self.latencies.percentile(self.percentile)
+
+    def call(self, func: Callable[[], Any], executor: Executor) -> Any:
+        """Call a function, and call it again on the executor if it is slower than the delay.
+
+        Args:
+            func: The function sending one copy of the request.
+            executor: The executor running the copies.
+
+        Returns:
+            The result of the first copy completed without an exception.
+
+        Raises:
+            Exception: The exception of the last copy, if all of them failed.
+        """
+        delay = self._start()
+        if delay is None or self._budget.tokens < 1:
+            return self._timed(func)()
+        primary = executor.submit(self._timed(func))
+        if wait([primary], timeout=delay).done or not self._budget.try_acquire():
+            return primary.result()
+        hedge = executor.submit(func)
+        self._count_hedge()
+        pending: Set[Future[Any]] = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=_failed):
+                if future.exception() is None or not pending:
+                    for loser in pending:
+                        loser.add_done_callback(_close_result)
+                    if future is hedge and future.exception() is None:
+                        self._count_win()
+                    return future.result()
+
+    async def async_call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await a coroutine function, and await it again if it is slower than the delay.
+
+        It is the asyncio counterpart of `call`: the losing copy is cancelled.
+
+        Args:
+            func: The coroutine function sending one copy of the request.
+
+        Returns:
+            The result of the first copy completed without an exception.
+
+        Raises:
+            Exception: The exception of the last copy, if all of them failed.
+        """
+        delay = self._start()
+        if delay is None or self._budget.tokens < 1:
+            return await self._async_timed(func)
+        primary = asyncio.ensure_future(self._async_timed(func))
+        pending: Set[asyncio.Future[Any]] = {primary}
+        try:
+            await asyncio.wait(pending, timeout=delay)
+            if primary.done() or not self._budget.try_acquire():
+                return await primary
+            hedge = asyncio.ensure_future(func())
+            self._count_hedge()
+            pending = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=_failed):
+                    if task.exception() is None or not pending:
+                        if task is hedge and task.exception() is None:
+                            self._count_win()
+                        return task.result()
+        finally:
+            # The copies still running are cancelled, also when the caller is cancelled.
+            for task in pending:
+                task.cancel()
+
+    def _start(self) -> Optional[float]:
+        """Register a hedged call, and return its hedge delay."""
+        self._budget.record_success()
+        return self.hedge_delay()
+
+    def _timed(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap a function to record its latency, excluding the queueing in an executor."""
+
+        def timed() -> Any:
+            start = time.monotonic()
+            try:
+                return func()
+            finally:
+                self.latencies.record(time.monotonic() - start)
+
+        return timed
+
+    async def _async_timed(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.monotonic()
+        try:
+            return await func()
+        finally:
+            self.latencies.record(time.monotonic() - start)
+
+    def _count_hedge(self) -> None:
+        with self._lock:
+            self.hedge_count += 1
+        logger.info("Hedge request sent: policy: %s", id(self))
+
+    def _count_win(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+
+def _failed(future: Future[Any] | asyncio.Future[Any]) -> bool:
+    return future.exception() is not None
+
+
+def _close_result(future: Future[Any]) -> None:
+    """Release the connection of the response of a losing copy."""
+    if future.exception() is None and hasattr(future.result(), "close"):
+        future.result().close()
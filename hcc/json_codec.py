@@ -0,0 +1,173 @@
+"""This module defines the JSON codecs, which serialize the JSON request and response bodies.
+
+A Channel serializes the JSON data of a request once per call, and every attempt resends the
+same bytes. By default, the data is serialized with the `json` module of the standard library,
+like requests does. The codecs of the orjson and msgspec libraries are much faster, and are
+optional: they are installed with the `orjson` and `msgspec` extras of the package.
+- StdlibJsonCodec: The `json` module of the standard library, which is always available.
+- OrjsonCodec: The orjson library.
+- MsgspecCodec: The msgspec library.
+
+The codecs agree on valid JSON data, but not on the data JSON cannot represent:
+- NaN and infinite numbers are rejected with a ValueError by StdlibJsonCodec, while OrjsonCodec
+  and MsgspecCodec serialize them as null.
+- The int, float, bool and None keys of a dict are serialized as strings by StdlibJsonCodec and
+  OrjsonCodec. MsgspecCodec serializes the int and float keys as strings, and rejects the other
+  non-str keys with a TypeError, like the other codecs do for the keys of other types.
+
+Custom codecs can be plugged in by subclassing `JsonCodec`. The same codec decodes the JSON
+bodies of the responses with `decode_json`.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+import importlib
+import json as jsonlib
+import requests
+
+from .custom_data_types import HeaderType
+
+
+class JsonCodec(ABC):
+    """The JsonCodec class is the base class of the JSON serializers."""
+
+    @abstractmethod
+    def encode(self, obj: Any) -> bytes:
+        """Serialize JSON data into UTF-8 encoded bytes.
+
+        Args:
+            obj: The JSON data.
+
+        Returns:
+            The serialized data.
+
+        Raises:
+            ValueError: If the data cannot be serialized.
+        """
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Deserialize JSON data from UTF-8 encoded bytes.
+
+        Args:
+            data: The serialized data.
+
+        Returns:
+            The JSON data.
+
+        Raises:
+            ValueError: If the data is not valid JSON.
+        """
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class StdlibJsonCodec(JsonCodec):
+    """Serialize with the `json` module of the standard library, like requests does.
+
+    NaN and infinite numbers are rejected, as they are not valid JSON.
+    """
+
+    def encode(self, obj: Any) -> bytes:
+        return jsonlib.dumps(obj, allow_nan=False).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return jsonlib.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Serialize with the orjson library.
+
+    NaN and infinite numbers are serialized as null. The non-str keys of a dict are serialized
+    as strings, like the standard library does.
+
+    Raises:
+        ImportError: If orjson is not installed.
+    """
+
+    def __init__(self) -> None:
+        self._orjson = importlib.import_module("orjson")
+
+    def encode(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, option=self._orjson.OPT_NON_STR_KEYS)
+
+    def decode(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    """Serialize with the msgspec library.
+
+    NaN and infinite numbers are serialized as null. The int and float keys of a dict are
+    serialized as strings, and the other non-str keys are rejected.
+
+    Raises:
+        ImportError: If msgspec is not installed.
+    """
+
+    def __init__(self) -> None:
+        msgspec_json = importlib.import_module("msgspec.json")
+        self._encoder = msgspec_json.Encoder()
+        self._decoder = msgspec_json.Decoder()
+
+    def encode(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def decode(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+
+# The codec of the channels without one.
+DEFAULT_JSON_CODEC = StdlibJsonCodec()
+
+
+def fastest_json_codec() -> JsonCodec:
+    """Return the codec of the fastest installed JSON library.
+
+    Returns:
+        An OrjsonCodec or a MsgspecCodec if their library is installed, or a StdlibJsonCodec.
+    """
+    for codec_class in (OrjsonCodec, MsgspecCodec):
+        try:
+            return codec_class()
+        except ImportError:
+            continue
+    return StdlibJsonCodec()
+
+
+def encode_json_body(
+    codec: JsonCodec, obj: Any, headers: Optional[HeaderType]
+) -> Tuple[bytes, Dict[str, str]]:
+    """Serialize the JSON data of a request.
+
+    Args:
+        codec: The JSON codec.
+        obj: The JSON data.
+        headers: The headers of the request.
+
+    Returns:
+        The serialized data, and the headers with a JSON Content-Type unless one is set.
+    """
+    body_headers = dict(headers or {})
+    if not any(name.lower() == "content-type" for name in body_headers):
+        body_headers["Content-Type"] = "application/json"
+    return codec.encode(obj), body_headers
+
+
+def decode_json(response: requests.Response, codec: Optional[JsonCodec] = None) -> Any:
+    """Deserialize the JSON body of a response.
+
+    Args:
+        response: The response, whose body has been read.
+        codec: The JSON codec (default is None, which means `response.json()`).
+
+    Returns:
+        The JSON data.
+
+    Raises:
+        ValueError: If the body is not valid JSON.
+    """
+    if codec is None:
+        return response.json()
+    return codec.decode(response.content)
@@ -0,0 +1,123 @@
+"""This module defines the LogPolicy class, which controls what the request logs reveal.
+
+The Channel classes log every request at INFO level. The log policy decides how the bodies of
+the requests are rendered in these logs, and which headers are redacted:
+- FULL: The whole body is logged.
+- PREVIEW: A truncated preview of the body is logged with its size.
+- DIGEST: Only the size and a SHA-256 digest prefix of the body are logged.
+- OMIT: The body is not logged at all.
+
+The log arguments are only computed if the INFO level of the `hcc.request` logger is enabled,
+so the logging costs next to nothing on the hot path when it is disabled.
+"""
+
+from collections.abc import Mapping, Sized
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, FrozenSet, Optional
+import hashlib
+import json
+import reprlib
+
+from .custom_data_types import HeaderType
+
+DEFAULT_REDACTED_HEADERS = frozenset(
+    {
+        "authorization",
+        "proxy-authorization",
+        "cookie",
+        "set-cookie",
+        "x-api-key",
+        "x-auth-token",
+    }
+)
+REDACTED = "[REDACTED]"
+
+
+class BodyLogMode(Enum):
+    """The BodyLogMode enum defines how the request bodies are logged."""
+
+    FULL = 1
+    PREVIEW = 2
+    DIGEST = 3
+    OMIT = 4
+
+
+@dataclass(frozen=True)
+class LogPolicy:
+    """The LogPolicy class controls the rendering of the request bodies and headers in logs.
+
+    Attributes:
+        body_mode: The way the bodies are logged (default is BodyLogMode.FULL).
+        preview_length: The maximum number of characters of a body preview (default is 64).
+        redacted_headers: The case-insensitive names of the headers whose values are replaced
+                          by "[REDACTED]" (default is the common credential headers).
+
+    Typical usage example:
+    ```python
+    from hcc import BodyLogMode, Channel, LogPolicy
+
+    channel = Channel(
+        url="https://api.example.com",
+        log_policy=LogPolicy(body_mode=BodyLogMode.DIGEST),
+    )
+    ```
+    """
+
+    body_mode: BodyLogMode = BodyLogMode.FULL
+    preview_length: int = 64
+    redacted_headers: FrozenSet[str] = DEFAULT_REDACTED_HEADERS
+
+    def __post_init__(self) -> None:
+        names = frozenset(name.lower() for name in self.redacted_headers)
+        object.__setattr__(self, "redacted_headers", names)
+
+    def headers(self, headers: Optional[HeaderType]) -> Optional[HeaderType]:
+        """Return the headers with the values of the redacted headers replaced."""
+        if not headers or not any(
+            name.lower() in self.redacted_headers for name in headers
+        ):
+            return headers
+        return {
+            name: REDACTED if name.lower() in self.redacted_headers else value
+            for name, value in headers.items()
+        }
+
+    def body(self, body: Any) -> Any:
+        """Return the loggable rendering of a request body."""
+        if body is None or self.body_mode == BodyLogMode.FULL:
+            return body
+        if self.body_mode == BodyLogMode.OMIT:
+            return "<omitted>"
+        if self.body_mode == BodyLogMode.PREVIEW:
+            preview = reprlib.Repr(
+                maxstring=self.preview_length, maxother=self.preview_length
+            ).repr(body)
+            if isinstance(body, Sized):
+                return f"{preview} ({_size(body)})"
+            return preview
+        content = _content(body)
+        if content is None:
+            return f"<{type(body).__name__}>"
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        return f"<{len(content)} bytes, sha256:{digest}>"
+
+
+def _size(body: Sized) -> str:
+    if isinstance(body, (str, bytes)):
+        return f"{len(body)} {'chars' if isinstance(body, str) else 'bytes'}"
+    return f"{len(body)} items"
+
+
+def _content(body: Any) -> Optional[bytes]:
+    """Return the bytes of a body to digest, or None if it is a stream."""
+    if isinstance(body, bytes):
+        return body
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, (Mapping, list, tuple, int, float, bool)):
+        return json.dumps(body, sort_keys=True, default=str).encode("utf-8")
+    return None
+
+
+DEFAULT_LOG_POLICY = LogPolicy()
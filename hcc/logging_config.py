@@ -0,0 +1,26 @@
+"""This module applies YAML logging configurations on demand.
+
+Logging is configured by the application, not by importing the package, so PyYAML is only
+imported when `configure_logging` is called.
+"""
+
+from pathlib import Path
+from typing import Optional
+import logging.config
+
+DEFAULT_CONFIG_PATH = Path(__file__).with_name("log_config.yaml")
+
+
+def configure_logging(path: Optional[str | Path] = None) -> None:
+    """Configure logging using a YAML file in the `logging.config.dictConfig` format.
+
+    Args:
+        path: The path of the configuration file (default is None, which means the
+              configuration shipped with the package, declaring the loggers of the package).
+    """
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    config_path = Path(path) if path is not None else DEFAULT_CONFIG_PATH
+    with open(config_path, "r", encoding="utf-8") as file:
+        config = yaml.safe_load(file)
+    logging.config.dictConfig(config)
@@ -0,0 +1,332 @@
+"""This module defines the Metrics class, which collects the statistics of the calls of channels.
+
+The metrics of a channel cover:
+- the calls: their count, the failed ones, the ones in flight, and a latency histogram of the
+  whole call, including every retry and delay;
+- the attempts: their count, the ones in flight, and a latency histogram of single attempts;
+- the retries by reason: an exception, or a result for which `is_retry_needed` returned True;
+- the errors by class: the name of the exception, or the status code of the failed response;
+- the time spent sleeping, in the backoff between the attempts and waiting for a rate limiter;
+- the bytes of the bodies sent and received, on the wire and decoded, which show the savings of
+  compression;
+- gauges read at snapshot time, such as the utilization of the connection pool.
+
+The latency histograms have fixed, logarithmic buckets, like an HDR histogram with a relative
+precision of about 19%, from 100 microseconds to 100 seconds. Recording a value is a binary
+search and a few increments under one lock, so the hot path stays cheap.
+
+The metrics can be pulled as a snapshot, or pushed to an exporter callback at most once per
+export interval, from the thread that completes a call. Metrics can be attached to one Channel,
+or shared by the Channels of one host.
+"""
+
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger("hcc.metrics")
+
+# The upper bounds of the latency buckets in seconds: 2^(1/4) apart from 100 microseconds.
+DEFAULT_BOUNDS = tuple(0.0001 * 2 ** (i / 4) for i in range(81))
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p999": 0.999}
+
+
+class Histogram:
+    """The Histogram class counts values in fixed buckets.
+
+    It is not thread-safe on its own; the Metrics class records the values under its lock.
+
+    The Histogram class takes the following parameters:
+        bounds: The increasing upper bounds of the buckets (default is DEFAULT_BOUNDS). The
+                values above the last bound are counted in an overflow bucket.
+    """
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def __repr__(self) -> str:
+        return f"Histogram(count={self.count}, p50={self.percentile(0.5):.6f})"
+
+    def record(self, value: float) -> None:
+        """Count a value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, quantile: float) -> float:
+        """Return the upper bound of the bucket of a quantile, capped by the maximum.
+
+        Args:
+            quantile: The quantile between 0 and 1.
+
+        Returns:
+            The estimated value of the quantile, or 0 if no value has been recorded.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(quantile * self.count))
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                break
+        bound = self.bounds[index] if index < len(self.bounds) else self.max
+        return min(bound, self.max)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the count, the sum, the extremes and the main percentiles."""
+        snapshot: Dict[str, float] = {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+        }
+        for name, quantile in PERCENTILES.items():
+            snapshot[name] = self.percentile(quantile)
+        return snapshot
+
+
+class Metrics:
+    """The Metrics class collects the counters, gauges and latency histograms of channels.
+
+    The Metrics class takes the following parameters:
+        exporter: The function receiving a snapshot at most once per export interval
+                  (default is None, which means the snapshots are only pulled).
+        export_interval: The minimum number of seconds between two exports (default is 60.0).
+        bounds: The upper bounds of the buckets of the latency histograms in seconds
+                (default is DEFAULT_BOUNDS).
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, Metrics
+
+    metrics = Metrics(exporter=print, export_interval=10.0)
+    channel = Channel(url="https://api.example.com/config", metrics=metrics)
+    channel.get()
+    print(metrics.snapshot()["call_latency"]["p99"])
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        exporter: Optional[Callable[[Dict[str, Any]], None]] = None,
+        export_interval: float = 60.0,
+        bounds: Sequence[float] = DEFAULT_BOUNDS,
+    ):
+        self.exporter = exporter
+        self.export_interval = export_interval
+        self.bounds = tuple(bounds)
+        self._gauges: Dict[str, List[Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+        self._next_export = time.monotonic() + export_interval
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"Metrics(calls={self.calls}, attempts={self.attempts})"
+
+    def reset(self) -> None:
+        """Reset the counters and the histograms. The gauges are kept."""
+        with self._lock:
+            self.calls = 0
+            self.calls_failed = 0
+            self.calls_inflight = 0
+            self.attempts = 0
+            self.attempts_inflight = 0
+            self.retries: Dict[str, int] = {"exception": 0, "result": 0}
+            self.errors: Dict[str, int] = {}
+            self.sleep: Dict[str, float] = {"backoff": 0.0, "rate_limit": 0.0}
+            self.bytes: Dict[str, Dict[str, int]] = {
+                "sent": {"wire": 0, "logical": 0},
+                "received": {"wire": 0, "logical": 0},
+            }
+            self.call_latency = Histogram(self.bounds)
+            self.attempt_latency = Histogram(self.bounds)
+
+    def add_gauge(self, name: str, func: Callable[[], float]) -> None:
+        """Add a function read at snapshot time. The functions of the same name are summed."""
+        with self._lock:
+            self._gauges.setdefault(name, []).append(func)
+
+    def remove_gauge(self, name: str, func: Callable[[], float]) -> None:
+        """Remove a function added by `add_gauge`, if it is there."""
+        with self._lock:
+            funcs = self._gauges.get(name, [])
+            if func in funcs:
+                funcs.remove(func)
+
+    def start_call(self) -> float:
+        """Count a call in flight, and return its start time."""
+        with self._lock:
+            self.calls_inflight += 1
+        return time.monotonic()
+
+    def finish_call(self, start: float, failed: bool) -> None:
+        """Record a completed call, and export a snapshot if the export interval has passed.
+
+        Args:
+            start: The start time returned by `start_call`.
+            failed: Whether the call raised an exception, or returned a failed result.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.calls_inflight -= 1
+            self.calls += 1
+            self.calls_failed += failed
+            self.call_latency.record(now - start)
+            export = self.exporter is not None and now >= self._next_export
+            if export:
+                self._next_export = now + self.export_interval
+        if export:
+            self.export()
+
+    def start_attempt(self) -> float:
+        """Count an attempt in flight, and return its start time."""
+        with self._lock:
+            self.attempts_inflight += 1
+        return time.monotonic()
+
+    def finish_attempt(
+        self, start: float, error: Optional[str], retry: Optional[str]
+    ) -> None:
+        """Record a completed attempt.
+
+        Args:
+            start: The start time returned by `start_attempt`.
+            error: The class of the error of the attempt, or None if it succeeded.
+            retry: The reason of the retry of the attempt, or None if it is not retried.
+        """
+        latency = time.monotonic() - start
+        with self._lock:
+            self.attempts_inflight -= 1
+            self.attempts += 1
+            self.attempt_latency.record(latency)
+            if error is not None:
+                self.errors[error] = self.errors.get(error, 0) + 1
+            if retry is not None:
+                self.retries[retry] += 1
+
+    def record_sleep(self, reason: str, seconds: float) -> None:
+        """Record the time spent sleeping before an attempt.
+
+        Args:
+            reason: The reason of the sleep, "backoff" or "rate_limit".
+            seconds: The duration of the sleep.
+        """
+        with self._lock:
+            self.sleep[reason] += seconds
+
+    def record_bytes(self, direction: str, wire: int, logical: int) -> None:
+        """Record the size of a body sent or received by an attempt.
+
+        Args:
+            direction: The direction of the body, "sent" or "received".
+            wire: The number of bytes on the wire, compressed or not.
+            logical: The number of bytes of the decoded body.
+        """
+        with self._lock:
+            sizes = self.bytes[direction]
+            sizes["wire"] += wire
+            sizes["logical"] += logical
+
+    def call(self, func: Callable[[], Any], is_failure: Callable[[Any], bool]) -> Any:
+        """Call a function, and record it as a call.
+
+        Args:
+            func: The function making the call with its retries.
+            is_failure: The function that determines if the result of the call is a failure.
+
+        Returns:
+            The result of the function.
+        """
+        start = self.start_call()
+        try:
+            result = func()
+        except BaseException:
+            self.finish_call(start, True)
+            raise
+        self.finish_call(start, is_failure(result))
+        return result
+
+    async def async_call(
+        self, func: Callable[[], Awaitable[Any]], is_failure: Callable[[Any], bool]
+    ) -> Any:
+        """Await a coroutine function, and record it as a call.
+
+        It is the asyncio counterpart of `call`.
+
+        Args:
+            func: The coroutine function making the call with its retries.
+            is_failure: The function that determines if the result of the call is a failure.
+
+        Returns:
+            The result of the coroutine.
+        """
+        start = self.start_call()
+        try:
+            result = await func()
+        except BaseException:
+            self.finish_call(start, True)
+            raise
+        self.finish_call(start, is_failure(result))
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current values of the metrics as plain, JSON serializable data."""
+        with self._lock:
+            snapshot: Dict[str, Any] = {
+                "calls": self.calls,
+                "calls_failed": self.calls_failed,
+                "calls_inflight": self.calls_inflight,
+                "attempts": self.attempts,
+                "attempts_inflight": self.attempts_inflight,
+                "retries": dict(self.retries),
+                "errors": dict(self.errors),
+                "sleep_seconds": dict(self.sleep),
+                "bytes": {
+                    direction: dict(sizes) for direction, sizes in self.bytes.items()
+                },
+                "call_latency": self.call_latency.snapshot(),
+                "attempt_latency": self.attempt_latency.snapshot(),
+            }
+            gauges = {name: list(funcs) for name, funcs in self._gauges.items()}
+        snapshot["gauges"] = {
+            name: sum(func() for func in funcs) for name, funcs in gauges.items()
+        }
+        return snapshot
+
+    def export(self) -> None:
+        """Push a snapshot to the exporter. The errors of the exporter are logged."""
+        if self.exporter is None:
+            return
+        try:
+            self.exporter(self.snapshot())
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Metrics export failed: %s", self)
+
+
+def error_class(e: Optional[BaseException], result: Any = None) -> str:
+    """Return the class of the error of a failed attempt.
+
+    Args:
+        e: The exception of the attempt, or None if it returned a result.
+        result: The result of the attempt.
+
+    Returns:
+        The name of the exception, or the status code of the result, such as "status 503".
+    """
+    if e is not None:
+        return type(e).__name__
+    status_code = getattr(result, "status_code", None)
+    return "result" if status_code is None else f"status {status_code}"
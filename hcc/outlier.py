@@ -0,0 +1,173 @@
+"""This module defines the OutlierDetector class, which ejects the sick endpoints of a balancer.
+
+The outlier detector checks the endpoints passively, from the outcomes of the attempts sent to
+them by a LoadBalancer. An endpoint is ejected from the rotation if:
+- it failed a number of consecutive attempts,
+- the failure rate of its recent attempts reaches a threshold, or
+- its latency is a multiple of the median latency of the other endpoints.
+
+An attempt fails if it raises an exception, such as a timeout, or its response has a 5xx status
+code. The ejection time doubles with every ejection of the same endpoint, up to a cap, and it is
+reset once the endpoint has stayed in rotation for the cap. The max ejection percentage keeps
+some endpoints in rotation even if all of them look sick, so that a general outage does not
+empty the balancer.
+"""
+
+from statistics import median
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+import logging
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .balancer import Endpoint
+
+logger = logging.getLogger("hcc.balancer")
+
+
+def is_failure(result: Any) -> bool:
+    """Return whether a response is a failure of its endpoint."""
+    status_code = getattr(result, "status_code", None)
+    return status_code is not None and status_code >= 500
+
+
+class OutlierDetector:
+    """The OutlierDetector class decides the ejections of the endpoints of a load balancer.
+
+    The OutlierDetector class takes the following parameters:
+        consecutive_failures: The number of consecutive failures which eject an endpoint
+                              (default is 5).
+        failure_rate_threshold: The failure rate of the recent attempts which ejects an endpoint
+                                (default is 0.5).
+        minimum_requests: The number of recent attempts needed before the failure rate and the
+                          latency of an endpoint are evaluated (default is 20).
+        window_size: The number of the most recent attempts of an endpoint in its failure rate
+                     (default is 50).
+        latency_factor: The multiple of the median latency of the other endpoints which ejects
+                        an endpoint (default is 3.0). If set to None, the latency is not checked.
+        base_ejection_time: The number of seconds of the first ejection (default is 30.0).
+        max_ejection_time: The cap of the ejection time in seconds (default is 300.0).
+        max_ejection_percent: The maximum percentage of the endpoints ejected at the same time
+                              (default is 50.0).
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, LoadBalancer, OutlierDetector
+
+    balancer = LoadBalancer(
+        ["http://10.0.0.1:8080", "http://10.0.0.2:8080", "http://10.0.0.3:8080"],
+        outlier_detector=OutlierDetector(consecutive_failures=3, base_ejection_time=10.0),
+    )
+    channel = Channel(url="/config", balancer=balancer)
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        consecutive_failures: int = 5,
+        failure_rate_threshold: float = 0.5,
+        minimum_requests: int = 20,
+        window_size: int = 50,
+        latency_factor: Optional[float] = 3.0,
+        base_ejection_time: float = 30.0,
+        max_ejection_time: float = 300.0,
+        max_ejection_percent: float = 50.0,
+    ):
+        assert minimum_requests <= window_size, (
+            "The minimum_requests must not exceed the window_size"
+        )
+        self.consecutive_failures = consecutive_failures
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_requests = minimum_requests
+        self.window_size = window_size
+        self.latency_factor = latency_factor
+        self.base_ejection_time = base_ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.max_ejection_percent = max_ejection_percent
+
+    def __repr__(self) -> str:
+        return (
+            f"OutlierDetector(consecutive_failures={self.consecutive_failures}, "
+            f"failure_rate_threshold={self.failure_rate_threshold}, "
+            f"latency_factor={self.latency_factor})"
+        )
+
+    def record(
+        self,
+        endpoint: "Endpoint",
+        endpoints: Sequence["Endpoint"],
+        failed: bool,
+        now: float,
+    ) -> None:
+        """Record the outcome of an attempt, and eject its endpoint if it is an outlier.
+
+        The lock of the load balancer has to be held.
+
+        Args:
+            endpoint: The endpoint of the attempt.
+            endpoints: All the endpoints of the load balancer.
+            failed: Whether the attempt failed.
+            now: The current monotonic time.
+        """
+        endpoint.consecutive_failures = (
+            endpoint.consecutive_failures + 1 if failed else 0
+        )
+        endpoint.outcomes.append(failed)
+        while len(endpoint.outcomes) > self.window_size:
+            endpoint.outcomes.popleft()
+        if endpoint.is_ejected(now):
+            return
+        reason = self._reason(endpoint, endpoints, now)
+        if reason is not None:
+            self._eject(endpoint, endpoints, now, reason)
+
+    def _reason(
+        self, endpoint: "Endpoint", endpoints: Sequence["Endpoint"], now: float
+    ) -> Optional[str]:
+        """Return why an endpoint is an outlier, or None if it is not."""
+        if endpoint.consecutive_failures >= self.consecutive_failures:
+            return f"{endpoint.consecutive_failures} consecutive failures"
+        if len(endpoint.outcomes) < self.minimum_requests:
+            return None
+        failure_rate = sum(endpoint.outcomes) / len(endpoint.outcomes)
+        if failure_rate >= self.failure_rate_threshold:
+            return f"failure rate of {failure_rate:.2f}"
+        if self.latency_factor is None:
+            return None
+        peers = [
+            e.latency
+            for e in endpoints
+            if e is not endpoint and e.latency > 0 and not e.is_ejected(now)
+        ]
+        if peers and endpoint.latency > self.latency_factor * median(peers):
+            return f"latency of {endpoint.latency:.3f} seconds"
+        return None
+
+    def _eject(
+        self,
+        endpoint: "Endpoint",
+        endpoints: Sequence["Endpoint"],
+        now: float,
+        reason: str,
+    ) -> None:
+        """Eject an endpoint, unless too many endpoints are ejected already."""
+        ejected = sum(1 for e in endpoints if e.is_ejected(now))
+        if (ejected + 1) * 100 > len(endpoints) * self.max_ejection_percent:
+            logger.info(
+                "Endpoint not ejected: %s: too many endpoints ejected: %s",
+                reason,
+                endpoint,
+            )
+            return
+        if now - endpoint.ejected_until >= self.max_ejection_time:
+            endpoint.ejections = 0
+        endpoint.ejections += 1
+        duration = min(
+            self.base_ejection_time * 2 ** (endpoint.ejections - 1),
+            self.max_ejection_time,
+        )
+        endpoint.ejected_until = now + duration
+        endpoint.consecutive_failures = 0
+        endpoint.outcomes.clear()
+        logger.warning(
+            "Endpoint ejected for %.1f seconds: %s: %s", duration, reason, endpoint
+        )
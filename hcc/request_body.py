@@ -0,0 +1,156 @@
+"""This module defines the RequestBody class, which makes streamed request bodies replayable.
+
+A request body given as bytes, a string or form fields can be sent again as is by every retry.
+A streamed body cannot: a file object is left at its end by the first attempt, and a generator
+is exhausted. The streamed bodies are therefore prepared once per call:
+- a seekable file object, such as an open file or an mmap, is rewound to its start position
+  before every attempt;
+- a one-shot source, such as a generator or a pipe, is spooled to a temporary file if the
+  request can be retried, so it can be rewound like a file. The spool is kept in memory up to
+  `SPOOL_MEMORY_SIZE` bytes, and written to disk beyond. A source larger than
+  `SPOOL_MAX_SIZE` bytes is not spooled further: it is sent once, and the call is not retried;
+- a one-shot source of a request which cannot be retried is streamed as is.
+
+The file objects are sent in blocks, with a Content-Length if their size is known, and the
+generators with chunked transfer encoding, so large uploads run in constant memory.
+"""
+
+from collections.abc import Iterator
+from typing import Any, BinaryIO, Iterable, Optional, Tuple, Union
+import io
+import itertools
+import logging
+import tempfile
+
+logger = logging.getLogger("hcc.request")
+
+SPOOL_MEMORY_SIZE = 1024 * 1024
+SPOOL_MAX_SIZE = 256 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class RequestBody:
+    """The RequestBody class prepares the data of a request to be sent by every attempt.
+
+    The RequestBody class takes the following parameters:
+        data: The data of the request body.
+        replay: Whether the body may be sent more than once, because the request can be
+                retried.
+        spool_memory_size: The number of bytes of a spooled body kept in memory before it is
+                           written to a temporary file (default is SPOOL_MEMORY_SIZE).
+        max_spool_size: The maximum number of bytes of a spooled body (default is
+                        SPOOL_MAX_SIZE). A larger one-shot source is sent once, without
+                        retries.
+
+    Attributes:
+        data: The data to send in place of the original data.
+        streamed: Whether the body is a file object or an iterator, which must not be sent by
+                  concurrent attempts.
+    """
+
+    def __init__(
+        self,
+        data: Any,
+        *,
+        replay: bool,
+        spool_memory_size: int = SPOOL_MEMORY_SIZE,
+        max_spool_size: int = SPOOL_MAX_SIZE,
+    ):
+        self.data = data
+        self.streamed = is_streamed(data)
+        self._start: Optional[int] = None
+        self._spool: Optional[BinaryIO] = None
+        if not self.streamed or not replay:
+            return
+        if _is_seekable(data):
+            self._start = data.tell()
+            return
+        self._spool, rest = _spool(data, spool_memory_size, max_spool_size)
+        if rest is None:
+            self.data = self._spool
+            self._start = 0
+            return
+        logger.warning(
+            "Request body larger than %d bytes is sent once, without retries",
+            max_spool_size,
+        )
+        self.data = _unspooled(self._spool, rest)
+
+    def __repr__(self) -> str:
+        return f"RequestBody(streamed={self.streamed}, spooled={self.spooled})"
+
+    @property
+    def replayable(self) -> bool:
+        """Whether the body can be sent again by a retry."""
+        return not self.streamed or self._start is not None
+
+    @property
+    def spooled(self) -> bool:
+        """Whether the body has been spooled to a temporary file."""
+        return self._spool is not None
+
+    def rewind(self) -> None:
+        """Rewind the body to its start position before an attempt."""
+        if self._start is not None:
+            self.data.seek(self._start)
+
+    def close(self) -> None:
+        """Release the temporary file of a spooled body. The original data is left open."""
+        if self._spool is not None:
+            self._spool.close()
+
+
+def is_streamed(data: Any) -> bool:
+    """Return whether the data of a request body is a file object or a one-shot iterator."""
+    return hasattr(data, "read") or isinstance(data, Iterator)
+
+
+def _is_seekable(data: Any) -> bool:
+    seekable = getattr(data, "seekable", None)
+    return seekable is not None and seekable() and hasattr(data, "tell")
+
+
+def _chunks(data: Any) -> Iterable[Union[bytes, str]]:
+    """Iterate over the chunks of a file object or an iterator."""
+    if not hasattr(data, "read"):
+        return data
+    return iter(lambda: data.read(CHUNK_SIZE), data.read(0))
+
+
+def _spool(
+    data: Any, memory_size: int, max_size: int
+) -> Tuple[BinaryIO, Optional[Iterator[bytes]]]:
+    """Copy a one-shot source to a buffer, which rolls over to a temporary file if it is large.
+
+    The buffer is not a `tempfile.SpooledTemporaryFile`, as requests asks the body for its file
+    descriptor to compute its length, which would roll it over to disk at once.
+
+    Returns:
+        The buffer, and the chunks of the source left once the buffer would exceed `max_size`,
+        or None if the whole source has been copied.
+    """
+    spool: BinaryIO = io.BytesIO()
+    size = 0
+    chunks = (
+        chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        for chunk in _chunks(data)
+    )
+    for chunk in chunks:
+        if size + len(chunk) > max_size:
+            spool.seek(0)
+            return spool, itertools.chain([chunk], chunks)
+        size += len(chunk)
+        if size > memory_size and isinstance(spool, io.BytesIO):
+            disk = tempfile.TemporaryFile()
+            disk.write(spool.getbuffer())
+            spool = disk  # type: ignore[assignment]
+        spool.write(chunk)
+    spool.seek(0)
+    logger.debug("Request body spooled for retries: %d bytes", size)
+    return spool, None
+
+
+def _unspooled(spool: BinaryIO, rest: Iterator[bytes]) -> Iterator[bytes]:
+    """Iterate over the spooled start of a source, then over the rest of the source."""
+    yield from iter(lambda: spool.read(CHUNK_SIZE), b"")
+    yield from rest
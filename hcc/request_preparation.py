@@ -0,0 +1,81 @@
+"""This module prepares the request bodies of a call, shared by the Channel and AsyncChannel classes.
+
+A request body is prepared once per call, before the first attempt, and resent by every retry:
+1. JSON data is serialized by the JSON codec of the channel, or by the standard library.
+2. The body is compressed by the compression of the channel, if it has one and the body is
+   large enough.
+3. A file object or a generator is wrapped in a RequestBody, so it can be rewound or replayed
+   before every attempt.
+
+The sizes of the bodies sent and received by every attempt are recorded in the metrics.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import requests
+
+from .compression import PreparedBody, RequestCompression, received_sizes
+from .json_codec import DEFAULT_JSON_CODEC, JsonCodec, encode_json_body
+from .metrics import Metrics
+from .request_body import RequestBody
+
+
+def prepare_body(
+    kwargs: Dict[str, Any],
+    *,
+    json_codec: Optional[JsonCodec],
+    compression: Optional[RequestCompression],
+    replay: bool,
+) -> Tuple[Optional[PreparedBody], RequestBody]:
+    """Prepare the body of a call once for all of its attempts.
+
+    The `data`, `json` and `headers` arguments of the request are replaced in place by the
+    serialized, compressed or replayable body and its headers.
+
+    Args:
+        kwargs: The arguments of the request.
+        json_codec: The JSON codec of the channel, or None to serialize the JSON data with the
+                    standard library.
+        compression: The compression of the channel, or None to send the body as is.
+        replay: Whether the body may be sent more than once.
+
+    Returns:
+        The prepared body, or None if it was not compressed, and the replayable body. The
+        replayable body has to be closed once the call is complete.
+    """
+    if kwargs.get("json") is not None:
+        data, headers = encode_json_body(
+            json_codec or DEFAULT_JSON_CODEC, kwargs["json"], kwargs.get("headers")
+        )
+        kwargs.update(data=data, json=None, headers=headers)
+    prepared = None
+    if compression is not None:
+        prepared = compression.prepare(
+            kwargs.get("data"), kwargs.get("json"), kwargs.get("headers")
+        )
+        if prepared is not None:
+            kwargs.update(data=prepared.data, json=None, headers=prepared.headers)
+    body = RequestBody(kwargs.get("data"), replay=replay)
+    if body.streamed:
+        kwargs["data"] = body.data
+    return prepared, body
+
+
+def record_bytes(
+    metrics: Optional[Metrics],
+    prepared: Optional[PreparedBody],
+    response: Optional[requests.Response],
+) -> None:
+    """Record the sizes of the bodies of an attempt in the metrics.
+
+    Args:
+        metrics: The metrics of the channel, or None if it has no metrics.
+        prepared: The prepared request body, or None if its size is not known.
+        response: The response, or None if its body is streamed.
+    """
+    if metrics is None:
+        return
+    if prepared is not None:
+        metrics.record_bytes("sent", len(prepared.data), prepared.size)
+    sizes = None if response is None else received_sizes(response)
+    if sizes is not None:
+        metrics.record_bytes("received", *sizes)
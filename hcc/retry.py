@@ -1,19 +1,49 @@
 """Retry module for retrying functions with different policies.
 
 This module provides a retry mechanism with configurable retry policies such as immediate retry,
-linear delay, and jitter delay, allowing functions to be retried on failure until a specified
-maximum retry count is reached.
+linear delay, jitter delay and exponential backoff, allowing functions to be retried on failure
+until a specified maximum retry count is reached. Besides the values of `RetryPolicy`, any
+`BackoffStrategy` can be used as a retry policy, and the delay can be overridden by a backoff
+hint of the server, such as a Retry-After header. Both blocking functions (`retry_function`) and coroutine
+functions (`async_retry_function`) can be retried.
 """
 
 from enum import Enum
-from typing import Callable, Any, Optional
+from typing import Awaitable, Callable, Any, Optional, TypeAlias
+import asyncio
 import logging
 import math
 import time
-import random
+
+from .circuit_breaker import CircuitBreaker
+from .deadline import MIN_ATTEMPT_TIME, Deadline
+from .exceptions import (
+    ConcurrencyLimitExceededError,
+    DeadlineExceededError,
+    RateLimitExceededError,
+    RetryBudgetExhaustedError,
+)
+from .metrics import Metrics, error_class
+from .rate_limit import RateLimiter
+from .retry_budget import RetryBudget
+from .backoff import (
+    MAX_BACKOFF_DELAY,
+    BackoffStrategy,
+    DecorrelatedJitterBackoff,
+    ExponentialBackoff,
+    FullJitterBackoff,
+    ImmediateBackoff,
+    JitterBackoff,
+    LinearBackoff,
+)
 
 logger = logging.getLogger("hcc.retry")
 
+# The exceptions of the attempts rejected by the client itself, before they are sent. They say
+# nothing about the health of the dependency, so they are not retried, do not spend the retry
+# budget, and are not recorded by the circuit breaker.
+LOCAL_REJECTIONS = (ConcurrencyLimitExceededError, DeadlineExceededError)
+
 
 class RetryPolicy(Enum):
     """The RetryPolicy enum defines the possible values for the retry policy.
@@ -23,19 +53,328 @@ class RetryPolicy(Enum):
     - LINEAR: Retry with a linear delay, which is equal to the base_delay.
     - JITTER: Retry with a jitter delay, which is a random value
               between 0.5 and 1.5 times the base_delay.
+    - EXPONENTIAL: Retry with a delay of base_delay * multiplier ** (attempt - 1),
+                   capped by max_delay.
+    - FULL_JITTER: Retry with a random delay between 0 and the capped exponential delay.
+    - DECORRELATED_JITTER: Retry with a random delay between the base_delay and
+                           multiplier times the previous delay, capped by max_delay.
     """
 
     IMMEDIATE = 1
     LINEAR = 2
     JITTER = 3
+    EXPONENTIAL = 4
+    FULL_JITTER = 5
+    DECORRELATED_JITTER = 6
+
+    def strategy(
+        self,
+        base_delay: int = 200,
+        multiplier: Optional[float] = None,
+        max_delay: Optional[int] = None,
+    ) -> BackoffStrategy:
+        """Create the backoff strategy of the retry policy.
+
+        Args:
+            base_delay: The base delay in milliseconds (default is 200).
+            multiplier: The growth factor of the exponential policies (default is None, which
+                        means 2.0, or 3.0 for DECORRELATED_JITTER).
+            max_delay: The cap of the delay of the exponential policies in milliseconds
+                       (default is None, which means no cap).
+
+        Returns:
+            The backoff strategy.
+        """
+        if self == RetryPolicy.IMMEDIATE:
+            return ImmediateBackoff()
+        if self == RetryPolicy.LINEAR:
+            return LinearBackoff(base_delay)
+        if self == RetryPolicy.JITTER:
+            return JitterBackoff(base_delay)
+        strategy_class = {
+            RetryPolicy.EXPONENTIAL: ExponentialBackoff,
+            RetryPolicy.FULL_JITTER: FullJitterBackoff,
+            RetryPolicy.DECORRELATED_JITTER: DecorrelatedJitterBackoff,
+        }[self]
+        if multiplier is None:
+            return strategy_class(base_delay=base_delay, max_delay=max_delay)
+        return strategy_class(base_delay, multiplier, max_delay)
+
+
+RetryPolicyType: TypeAlias = RetryPolicy | BackoffStrategy
+
+
+class _RetryState:
+    """Bookkeeping of the attempts shared by the blocking and the asyncio retry loops."""
+
+    def __init__(
+        self,
+        *,
+        is_retry_needed: Callable[[Any], bool],
+        max_retry_count: Optional[int],
+        retry_policy: Optional[RetryPolicyType],
+        base_delay: Optional[int],
+        multiplier: Optional[float],
+        max_delay: Optional[int],
+        retry_budget: Optional[RetryBudget],
+        circuit_breaker: Optional[CircuitBreaker],
+        retry_after: Optional[Callable[[Any], Optional[float]]] = None,
+        max_retry_after: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.is_retry_needed = is_retry_needed
+        self.retry_budget = retry_budget
+        self.circuit_breaker = circuit_breaker
+        self.retry_after = retry_after
+        self.max_retry_after = max_retry_after
+        self.deadline = deadline
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.max_retry_count = (
+            max_retry_count if max_retry_count is not None else math.inf
+        )
+        if retry_policy is None:
+            self.strategy: BackoffStrategy = ImmediateBackoff()
+        elif isinstance(retry_policy, RetryPolicy):
+            self.strategy = retry_policy.strategy(
+                base_delay if base_delay is not None else 200, multiplier, max_delay
+            )
+        else:
+            self.strategy = retry_policy
+        self.attempt = 0
+        self.previous_delay = 0.0
+        self.hint: Optional[float] = None
+        self.next_delay = 0.0
+        self.attempt_start = 0.0
+        self.probe = False
+
+    def start_attempt(self) -> float:
+        """Start the next attempt.
+
+        Returns:
+            The number of seconds to wait for the slot of the attempt in the rate limiter.
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed.
+            CircuitOpenError: If the attempt is rejected by the circuit breaker.
+            RateLimitExceededError: If the slot of the attempt is later than the timeout of
+                                    the rate limiter or the deadline.
+        """
+        self.attempt += 1
+        if self.deadline is not None and self.deadline.expired:
+            raise DeadlineExceededError(
+                f"Deadline exceeded before attempt {self.attempt}"
+            )
+        if self.circuit_breaker is not None:
+            self.probe = self.circuit_breaker.acquire()
+        wait = 0.0
+        if self.rate_limiter is not None:
+            timeout = self.rate_limiter.timeout
+            if self.deadline is not None:
+                # The slot is only reserved if the request can still be sent after the wait.
+                remaining = max(0.0, self.deadline.remaining() - MIN_ATTEMPT_TIME)
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            try:
+                wait = self.rate_limiter.reserve(timeout)
+            except RateLimitExceededError:
+                # The attempt is not sent, so it leaves the half-open circuit to the next one.
+                self._release_probe()
+                raise
+        if self.metrics is not None:
+            if wait:
+                self.metrics.record_sleep("rate_limit", wait)
+            self.attempt_start = self.metrics.start_attempt() + wait
+        return wait
+
+    def on_exception(self, e: Exception) -> bool:
+        """Register a failed attempt.
+
+        Returns:
+            True if the exception should be raised, False if the function should be retried.
+            The exception is raised at the maximum retry count, if the delay before the retry
+            does not fit in the deadline, or if the attempt was rejected by the client itself.
+
+        Raises:
+            RetryBudgetExhaustedError: If the retry is denied by the retry budget.
+        """
+        if isinstance(e, LOCAL_REJECTIONS):
+            logger.warning(
+                "Attempt %d/%s rejected locally: %s",
+                self.attempt,
+                self.max_retry_count,
+                str(e),
+            )
+            self._release_probe()
+            self._finish_attempt(error_class(e), None)
+            return True
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure()
+        if self.attempt == self.max_retry_count:
+            logger.warning(
+                "Attempt %d/%s returning with exception: %s",
+                self.attempt,
+                self.max_retry_count,
+                str(e),
+            )
+            self._finish_attempt(error_class(e), None)
+            return True
+        logger.warning(
+            "Attempt %d/%s failed with exception: %s",
+            self.attempt,
+            self.max_retry_count,
+            str(e),
+        )
+        if self._past_deadline():
+            self._finish_attempt(error_class(e), None)
+            return True
+        self._acquire_retry(None, e)
+        self._finish_attempt(error_class(e), "exception")
+        return False
+
+    def on_interrupt(self, e: BaseException) -> None:
+        """Register an attempt interrupted by a cancellation or an exit, which is not retried.
+
+        The interruption says nothing about the health of the dependency, so the probe of a
+        half-open circuit is released instead of being recorded as an outcome.
+        """
+        self._release_probe()
+        self._finish_attempt(error_class(e), None)
+
+    def _release_probe(self) -> None:
+        if self.probe and self.circuit_breaker is not None:
+            self.circuit_breaker.release_probe()
+        self.probe = False
+
+    def on_result(self, result: Any) -> bool:
+        """Register a completed attempt.
+
+        Returns:
+            True if the result should be returned, False if the function should be retried.
+            The result is returned at the maximum retry count, or if the delay before the retry
+            does not fit in the deadline.
+
+        Raises:
+            RetryBudgetExhaustedError: If the retry is denied by the retry budget.
+        """
+        failed = self.is_retry_needed(result)
+        error = error_class(None, result) if failed else None
+        if self.circuit_breaker is not None:
+            if failed:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+        if not failed and self.retry_budget is not None:
+            self.retry_budget.record_success()
+        if self.attempt == self.max_retry_count or not failed:
+            logger.info(
+                "Attempt %d/%s returning with: %s",
+                self.attempt,
+                self.max_retry_count,
+                result,
+            )
+            self._finish_attempt(error, None)
+            return True
+        logger.info(
+            "Attempt %d/%s failed with error result: %s",
+            self.attempt,
+            self.max_retry_count,
+            result,
+        )
+        if self.retry_after is not None:
+            self.hint = self.retry_after(result)
+        if self._past_deadline():
+            self._finish_attempt(error, None)
+            return True
+        self._acquire_retry(result, None)
+        self._finish_attempt(error, "result")
+        return False
+
+    def _acquire_retry(self, result: Any, e: Optional[Exception]) -> None:
+        """Withdraw a retry from the retry budget, or fail fast if it is exhausted."""
+        if self.retry_budget is None or self.retry_budget.try_acquire():
+            return
+        self._finish_attempt(error_class(e, result), None)
+        logger.warning(
+            "Attempt %d/%s not retried: retry budget exhausted: %s",
+            self.attempt,
+            self.max_retry_count,
+            self.retry_budget,
+        )
+        raise RetryBudgetExhaustedError(
+            f"Retry budget exhausted after attempt {self.attempt}: {self.retry_budget}",
+            last_result=result,
+        ) from e
+
+    def _past_deadline(self) -> bool:
+        """Compute the delay before the next attempt, and check whether it fits in the deadline."""
+        self.next_delay = self._compute_delay()
+        if self.deadline is None or self.next_delay < self.deadline.remaining():
+            return False
+        logger.warning(
+            "Attempt %d/%s not retried: delay of %.3f seconds exceeds the deadline: %s",
+            self.attempt,
+            self.max_retry_count,
+            self.next_delay,
+            self.deadline,
+        )
+        return True
+
+    def delay(self) -> float:
+        """Return the delay in seconds before the next attempt."""
+        if self.metrics is not None and self.next_delay:
+            self.metrics.record_sleep("backoff", self.next_delay)
+        return self.next_delay
+
+    def _finish_attempt(self, error: Optional[str], retry: Optional[str]) -> None:
+        """Record a completed attempt in the metrics.
+
+        Args:
+            error: The class of the error of the attempt, or None if it succeeded.
+            retry: The reason of the retry, "exception" or "result", or None if the attempt
+                   is not retried.
+        """
+        if self.metrics is not None:
+            self.metrics.finish_attempt(self.attempt_start, error, retry)
+
+    def _compute_delay(self) -> float:
+        """Compute the delay before the next attempt.
+
+        The backoff hint of the server, if there is one, overrides the retry policy. It never
+        exceeds MAX_BACKOFF_DELAY, so a huge hint cannot overflow the sleep.
+        """
+        if self.hint is None:
+            self.previous_delay = self.strategy.delay(self.attempt, self.previous_delay)
+            return self.previous_delay
+        delay, self.hint = min(self.hint, MAX_BACKOFF_DELAY / 1000), None
+        if self.max_retry_after is not None:
+            delay = min(delay, self.max_retry_after)
+        logger.info(
+            "Attempt %d/%s retried after %.3f seconds as requested by the server",
+            self.attempt,
+            self.max_retry_count,
+            delay,
+        )
+        self.previous_delay = delay
+        return delay
 
 
 def retry_function(
     func: Callable[[], Any],
     is_retry_needed: Callable[[Any], bool],
     max_retry_count: Optional[int] = None,
-    retry_policy: Optional[RetryPolicy] = RetryPolicy.LINEAR,
+    retry_policy: Optional[RetryPolicyType] = RetryPolicy.LINEAR,
     base_delay: Optional[int] = 200,
+    multiplier: Optional[float] = None,
+    max_delay: Optional[int] = None,
+    retry_budget: Optional[RetryBudget] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    retry_after: Optional[Callable[[Any], Optional[float]]] = None,
+    max_retry_after: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    metrics: Optional[Metrics] = None,
 ) -> Any:
     """Retry a function with different policies.
 
@@ -45,65 +384,168 @@ def retry_function(
         max_retry_count: The maximum number of retries (default is None).
                          If set to None, there is no limit on the number of retries.
         retry_policy: The retry policy (default is RetryPolicy.LINEAR).
+                      It is either a RetryPolicy or a BackoffStrategy. If set to None,
+                      the function is retried immediately.
         base_delay: The base delay in milliseconds (default is 200).
+        multiplier: The growth factor of the exponential retry policies (default is None,
+                    which means the default of the policy).
+        max_delay: The cap of the delay of the exponential retry policies in milliseconds
+                   (default is None, which means no cap).
+        retry_budget: The retry budget which has to allow every retry (default is None,
+                      which means no budget).
+        circuit_breaker: The circuit breaker which has to allow every attempt and records
+                         their outcomes (default is None, which means no circuit breaker).
+        retry_after: The function that returns the number of seconds the server asked to wait
+                     before retrying a result, or None if it gave no hint (default is None).
+                     The hint overrides the delay of the retry policy.
+        max_retry_after: The cap of the delay requested by the server in seconds
+                         (default is None, which means the one-day ceiling of the delays).
+        deadline: The deadline of the whole call (default is None, which means no deadline).
+                  No retry is started if its delay does not fit in the remaining time.
+        rate_limiter: The rate limiter which every attempt waits for (default is None, which
+                      means no rate limit).
+        metrics: The metrics recording the attempts, the retries and the delays (default is
+                 None, which means no metrics).
 
     Returns:
         The result of the function after the first successful call or the last call.
 
     Raises:
         Exception: If the maximum retry count is reached and the function still fails.
+        RetryBudgetExhaustedError: If a retry is denied by the retry budget.
+        CircuitOpenError: If an attempt is rejected by the circuit breaker.
+        DeadlineExceededError: If the deadline has passed before the first attempt.
+        RateLimitExceededError: If an attempt would wait too long for the rate limiter.
+        ConcurrencyLimitExceededError: If an attempt finds no free slot in the concurrency
+                                       limiter. It is not retried.
     """
-    _max_retry_count = max_retry_count if max_retry_count is not None else math.inf
-    _base_delay = base_delay if base_delay is not None else 200
-    _base_delay_in_seconds = _base_delay / 1000
-    attempt = 0
+    state = _RetryState(
+        is_retry_needed=is_retry_needed,
+        max_retry_count=max_retry_count,
+        retry_policy=retry_policy,
+        base_delay=base_delay,
+        multiplier=multiplier,
+        max_delay=max_delay,
+        retry_budget=retry_budget,
+        circuit_breaker=circuit_breaker,
+        retry_after=retry_after,
+        max_retry_after=max_retry_after,
+        deadline=deadline,
+        rate_limiter=rate_limiter,
+        metrics=metrics,
+    )
     while True:
-        result = None
-        attempt += 1
+        wait = state.start_attempt()
         try:
+            if wait:
+                time.sleep(wait)
             result = func()
         except Exception as e:  # pylint: disable=broad-exception-caught
-            if attempt == _max_retry_count:
-                logger.warning(
-                    "Attempt %d/%d returning with exception: %s",
-                    attempt,
-                    _max_retry_count,
-                    str(e),
-                )
-                raise e
-            logger.warning(
-                "Attempt %d/%d failed with exception: %s",
-                attempt,
-                _max_retry_count,
-                str(e),
-            )
+            if state.on_exception(e):
+                raise
+        except BaseException as e:
+            state.on_interrupt(e)
+            raise
         else:
-            if attempt == _max_retry_count:
-                logger.info(
-                    "Attempt %d/%d returning with: %s",
-                    attempt,
-                    _max_retry_count,
-                    result,
-                )
+            if state.on_result(result):
                 return result
-            if not is_retry_needed(result):
-                logger.info(
-                    "Attempt %d/%d returning with: %s",
-                    attempt,
-                    _max_retry_count,
-                    result,
-                )
+        delay = state.delay()
+        if delay:
+            time.sleep(delay)
+
+
+async def async_retry_function(
+    func: Callable[[], Awaitable[Any]],
+    is_retry_needed: Callable[[Any], bool],
+    max_retry_count: Optional[int] = None,
+    retry_policy: Optional[RetryPolicyType] = RetryPolicy.LINEAR,
+    base_delay: Optional[int] = 200,
+    multiplier: Optional[float] = None,
+    max_delay: Optional[int] = None,
+    retry_budget: Optional[RetryBudget] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    retry_after: Optional[Callable[[Any], Optional[float]]] = None,
+    max_retry_after: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    metrics: Optional[Metrics] = None,
+) -> Any:
+    """Retry a coroutine function with different policies.
+
+    It is the asyncio counterpart of `retry_function`: the attempts are awaited and the delays
+    between them are spent in `asyncio.sleep`, so the event loop keeps serving other tasks.
+
+    Args:
+        func: The coroutine function to be retried.
+        is_retry_needed: The function that determines if a retry is needed.
+        max_retry_count: The maximum number of retries (default is None).
+                         If set to None, there is no limit on the number of retries.
+        retry_policy: The retry policy (default is RetryPolicy.LINEAR).
+                      It is either a RetryPolicy or a BackoffStrategy. If set to None,
+                      the function is retried immediately.
+        base_delay: The base delay in milliseconds (default is 200).
+        multiplier: The growth factor of the exponential retry policies (default is None,
+                    which means the default of the policy).
+        max_delay: The cap of the delay of the exponential retry policies in milliseconds
+                   (default is None, which means no cap).
+        retry_budget: The retry budget which has to allow every retry (default is None,
+                      which means no budget).
+        circuit_breaker: The circuit breaker which has to allow every attempt and records
+                         their outcomes (default is None, which means no circuit breaker).
+        retry_after: The function that returns the number of seconds the server asked to wait
+                     before retrying a result, or None if it gave no hint (default is None).
+                     The hint overrides the delay of the retry policy.
+        max_retry_after: The cap of the delay requested by the server in seconds
+                         (default is None, which means the one-day ceiling of the delays).
+        deadline: The deadline of the whole call (default is None, which means no deadline).
+                  No retry is started if its delay does not fit in the remaining time.
+        rate_limiter: The rate limiter which every attempt waits for (default is None, which
+                      means no rate limit).
+        metrics: The metrics recording the attempts, the retries and the delays (default is
+                 None, which means no metrics).
+
+    Returns:
+        The result of the coroutine after the first successful call or the last call.
+
+    Raises:
+        Exception: If the maximum retry count is reached and the coroutine still fails.
+        RetryBudgetExhaustedError: If a retry is denied by the retry budget.
+        CircuitOpenError: If an attempt is rejected by the circuit breaker.
+        DeadlineExceededError: If the deadline has passed before the first attempt.
+        RateLimitExceededError: If an attempt would wait too long for the rate limiter.
+        ConcurrencyLimitExceededError: If an attempt finds no free slot in the concurrency
+                                       limiter. It is not retried.
+    """
+    state = _RetryState(
+        is_retry_needed=is_retry_needed,
+        max_retry_count=max_retry_count,
+        retry_policy=retry_policy,
+        base_delay=base_delay,
+        multiplier=multiplier,
+        max_delay=max_delay,
+        retry_budget=retry_budget,
+        circuit_breaker=circuit_breaker,
+        retry_after=retry_after,
+        max_retry_after=max_retry_after,
+        deadline=deadline,
+        rate_limiter=rate_limiter,
+        metrics=metrics,
+    )
+    while True:
+        wait = state.start_attempt()
+        try:
+            if wait:
+                await asyncio.sleep(wait)
+            result = await func()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if state.on_exception(e):
+                raise
+        except BaseException as e:
+            state.on_interrupt(e)
+            raise
+        else:
+            if state.on_result(result):
                 return result
-            logger.info(
-                "Attempt %d/%d failed with error result: %s",
-                attempt,
-                _max_retry_count,
-                result,
-            )
-        if attempt < _max_retry_count:
-            if retry_policy == RetryPolicy.IMMEDIATE:
-                pass
-            elif retry_policy == RetryPolicy.LINEAR:
-                time.sleep(_base_delay_in_seconds)
-            elif retry_policy == RetryPolicy.JITTER:
-                time.sleep(_base_delay_in_seconds * random.uniform(0.5, 1.5))
+        delay = state.delay()
+        if delay:
+            await asyncio.sleep(delay)
@@ -0,0 +1,80 @@
+"""This module parses the backoff hints sent by servers in the headers of their responses.
+
+A server which rejects a request because of overload or rate limiting (typically with 429 Too
+Many Requests or 503 Service Unavailable) can tell the client when to retry:
+- Retry-After: Either a number of seconds, or an HTTP date.
+- RateLimit-Remaining and RateLimit-Reset: The remaining quota and the number of seconds until
+  the quota is reset. The X-RateLimit- variants are also understood, where the reset may be a
+  Unix timestamp.
+
+The hint overrides the delay of the retry policy in `retry_function`.
+"""
+
+from collections.abc import Mapping
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+import math
+import time
+
+RATE_LIMIT_PREFIXES = ("RateLimit-", "X-RateLimit-")
+# Reset values above this are Unix timestamps rather than numbers of seconds (2001-09-09).
+EPOCH_THRESHOLD = 1_000_000_000
+
+
+def parse_retry_after(value: str, now: Optional[float] = None) -> Optional[float]:
+    """Parse the value of a Retry-After header.
+
+    Args:
+        value: The delta-seconds or HTTP-date value of the header.
+        now: The current Unix time (default is None, which means `time.time()`).
+
+    Returns:
+        The number of seconds to wait, or None if the value is invalid or not finite.
+    """
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        seconds = date.timestamp() - (time.time() if now is None else now)
+    else:
+        # NaN, infinite and overflowing values such as "inf" or "1e400" are no valid hint.
+        if not math.isfinite(seconds):
+            return None
+    return max(0.0, seconds)
+
+
+def retry_after_hint(response: Any, now: Optional[float] = None) -> Optional[float]:
+    """Return the number of seconds the server asked the client to wait before retrying.
+
+    The Retry-After header takes precedence over the rate limit headers, which only give a hint
+    when the remaining quota is 0.
+
+    Args:
+        response: The response of the failed attempt.
+        now: The current Unix time (default is None, which means `time.time()`).
+
+    Returns:
+        The number of seconds to wait, or None if the response has no valid hint.
+    """
+    headers = getattr(response, "headers", None)
+    if not isinstance(headers, Mapping):
+        return None
+    if "Retry-After" in headers:
+        return parse_retry_after(headers["Retry-After"], now)
+    for prefix in RATE_LIMIT_PREFIXES:
+        remaining = headers.get(prefix + "Remaining")
+        reset = headers.get(prefix + "Reset")
+        if remaining is None or reset is None or remaining.strip() != "0":
+            continue
+        seconds = parse_retry_after(reset, now)
+        if seconds is not None and seconds > EPOCH_THRESHOLD:
+            return max(0.0, seconds - (time.time() if now is None else now))
+        return seconds
+    return None
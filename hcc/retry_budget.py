@@ -0,0 +1,92 @@
+"""This module defines the RetryBudget class, which bounds the load added by retries.
+
+A retry budget allows retries only while they stay under a configured ratio of the recent
+successful requests. Every successful call deposits `ratio` tokens into a token bucket, and
+every retry withdraws one token. A minimum number of retries per second is always refilled, so
+a client that has not succeeded yet can still retry a little. When the bucket is empty,
+`retry_function` fails fast with a `RetryBudgetExhaustedError` instead of retrying.
+
+A budget can be attached to one Channel or shared between Channels.
+"""
+
+from typing import Optional
+import threading
+import time
+
+
+class RetryBudget:
+    """The RetryBudget class is a thread-safe token bucket limiting the number of retries.
+
+    The RetryBudget class takes the following parameters:
+        ratio: The number of retries allowed per successful call (default is 0.2).
+        min_retries_per_second: The number of retries refilled every second regardless of the
+                                successful calls (default is 10.0).
+        capacity: The maximum number of tokens in the bucket (default is None, which means
+                  10 seconds worth of `min_retries_per_second`, but at least 1 token).
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, RetryBudget
+
+    budget = RetryBudget(ratio=0.1, min_retries_per_second=5.0)
+    users = Channel(url="https://api.example.com/users", retry_budget=budget)
+    orders = Channel(url="https://api.example.com/orders", retry_budget=budget)
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        ratio: float = 0.2,
+        min_retries_per_second: float = 10.0,
+        capacity: Optional[float] = None,
+    ):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.capacity = (
+            capacity if capacity is not None else max(10 * min_retries_per_second, 1.0)
+        )
+        self._tokens = min(self.capacity, max(min_retries_per_second, 1.0))
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryBudget(ratio={self.ratio}, "
+            f"min_retries_per_second={self.min_retries_per_second}, "
+            f"capacity={self.capacity})"
+        )
+
+    @property
+    def tokens(self) -> float:
+        """The number of retries currently allowed."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def record_success(self) -> None:
+        """Deposit the tokens earned by a successful call."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Withdraw the token of a retry.
+
+        Returns:
+            True if the retry is allowed, False if the budget is exhausted.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(
+            self.capacity, self._tokens + elapsed * self.min_retries_per_second
+        )
@@ -0,0 +1,203 @@
+"""This module defines the SessionPool class, a process-wide registry of pooled sessions.
+
+The one-shot request functions (`hcc.get`, `hcc.post`, ...) create a new `Channel` per call.
+To let them reuse warm keep-alive connections, the channels borrow their `requests.Session`
+from a shared `SessionPool`, where the sessions are keyed by scheme, host, port and TLS
+settings. The least recently used sessions are evicted when the pool is full, and sessions that
+have not been used for a while are closed.
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+import logging
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("hcc.pool")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+SessionKey = Tuple[str, str, Optional[int], bool | str, Optional[str | Tuple[str, str]]]
+
+
+def create_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+) -> requests.Session:
+    """Create a session with a pooled HTTP adapter mounted for HTTP and HTTPS.
+
+    Args:
+        pool_connections: The number of per-host connection pools to cache (default is 10).
+        pool_maxsize: The maximum number of connections kept alive per host (default is 10).
+        pool_block: Whether to block when no free connection is available (default is False).
+
+    Returns:
+        The created session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class SessionPool:
+    """The SessionPool class is a thread-safe registry of pooled sessions.
+
+    The SessionPool class takes the following parameters:
+        max_size: The maximum number of sessions kept in the pool (default is 32).
+                  The least recently used session is closed when the limit is exceeded.
+        idle_timeout: The number of seconds after which an unused session is closed
+                      (default is 60.0). If set to None, sessions are never reaped.
+        pool_connections: The number of per-host connection pools of each session (default is 10).
+        pool_maxsize: The maximum number of connections kept alive per host (default is 10).
+        pool_block: Whether to block when no free connection is available (default is False).
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, SessionPool
+
+    pool = SessionPool(max_size=8, idle_timeout=30.0)
+    channel = Channel(url=url, session=pool.session(url))
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 32,
+        idle_timeout: Optional[float] = 60.0,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._sessions: OrderedDict[SessionKey, Tuple[requests.Session, float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @staticmethod
+    def key(
+        url: str,
+        *,
+        verify: bool | str = True,
+        cert: Optional[str | Tuple[str, str]] = None,
+    ) -> SessionKey:
+        """Compute the registry key of an URL.
+
+        Args:
+            url: The URL of the request.
+            verify: The TLS verification setting of the session (default is True).
+            cert: The TLS client certificate of the session (default is None).
+
+        Returns:
+            The key made of the scheme, host, port and the TLS settings.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+        port = parts.port or DEFAULT_PORTS.get(scheme)
+        return (scheme, host, port, verify, cert)
+
+    def session(
+        self,
+        url: str,
+        *,
+        verify: bool | str = True,
+        cert: Optional[str | Tuple[str, str]] = None,
+    ) -> requests.Session:
+        """Return the pooled session of an URL, creating it if necessary.
+
+        Args:
+            url: The URL of the request.
+            verify: The TLS verification setting of the session (default is True).
+            cert: The TLS client certificate of the session (default is None).
+
+        Returns:
+            The session which serves the origin of the URL.
+        """
+        key = self.key(url, verify=verify, cert=cert)
+        now = time.monotonic()
+        with self._lock:
+            self._reap(now)
+            if key in self._sessions:
+                session, _ = self._sessions[key]
+                self._sessions.move_to_end(key)
+            else:
+                session = create_session(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=self.pool_block,
+                )
+                session.verify = verify
+                session.cert = cert
+                logger.info("Pooled session created: %s", key)
+            self._sessions[key] = (session, now)
+            while len(self._sessions) > self.max_size:
+                evicted_key, (evicted_session, _) = self._sessions.popitem(last=False)
+                evicted_session.close()
+                logger.info("Pooled session evicted: %s", evicted_key)
+        return session
+
+    def close(self) -> None:
+        """Close every session of the pool."""
+        with self._lock:
+            while self._sessions:
+                _, (session, _) = self._sessions.popitem()
+                session.close()
+
+    def _reap(self, now: float) -> None:
+        """Close the sessions that have been idle for longer than the idle timeout."""
+        if self.idle_timeout is None:
+            return
+        while self._sessions:
+            key, (session, last_used) = next(iter(self._sessions.items()))
+            if now - last_used < self.idle_timeout:
+                return
+            del self._sessions[key]
+            session.close()
+            logger.info("Pooled session reaped: %s", key)
+
+
+default_pool = SessionPool()
+
+
+def connection_usage(session: requests.Session) -> Tuple[int, int]:
+    """Return the number of the connections of a session in use, and the size of its pools.
+
+    Args:
+        session: The session, whose HTTP adapters are inspected.
+
+    Returns:
+        The number of the connections checked out of the pools, and the total capacity of the
+        pools.
+    """
+    in_use = capacity = 0
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        poolmanager = getattr(adapter, "poolmanager", None)
+        if poolmanager is None:
+            continue
+        for key in poolmanager.pools.keys():
+            pool = poolmanager.pools.get(key)
+            if pool is None or pool.pool is None:
+                continue
+            capacity += pool.pool.maxsize
+            in_use += pool.pool.maxsize - pool.pool.qsize()
+    return in_use, capacity
@@ -1,14 +1,19 @@
 """This module defines methods for making HTTP requests.
 
 When making multiple requests towards an URL, consider using the `Channel` class.
+
+The requests are sent through the sessions of `default_pool`, so consecutive calls towards the
+same origin reuse the pooled keep-alive connections.
 """
 
-from typing import Optional, Dict
+from typing import Iterable, Iterator, Optional, Dict
 import requests
 
+from .batch import BatchResult, RequestSpec, run_batch
 from .channel import Channel
-from .retry import RetryPolicy
+from .retry import RetryPolicyType
 from .custom_data_types import DataType, JsonType, HeaderType
+from .session_pool import default_pool
 
 
 def get(
@@ -18,8 +23,9 @@ def get(
     headers: Optional[HeaderType] = None,
     timeout: float = 2.0,
     max_retry_count: Optional[int] = 5,
-    retry_policy: Optional[RetryPolicy] = None,
+    retry_policy: Optional[RetryPolicyType] = None,
     base_delay: Optional[int] = None,
+    deadline: Optional[float] = None,
 ) -> requests.Response:
     """The get method sends a GET request.
 
@@ -31,7 +37,10 @@ def get(
         max_retry_count: The maximum number of retries for failed requests (default is 5).
                          If set to None, there is no limit on the number of retries.
         retry_policy: The retry policy for failed requests (default is None).
+                      It is either a RetryPolicy or a BackoffStrategy.
         base_delay: The base delay for retries in milliseconds (default is None).
+        deadline: The total time budget of the request in seconds, including every retry
+                  (default is None, which means no deadline).
 
     Returns:
         The HTTP response from the first successful or last request.
@@ -45,6 +54,8 @@ def get(
         max_retry_count=max_retry_count,
         retry_policy=retry_policy,
         base_delay=base_delay,
+        deadline=deadline,
+        session=default_pool.session(url),
     ).get(
         params=params,
         headers=headers,
@@ -59,8 +70,9 @@ def post(
     headers: Optional[HeaderType] = None,
     timeout: float = 2.0,
     max_retry_count: Optional[int] = 5,
-    retry_policy: Optional[RetryPolicy] = None,
+    retry_policy: Optional[RetryPolicyType] = None,
     base_delay: Optional[int] = None,
+    deadline: Optional[float] = None,
 ) -> requests.Response:
     """The post method sends a POST request.
 
@@ -75,7 +87,10 @@ def post(
         max_retry_count: The maximum number of retries for failed requests (default is 5).
                          If set to None, there is no limit on the number of retries.
         retry_policy: The retry policy for failed requests (default is None).
+                      It is either a RetryPolicy or a BackoffStrategy.
         base_delay: The base delay for retries in milliseconds (default is None).
+        deadline: The total time budget of the request in seconds, including every retry
+                  (default is None, which means no deadline).
 
     Returns:
         The HTTP response from the first successful or last request.
@@ -89,6 +104,8 @@ def post(
         max_retry_count=max_retry_count,
         retry_policy=retry_policy,
         base_delay=base_delay,
+        deadline=deadline,
+        session=default_pool.session(url),
     ).post(
         data=data,
         json=json,
@@ -104,8 +121,9 @@ def put(
     headers: Optional[HeaderType] = None,
     timeout: float = 2.0,
     max_retry_count: Optional[int] = 5,
-    retry_policy: Optional[RetryPolicy] = None,
+    retry_policy: Optional[RetryPolicyType] = None,
     base_delay: Optional[int] = None,
+    deadline: Optional[float] = None,
 ) -> requests.Response:
     """The put method sends a PUT request.
 
@@ -120,7 +138,10 @@ def put(
         max_retry_count: The maximum number of retries for failed requests (default is 5).
                          If set to None, there is no limit on the number of retries.
         retry_policy: The retry policy for failed requests (default is None).
+                      It is either a RetryPolicy or a BackoffStrategy.
         base_delay: The base delay for retries in milliseconds (default is None).
+        deadline: The total time budget of the request in seconds, including every retry
+                  (default is None, which means no deadline).
 
     Returns:
         The HTTP response from the first successful or last request.
@@ -134,6 +155,8 @@ def put(
         max_retry_count=max_retry_count,
         retry_policy=retry_policy,
         base_delay=base_delay,
+        deadline=deadline,
+        session=default_pool.session(url),
     ).put(
         data=data,
         json=json,
@@ -147,8 +170,9 @@ def delete(
     headers: Optional[HeaderType] = None,
     timeout: float = 2.0,
     max_retry_count: Optional[int] = 5,
-    retry_policy: Optional[RetryPolicy] = None,
+    retry_policy: Optional[RetryPolicyType] = None,
     base_delay: Optional[int] = None,
+    deadline: Optional[float] = None,
 ) -> requests.Response:
     """The delete method sends a DELETE request.
 
@@ -159,7 +183,10 @@ def delete(
         max_retry_count: The maximum number of retries for failed requests (default is 5).
                          If set to None, there is no limit on the number of retries.
         retry_policy: The retry policy for failed requests (default is None).
+                      It is either a RetryPolicy or a BackoffStrategy.
         base_delay: The base delay for retries in milliseconds (default is None).
+        deadline: The total time budget of the request in seconds, including every retry
+                  (default is None, which means no deadline).
 
     Returns:
         The HTTP response from the first successful or last request.
@@ -173,6 +200,8 @@ def delete(
         max_retry_count=max_retry_count,
         retry_policy=retry_policy,
         base_delay=base_delay,
+        deadline=deadline,
+        session=default_pool.session(url),
     ).delete(
         headers=headers,
     )
@@ -186,8 +215,9 @@ def patch(
     headers: Optional[HeaderType] = None,
     timeout: float = 2.0,
     max_retry_count: Optional[int] = 5,
-    retry_policy: Optional[RetryPolicy] = None,
+    retry_policy: Optional[RetryPolicyType] = None,
     base_delay: Optional[int] = None,
+    deadline: Optional[float] = None,
 ) -> requests.Response:
     """The patch method sends a PATCH request.
 
@@ -202,7 +232,10 @@ def patch(
         max_retry_count: The maximum number of retries for failed requests (default is 5).
                          If set to None, there is no limit on the number of retries.
         retry_policy: The retry policy for failed requests (default is None).
+                      It is either a RetryPolicy or a BackoffStrategy.
         base_delay: The base delay for retries in milliseconds (default is None).
+        deadline: The total time budget of the request in seconds, including every retry
+                  (default is None, which means no deadline).
 
     Returns:
         The HTTP response from the first successful or last request.
@@ -216,8 +249,60 @@ def patch(
         max_retry_count=max_retry_count,
         retry_policy=retry_policy,
         base_delay=base_delay,
+        deadline=deadline,
+        session=default_pool.session(url),
     ).patch(
         data=data,
         json=json,
         headers=headers,
     )
+
+
+def batch(
+    specs: Iterable[RequestSpec],
+    *,
+    max_workers: int = 10,
+    ordered: bool = True,
+    timeout: float = 2.0,
+    max_retry_count: Optional[int] = 5,
+    retry_policy: Optional[RetryPolicyType] = None,
+    base_delay: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[BatchResult]:
+    """The batch method sends a batch of requests concurrently over a bounded thread pool.
+
+    Every request is retried on its own, and exceptions are captured in the results instead of
+    aborting the batch.
+
+    Args:
+        specs: The specifications of the requests. Each of them must have an URL.
+        max_workers: The maximum number of concurrent requests (default is 10).
+        ordered: Whether to yield the results in the order of the specs (default is True).
+            Otherwise the results are yielded in the order of completion.
+        timeout: The timeout for the requests (default is 2.0 seconds).
+        max_retry_count: The maximum number of retries for failed requests (default is 5).
+                         If set to None, there is no limit on the number of retries.
+        retry_policy: The retry policy for failed requests (default is None).
+                      It is either a RetryPolicy or a BackoffStrategy.
+        base_delay: The base delay for retries in milliseconds (default is None).
+        deadline: The total time budget of the request in seconds, including every retry
+                  (default is None, which means no deadline).
+
+    Returns:
+        An iterator of the results.
+    """
+
+    def send(spec: RequestSpec) -> requests.Response:
+        assert spec.url is not None, "The URL of the request must be provided"
+        channel = Channel(
+            url=spec.url,
+            timeout=timeout,
+            max_retry_count=max_retry_count,
+            retry_policy=retry_policy,
+            base_delay=base_delay,
+            deadline=deadline,
+            session=default_pool.session(spec.url),
+        )
+        return channel._send_spec(spec)  # pylint: disable=protected-access
+
+    return run_batch(send, specs, max_workers=max_workers, ordered=ordered)
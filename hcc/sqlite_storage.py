@@ -0,0 +1,204 @@
+"""This module defines the SqliteStorage class, a persistent storage of cached responses.
+
+The responses are stored in an SQLite database in WAL mode, so they survive restarts, and the
+processes of a host can share one cache file: readers do not block the writer, and concurrent
+writers wait for each other up to the busy timeout. Every thread uses its own connection.
+
+An entry is one row: the status code and the timestamps are stored in integer and real columns,
+the headers in compact JSON, and the body as a raw blob. The size of the database is bounded by
+evicting the least recently used entries.
+"""
+
+from pathlib import Path
+from typing import Any, List, Optional
+import json
+import sqlite3
+import threading
+import time
+
+from .cache import CacheEntry, CacheStorage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    vary TEXT NOT NULL,
+    content BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+# Keeps the rows of the most recently used entries within the bounds, and deletes the rest.
+EVICT = """
+DELETE FROM entries WHERE key IN (
+    SELECT key FROM (
+        SELECT
+            key,
+            ROW_NUMBER() OVER recent AS position,
+            SUM(size) OVER recent AS total
+        FROM entries
+        WINDOW recent AS (ORDER BY accessed_at DESC, rowid DESC)
+    )
+    WHERE position > ? OR total > ?
+)
+"""
+
+# The access time of an entry is only updated if it is older than this, to spare writes.
+ACCESS_RESOLUTION = 1.0
+
+
+class SqliteStorage(CacheStorage):
+    """The SqliteStorage class is a disk-backed LRU storage of cache entries.
+
+    The SqliteStorage class takes the following parameters:
+        path: The path of the database file. It is created if it does not exist.
+        max_entries: The maximum number of entries (default is 10000).
+        max_bytes: The maximum total size of the bodies in bytes (default is 256 MiB).
+        timeout: The number of seconds to wait for the lock of another writer (default is 5.0).
+
+    Typical usage example:
+    ```python
+    from hcc import Channel, ResponseCache, SqliteStorage
+
+    cache = ResponseCache(storage=SqliteStorage("/var/cache/app/http.sqlite"))
+    channel = Channel(url="https://api.example.com/config", cache=cache)
+    ```
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+        timeout: float = 5.0,
+    ):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+
+    def __repr__(self) -> str:
+        return f"SqliteStorage(path={self.path!r}, max_entries={self.max_entries})"
+
+    def __len__(self) -> int:
+        (count,) = self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()
+        return int(count)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry of a key, or None if there is none."""
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT url, status_code, reason, headers, vary, content, stored_at, "
+            "expires_at, accessed_at FROM entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        (
+            url,
+            status_code,
+            reason,
+            headers,
+            vary,
+            content,
+            stored_at,
+            expires_at,
+            accessed_at,
+        ) = row
+        now = time.time()
+        if now - accessed_at >= ACCESS_RESOLUTION:
+            connection.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return CacheEntry(
+            url=url,
+            status_code=status_code,
+            reason=reason,
+            headers=json.loads(headers),
+            content=bytes(content),
+            stored_at=stored_at,
+            expires_at=expires_at,
+            vary=json.loads(vary),
+        )
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store the entry of a key, and evict the least recently used entries if needed."""
+        if entry.size > self.max_bytes:
+            self.delete(key)
+            return
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.url,
+                    entry.status_code,
+                    entry.reason,
+                    _dumps(entry.headers),
+                    _dumps(entry.vary),
+                    entry.content,
+                    entry.size,
+                    entry.stored_at,
+                    entry.expires_at,
+                    time.time(),
+                ),
+            )
+            connection.execute(EVICT, (self.max_entries, self.max_bytes))
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def delete(self, key: str) -> None:
+        """Delete the entry of a key, if there is one."""
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        self._connection().execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        """Close the connections of every thread."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread, and open it if needed."""
+        connection: Optional[sqlite3.Connection] = getattr(
+            self._local, "connection", None
+        )
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
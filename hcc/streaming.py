@@ -0,0 +1,200 @@
+"""This module defines the StreamedResponse class, which reads a response body in chunks.
+
+A streamed response is returned as soon as its status line and headers have arrived, so a large
+body is never held in memory as a whole. The retries of a streamed request only cover the
+connection and the status of the response: once the body is being read, a broken stream is
+raised to the caller, as a half-consumed body cannot be replayed.
+
+The max body size guard aborts a response whose Content-Length exceeds the limit before any
+byte of the body is read, and a response without a Content-Length as soon as the decoded bytes
+read exceed the limit. The compressed bodies are decoded incrementally while they are read, and
+the limit applies to the decoded bytes. Closing a streamed response hands its connection back to
+the pool once the body has been read in full, or drops the connection otherwise.
+"""
+
+from types import TracebackType
+from typing import Any, Iterator, Optional, Union
+import logging
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import stream_decode_response_unicode
+
+from .exceptions import ResponseTooLargeError
+from .metrics import Metrics
+
+logger = logging.getLogger("hcc.request")
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class StreamedResponse:
+    """The StreamedResponse class iterates over the body of a response opened with `stream=True`.
+
+    The StreamedResponse class takes the following parameters:
+        response: The response opened with `stream=True`, whose body is not read yet.
+        max_body_size: The maximum number of bytes of the decoded body (default is None, which
+                       means no limit).
+        metrics: The metrics recording the bytes of the body on the wire and decoded when the
+                 response is closed (default is None, which means no metrics).
+
+    Raises:
+        ResponseTooLargeError: If the Content-Length of the response exceeds the limit. The
+                               response is closed.
+
+    Typical usage example:
+    ```python
+    from hcc import Channel
+
+    with Channel(url="https://api.example.com/export") as channel:
+        with channel.stream_get(max_body_size=1 << 30) as response:
+            for line in response.iter_lines():
+                print(line)
+    ```
+    """
+
+    def __init__(
+        self,
+        response: requests.Response,
+        *,
+        max_body_size: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.response = response
+        self.max_body_size = max_body_size
+        self.metrics = metrics
+        self.bytes_read = 0
+        self._closed = False
+        content_length = response.headers.get("Content-Length", "")
+        if (
+            max_body_size is not None
+            and content_length.isdigit()
+            and int(content_length) > max_body_size
+        ):
+            self._abort(int(content_length))
+
+    def __repr__(self) -> str:
+        return (
+            f"StreamedResponse(status_code={self.status_code}, "
+            f"bytes_read={self.bytes_read})"
+        )
+
+    def __enter__(self) -> "StreamedResponse":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    @property
+    def status_code(self) -> int:
+        """The status code of the response."""
+        return self.response.status_code
+
+    @property
+    def headers(self) -> CaseInsensitiveDict[str]:
+        """The headers of the response."""
+        return self.response.headers
+
+    @property
+    def url(self) -> str:
+        """The final URL of the response."""
+        return self.response.url
+
+    def close(self) -> None:
+        """Release the connection of the response."""
+        if self._closed:
+            return
+        self._closed = True
+        tell = getattr(self.response.raw, "tell", None)
+        if self.metrics is not None and tell is not None:
+            self.metrics.record_bytes("received", tell(), self.bytes_read)
+        self.response.close()
+
+    def iter_content(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE, decode_unicode: bool = False
+    ) -> Iterator[Union[bytes, str]]:
+        """Iterate over the decoded body of the response in chunks.
+
+        Args:
+            chunk_size: The number of bytes read at once (default is 64 KiB).
+            decode_unicode: Whether to decode the chunks with the encoding of the response
+                            (default is False).
+
+        Returns:
+            An iterator of the chunks, as bytes or as strings if `decode_unicode` is True.
+
+        Raises:
+            ResponseTooLargeError: If the body exceeds the max body size. The response is
+                                   closed.
+        """
+        chunks = self._iter_bytes(chunk_size)
+        if decode_unicode:
+            return stream_decode_response_unicode(chunks, self.response)
+        return chunks
+
+    def iter_lines(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        decode_unicode: bool = False,
+        delimiter: Optional[Union[bytes, str]] = None,
+    ) -> Iterator[Union[bytes, str]]:
+        """Iterate over the body of the response line by line.
+
+        Args:
+            chunk_size: The number of bytes read at once (default is 64 KiB).
+            decode_unicode: Whether to decode the lines with the encoding of the response
+                            (default is False).
+            delimiter: The line delimiter (default is None, which means the universal
+                       newlines).
+
+        Returns:
+            An iterator of the lines, without their delimiters.
+
+        Raises:
+            ResponseTooLargeError: If the body exceeds the max body size. The response is
+                                   closed.
+        """
+        pending: Any = None
+        chunk: Any
+        for chunk in self.iter_content(chunk_size, decode_unicode):
+            if pending is not None:
+                chunk = pending + chunk
+            lines = chunk.split(delimiter) if delimiter else chunk.splitlines()
+            if lines and lines[-1] and chunk and lines[-1][-1] == chunk[-1]:
+                pending = lines.pop()
+            else:
+                pending = None
+            yield from lines
+        if pending is not None:
+            yield pending
+
+    def read(self) -> bytes:
+        """Read the rest of the body of the response at once, within the max body size."""
+        return b"".join(self._iter_bytes(DEFAULT_CHUNK_SIZE))
+
+    def _iter_bytes(self, chunk_size: int) -> Iterator[bytes]:
+        for chunk in self.response.iter_content(chunk_size):
+            self.bytes_read += len(chunk)
+            if self.max_body_size is not None and self.bytes_read > self.max_body_size:
+                self._abort(self.bytes_read)
+            yield chunk
+
+    def _abort(self, size: int) -> None:
+        """Close the response and raise a ResponseTooLargeError."""
+        self.close()
+        logger.warning(
+            "Response aborted: body of at least %d bytes exceeds the max body size of "
+            "%d bytes: %s",
+            size,
+            self.max_body_size,
+            self.response.url,
+        )
+        raise ResponseTooLargeError(
+            f"Response body of at least {size} bytes exceeds the max body size of "
+            f"{self.max_body_size} bytes",
+            limit=self.max_body_size or 0,
+        )
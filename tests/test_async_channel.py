@@ -0,0 +1,100 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+from typing import Any, List, Optional
+from unittest.mock import AsyncMock, Mock
+import pytest
+from hcc import AsyncChannel, DataType
+
+MAX_RETRY_COUNT = 5
+URL = "https://mockserver.com/success"
+
+
+def run_test(
+    method: str,
+    side_effects: List[Any],
+    data: Optional[DataType] = None,
+):
+    transport = Mock()
+    transport.request = AsyncMock(side_effect=side_effects)
+
+    async def call():
+        channel = AsyncChannel(
+            url=URL, max_retry_count=MAX_RETRY_COUNT, transport=transport
+        )
+        method_to_call = getattr(channel, method)
+        if method in ["post", "put", "patch"]:
+            return await method_to_call(data=data)
+        return await method_to_call()
+
+    return asyncio.run(call()), transport.request
+
+
+@pytest.mark.parametrize("method", ["get", "post", "put", "delete", "patch"])
+def test_async_channel_success(method: str):
+    response, mock_request = run_test(method, [Mock(status_code=200)], data={})
+    assert response.status_code == 200
+    assert mock_request.call_count == 1
+    assert mock_request.call_args.args == (method.upper(), URL)
+    assert mock_request.call_args.kwargs["timeout"] == 2.0
+
+
+@pytest.mark.parametrize("method", ["get", "post", "put", "delete", "patch"])
+def test_async_channel_fail(method: str):
+    response, mock_request = run_test(
+        method, [Mock(status_code=500)] * MAX_RETRY_COUNT, data={}
+    )
+    assert response.status_code == 500
+    assert mock_request.call_count == MAX_RETRY_COUNT
+
+
+@pytest.mark.parametrize("method", ["get", "post", "put", "delete", "patch"])
+def test_async_channel_success_on_third_time(method: str):
+    response, mock_request = run_test(
+        method,
+        [Mock(status_code=500), ConnectionError("reset"), Mock(status_code=201)],
+        data={},
+    )
+    assert response.status_code == 201
+    assert mock_request.call_count == 3
+
+
+@pytest.mark.parametrize("method", ["post", "put", "patch"])
+def test_async_channel_request_body_json(method: str):
+    transport = Mock()
+    transport.request = AsyncMock(return_value=Mock(status_code=200))
+    channel = AsyncChannel(url=URL, transport=transport)
+    method_to_call = getattr(channel, method)
+    asyncio.run(method_to_call(json={"key": "value"}, headers={"header": "value"}))
+    assert transport.request.call_args.kwargs["data"] == b'{"key": "value"}'
+    assert transport.request.call_args.kwargs["json"] is None
+    assert transport.request.call_args.kwargs["headers"] == {
+        "header": "value",
+        "Content-Type": "application/json",
+    }
+
+
+def test_async_channel_request_body_neither():
+    channel = AsyncChannel(url=URL, transport=Mock())
+    with pytest.raises(Exception):
+        asyncio.run(channel.post())
+
+
+def test_async_channel_with_shared_transport_leaves_it_open():
+    transport = Mock()
+    transport.close = AsyncMock()
+
+    async def use_channel():
+        async with AsyncChannel(url=URL, transport=transport) as channel:
+            assert isinstance(channel, AsyncChannel)
+
+    asyncio.run(use_channel())
+    assert transport.close.call_count == 0
+
+
+def test_async_channel_closes_own_transport():
+    channel = AsyncChannel(url=URL)
+    channel.transport.close = AsyncMock()  # type: ignore[method-assign]
+    asyncio.run(channel.close())
+    assert channel.transport.close.call_count == 1
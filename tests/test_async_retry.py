@@ -0,0 +1,96 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import time
+import pytest
+from hcc import async_retry_function, RetryPolicy
+from .test_utilities import Counter, assert_runtime
+
+BASE_DELAY = 100
+MAX_RETRIES = 5
+
+
+def setup_function():
+    Counter.reset()
+
+
+async def next_count() -> int:
+    return Counter.next()
+
+
+def test_async_retry_function_success_linear():
+    start_time = time.time()
+    response = asyncio.run(
+        async_retry_function(
+            func=next_count,
+            is_retry_needed=lambda result: result < 3,
+            max_retry_count=MAX_RETRIES,
+            retry_policy=RetryPolicy.LINEAR,
+            base_delay=BASE_DELAY,
+        )
+    )
+    end_time = time.time()
+    assert response == 3
+    assert_runtime(2 * BASE_DELAY / 1000, end_time - start_time)
+
+
+def test_async_retry_function_fail_immediate():
+    start_time = time.time()
+    response = asyncio.run(
+        async_retry_function(
+            func=next_count,
+            is_retry_needed=lambda result: True,
+            max_retry_count=MAX_RETRIES,
+            retry_policy=RetryPolicy.IMMEDIATE,
+            base_delay=BASE_DELAY,
+        )
+    )
+    end_time = time.time()
+    assert response == MAX_RETRIES
+    assert end_time - start_time < 0.1
+
+
+def test_async_retry_function_with_exceptions_fail():
+    async def always_fail():
+        Counter.next()
+        raise Exception("Always fail")  # pylint: disable=broad-exception-raised
+
+    with pytest.raises(Exception, match="Always fail"):
+        asyncio.run(
+            async_retry_function(
+                func=always_fail,
+                is_retry_needed=lambda x: True,
+                max_retry_count=MAX_RETRIES,
+                retry_policy=RetryPolicy.JITTER,
+                base_delay=10,
+            )
+        )
+    assert Counter.count == MAX_RETRIES
+
+
+def test_async_retry_function_delays_do_not_block_the_event_loop():
+    async def run_concurrently():
+        async def succeed_on_second_attempt():
+            attempts = 0
+
+            async def func():
+                nonlocal attempts
+                attempts += 1
+                return attempts
+
+            return await async_retry_function(
+                func=func,
+                is_retry_needed=lambda result: result < 2,
+                max_retry_count=MAX_RETRIES,
+                retry_policy=RetryPolicy.LINEAR,
+                base_delay=BASE_DELAY,
+            )
+
+        return await asyncio.gather(*(succeed_on_second_attempt() for _ in range(100)))
+
+    start_time = time.time()
+    results = asyncio.run(run_concurrently())
+    end_time = time.time()
+    assert results == [2] * 100
+    assert_runtime(BASE_DELAY / 1000, end_time - start_time, tolerance=0.5)
@@ -0,0 +1,359 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import gzip
+import io
+import ssl
+from typing import Dict, Optional
+from unittest.mock import patch, AsyncMock, Mock
+import pytest
+import requests
+from hcc import AsyncChannel, StreamTransport
+from .test_utilities import AsyncHttpStandIn
+
+
+def ok(body: bytes = b"ok", extra_headers: str = "") -> bytes:
+    return (
+        f"HTTP/1.1 200 OK\r\nContent-Length: {len(body)}\r\n{extra_headers}\r\n".encode()
+        + body
+    )
+
+
+async def echo(
+    method: str, target: str, headers: Dict[str, str], body: bytes
+) -> Optional[bytes]:
+    return ok(f"{method} {target} {body.decode()}".encode())
+
+
+def test_stream_transport_encodes_requests_like_channel():
+    async def run():
+        async with AsyncHttpStandIn(echo) as server:
+            transport = StreamTransport()
+            responses = [
+                await transport.request(
+                    "GET", server.url + "/path", timeout=1, params={"q": "a b"}
+                ),
+                await transport.request(
+                    "POST", server.url, timeout=1, json={"key": "value"}
+                ),
+                await transport.request("PUT", server.url, timeout=1, data="k=v"),
+                await transport.request(
+                    "PATCH", server.url, timeout=1, data=io.BytesIO(b"file")
+                ),
+                await transport.request(
+                    "PUT", server.url, timeout=1, data=io.StringIO("text file")
+                ),
+                await transport.request(
+                    "POST",
+                    server.url,
+                    timeout=1,
+                    data=(chunk for chunk in [b"gen", b"", "erator"]),
+                ),
+            ]
+            await transport.close()
+            return server, responses
+
+    with patch(
+        "hcc.async_transport.asyncio.to_thread", wraps=asyncio.to_thread
+    ) as mock_to_thread:
+        server, responses = asyncio.run(run())
+    assert mock_to_thread.call_count == 2
+    assert [response.text for response in responses] == [
+        "GET /path?q=a+b ",
+        'POST / {"key": "value"}',
+        "PUT / k=v",
+        "PATCH / file",
+        "PUT / text file",
+        "POST / generator",
+    ]
+    assert all(isinstance(response, requests.Response) for response in responses)
+    assert responses[0].url.endswith("/path?q=a+b")
+    assert server.requests[1][2]["content-type"] == "application/json"
+    assert server.requests[5][2]["transfer-encoding"] == "chunked"
+    assert server.connection_count == 1
+
+
+def test_stream_transport_reads_response_framings():
+    async def handler(
+        method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Optional[bytes]:
+        if target == "/chunked":
+            return (
+                b"HTTP/1.1 201 Created\r\nTransfer-Encoding: chunked\r\n"
+                b"X-Dup: a\r\nX-Dup: b\r\n\r\n"
+                b"3;ext\r\nabc\r\n2\r\nde\r\n0\r\nTrailer: x\r\n\r\n"
+            )
+        if target == "/gzip":
+            return ok(gzip.compress(b"unzipped"), "Content-Encoding: gzip\r\n")
+        if target == "/gzip-chunked":
+            zipped = gzip.compress(b"transfer coded")
+            return (
+                b"HTTP/1.1 200 OK\r\nTransfer-Encoding: gzip, Chunked\r\n\r\n"
+                + b"%x\r\n%s\r\n0\r\n\r\n" % (len(zipped), zipped)
+            )
+        if target == "/no-content":
+            return b"HTTP/1.1 204 No Content\r\n\r\n"
+        if target == "/head":
+            return b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n"
+        return (
+            b"HTTP/1.1 500 Internal Server Error\r\nConnection: close\r\n\r\nuntil eof"
+        )
+
+    async def run():
+        async with AsyncHttpStandIn(handler) as server:
+            transport = StreamTransport()
+            chunked = await transport.request("GET", server.url + "/chunked", timeout=1)
+            zipped = await transport.request("GET", server.url + "/gzip", timeout=1)
+            transfer_coded = await transport.request(
+                "GET", server.url + "/gzip-chunked", timeout=1
+            )
+            no_content = await transport.request(
+                "DELETE", server.url + "/no-content", timeout=1
+            )
+            head = await transport.request("HEAD", server.url + "/head", timeout=1)
+            until_eof = await transport.request("GET", server.url + "/eof", timeout=1)
+            return server, chunked, zipped, transfer_coded, no_content, head, until_eof
+
+    server, chunked, zipped, transfer_coded, no_content, head, until_eof = asyncio.run(
+        run()
+    )
+    assert (chunked.status_code, chunked.reason, chunked.text) == (
+        201,
+        "Created",
+        "abcde",
+    )
+    assert chunked.headers["x-dup"] == "a, b"
+    assert zipped.text == "unzipped"
+    assert transfer_coded.text == "transfer coded"
+    assert (no_content.status_code, no_content.content) == (204, b"")
+    assert head.content == b""
+    assert (until_eof.status_code, until_eof.text) == (500, "until eof")
+    assert server.connection_count == 1
+
+
+def test_stream_transport_reads_transfer_coded_body_until_eof():
+    async def handler(
+        method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Optional[bytes]:
+        return (
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: gzip\r\nConnection: close\r\n\r\n"
+            + gzip.compress(b"until eof")
+        )
+
+    async def run():
+        async with AsyncHttpStandIn(handler) as server:
+            transport = StreamTransport()
+            response = await transport.request("GET", server.url, timeout=1)
+            return transport, response
+
+    transport, response = asyncio.run(run())
+    assert response.text == "until eof"
+    assert transport.idle_connections == 0
+
+
+def test_stream_transport_keeps_http_1_0_connections_alive_only_if_asked():
+    async def handler(
+        method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Optional[bytes]:
+        options = "Connection: Keep-Alive\r\n" if target == "/keep-alive" else ""
+        return f"HTTP/1.0 200 OK\r\nContent-Length: 2\r\n{options}\r\nok".encode()
+
+    async def run():
+        async with AsyncHttpStandIn(handler) as server:
+            transport = StreamTransport()
+            await transport.request("GET", server.url, timeout=1)
+            closed = transport.idle_connections
+            await transport.request("GET", server.url + "/keep-alive", timeout=1)
+            return closed, transport.idle_connections
+
+    assert asyncio.run(run()) == (0, 1)
+
+
+def test_stream_transport_resends_once_on_stale_connection():
+    served = 0
+
+    async def handler(
+        method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Optional[bytes]:
+        nonlocal served
+        served += 1
+        return ok() if served != 2 else None
+
+    async def run():
+        async with AsyncHttpStandIn(handler) as server:
+            transport = StreamTransport()
+            first = await transport.request("GET", server.url, timeout=1)
+            second = await transport.request("GET", server.url, timeout=1)
+            return server, first, second
+
+    server, first, second = asyncio.run(run())
+    assert first.text == second.text == "ok"
+    assert server.connection_count == 2
+    assert len(server.requests) == 3
+
+
+def test_stream_transport_limits_idle_connections():
+    async def run():
+        async with AsyncHttpStandIn(echo) as server:
+            transport = StreamTransport(pool_maxsize=0)
+            await transport.request("GET", server.url, timeout=1)
+            await transport.request("GET", server.url, timeout=1)
+            return server
+
+    assert asyncio.run(run()).connection_count == 2
+
+
+def test_stream_transport_discards_closed_idle_connections():
+    async def handler(
+        method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Optional[bytes]:
+        return ok()
+
+    async def run():
+        async with AsyncHttpStandIn(handler) as server:
+            transport = StreamTransport()
+            await transport.request("GET", server.url, timeout=1)
+            for connections in transport._idle.values():  # pylint: disable=protected-access
+                connections[0][1].close()
+            await transport.request("GET", server.url, timeout=1)
+            return server
+
+    assert asyncio.run(run()).connection_count == 2
+
+
+def test_stream_transport_raises_requests_exceptions():
+    async def handler(
+        method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Optional[bytes]:
+        if target == "/slow":
+            await asyncio.sleep(1)
+            return ok()
+        if target == "/malformed":
+            return b"HTTP/1.1 abc OK\r\n\r\n"
+        if target == "/bad-gzip":
+            return ok(b"not gzip", "Content-Encoding: gzip\r\n")
+        if target == "/huge-header":
+            return b"HTTP/1.1 200 OK\r\nX-Huge: " + b"x" * 100_000 + b"\r\n\r\n"
+        return None
+
+    async def run():
+        async with AsyncHttpStandIn(handler) as server:
+            transport = StreamTransport()
+            with pytest.raises(requests.exceptions.Timeout):
+                await transport.request("GET", server.url + "/slow", timeout=0.05)
+            with pytest.raises(requests.exceptions.ConnectionError):
+                await transport.request("GET", server.url + "/malformed", timeout=1)
+            with pytest.raises(requests.exceptions.ConnectionError):
+                await transport.request("GET", server.url + "/bad-gzip", timeout=1)
+            with pytest.raises(requests.exceptions.ConnectionError):
+                await transport.request("GET", server.url + "/huge-header", timeout=1)
+            with pytest.raises(requests.exceptions.ConnectionError):
+                await transport.request("GET", server.url + "/closed", timeout=1)
+
+    asyncio.run(run())
+
+
+def test_stream_transport_uses_tls_for_https():
+    context = ssl.create_default_context()
+    transport = StreamTransport(ssl_context=context)
+    with patch(
+        "hcc.async_transport.asyncio.open_connection",
+        AsyncMock(return_value=(Mock(), Mock())),
+    ) as mock_open:
+        asyncio.run(transport._open(("https", "example.com", 443)))  # pylint: disable=protected-access
+        asyncio.run(StreamTransport()._open(("https", "example.com", 443)))  # pylint: disable=protected-access
+    assert mock_open.call_args_list[0].kwargs["ssl"] is context
+    assert isinstance(mock_open.call_args_list[1].kwargs["ssl"], ssl.SSLContext)
+
+
+def test_async_channel_retries_against_local_server():
+    served = 0
+
+    async def handler(
+        method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Optional[bytes]:
+        nonlocal served
+        served += 1
+        if served < 3:
+            return b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n\r\n"
+        return ok(body)
+
+    async def run():
+        async with AsyncHttpStandIn(handler) as server:
+            async with AsyncChannel(url=server.url, max_retry_count=5) as channel:
+                response = await channel.post(json={"key": "value"})
+            return server, response
+
+    server, response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.json() == {"key": "value"}
+    assert len(server.requests) == 3
+    assert server.connection_count == 1
+
+
+def test_stream_transport_follows_redirects_like_session():
+    async def handler(
+        method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Optional[bytes]:
+        port = headers["host"].rsplit(":", 1)[1]
+        locations = {
+            "/found": "/temporary",
+            "/temporary": f"http://localhost:{port}/moved",
+            "/loop": "/loop",
+        }
+        if target in locations:
+            status = "307 Temporary Redirect" if target == "/temporary" else "302 Found"
+            return (
+                f"HTTP/1.1 {status}\r\nLocation: {locations[target]}\r\n"
+                "Content-Length: 0\r\n\r\n"
+            ).encode()
+        return ok(f"{method} {target} {body.decode()}".encode())
+
+    async def run():
+        async with AsyncHttpStandIn(handler) as server:
+            transport = StreamTransport(max_redirects=3)
+            redirected = await transport.request(
+                "POST",
+                server.url + "/found",
+                timeout=1,
+                data="k=v",
+                headers={"Authorization": "Bearer secret"},
+            )
+            with pytest.raises(requests.exceptions.TooManyRedirects):
+                await transport.request("GET", server.url + "/loop", timeout=1)
+            not_followed = await StreamTransport(max_redirects=0).request(
+                "GET", server.url + "/loop", timeout=1
+            )
+            return server, redirected, not_followed
+
+    server, redirected, not_followed = asyncio.run(run())
+    assert redirected.text == "GET /moved "
+    assert [response.status_code for response in redirected.history] == [302, 307]
+    assert redirected.url.startswith("http://localhost:")
+    temporary, moved = server.requests[1], server.requests[2]
+    assert temporary[0] == "GET" and "content-type" not in temporary[2]
+    assert temporary[2]["authorization"] == "Bearer secret"
+    assert "authorization" not in moved[2]
+    assert not_followed.status_code == 302
+
+
+def test_stream_transport_resends_the_body_on_307():
+    async def handler(
+        method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Optional[bytes]:
+        if target == "/old":
+            return (
+                b"HTTP/1.1 308 Permanent Redirect\r\nLocation: /new\r\n"
+                b"Content-Length: 0\r\n\r\n"
+            )
+        return ok(f"{method} {target} {body.decode()}".encode())
+
+    async def run():
+        async with AsyncHttpStandIn(handler) as server:
+            async with AsyncChannel(url=server.url + "/old") as channel:
+                return await channel.put(data=io.BytesIO(b"file"))
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.text == "PUT /new file"
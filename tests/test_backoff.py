@@ -0,0 +1,86 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+from unittest.mock import patch
+import pytest
+from hcc import (
+    DecorrelatedJitterBackoff,
+    ExponentialBackoff,
+    FullJitterBackoff,
+    ImmediateBackoff,
+    JitterBackoff,
+    LinearBackoff,
+    RetryPolicy,
+)
+from hcc.backoff import MAX_BACKOFF_DELAY
+
+
+def test_immediate_and_linear_backoff():
+    assert ImmediateBackoff().delay(3, 1.0) == 0
+    assert LinearBackoff(100).delay(3, 1.0) == 0.1
+
+
+def test_jitter_backoff():
+    with patch(
+        "hcc.backoff.random.uniform", side_effect=lambda a, b: b
+    ) as mock_uniform:
+        assert JitterBackoff(100).delay(1, 0) == pytest.approx(0.15)
+    assert mock_uniform.call_args.args == (0.5, 1.5)
+
+
+def test_exponential_backoff():
+    backoff = ExponentialBackoff(base_delay=100, multiplier=3.0, max_delay=1000)
+    assert [backoff.delay(attempt, 0) for attempt in range(1, 5)] == [
+        0.1,
+        0.3,
+        0.9,
+        1.0,
+    ]
+    assert ExponentialBackoff().delay(10, 0) == 0.2 * 2**9
+
+
+def test_exponential_backoff_does_not_overflow():
+    day = MAX_BACKOFF_DELAY / 1000
+    assert ExponentialBackoff().delay(2000, 0) == day
+    assert ExponentialBackoff(multiplier=2).delay(2000, 0) == day
+    assert ExponentialBackoff(max_delay=5000).delay(2000, 0) == 5.0
+    with patch("hcc.backoff.random.uniform", side_effect=lambda a, b: b):
+        assert FullJitterBackoff().delay(2000, 0) == day
+        assert DecorrelatedJitterBackoff().delay(2000, day) == day
+
+
+def test_full_jitter_backoff():
+    backoff = FullJitterBackoff(base_delay=100, max_delay=300)
+    with patch("hcc.backoff.random.uniform", side_effect=lambda a, b: (a, b)):
+        assert backoff.delay(2, 0) == (0, 0.2)
+        assert backoff.delay(5, 0) == (0, 0.3)
+
+
+def test_decorrelated_jitter_backoff():
+    backoff = DecorrelatedJitterBackoff(base_delay=100, max_delay=1000)
+    with patch("hcc.backoff.random.uniform", side_effect=lambda a, b: b):
+        assert backoff.delay(1, 0) == 0.1
+        assert backoff.delay(2, 0.1) == pytest.approx(0.3)
+        assert backoff.delay(3, 0.3) == pytest.approx(0.9)
+        assert backoff.delay(4, 0.9) == 1.0
+    for previous_delay in [0, 0.1, 0.5]:
+        assert 0.1 <= backoff.delay(2, previous_delay) <= 1.0
+
+
+@pytest.mark.parametrize(
+    "policy, strategy",
+    [
+        (RetryPolicy.IMMEDIATE, ImmediateBackoff()),
+        (RetryPolicy.LINEAR, LinearBackoff(50)),
+        (RetryPolicy.JITTER, JitterBackoff(50)),
+        (RetryPolicy.EXPONENTIAL, ExponentialBackoff(50, 2.0, 400)),
+        (RetryPolicy.FULL_JITTER, FullJitterBackoff(50, 2.0, 400)),
+        (RetryPolicy.DECORRELATED_JITTER, DecorrelatedJitterBackoff(50, 3.0, 400)),
+    ],
+)
+def test_retry_policy_strategy(policy, strategy):
+    assert policy.strategy(50, max_delay=400) == strategy
+
+
+def test_retry_policy_strategy_multiplier():
+    assert RetryPolicy.EXPONENTIAL.strategy(50, 1.5) == ExponentialBackoff(50, 1.5)
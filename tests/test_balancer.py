@@ -0,0 +1,135 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import math
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+import requests
+from hcc import AsyncChannel, BalancingStrategy, Channel, Endpoint, LoadBalancer
+from .test_utilities import make_response
+
+URLS = ["http://10.0.0.1:8080/", "http://10.0.0.2:8080", "http://10.0.0.3:8080"]
+
+
+def test_endpoint_join_and_repr():
+    endpoint = Endpoint("http://10.0.0.1:8080/")
+    assert endpoint.join("/config") == "http://10.0.0.1:8080/config"
+    assert endpoint.join("config") == "http://10.0.0.1:8080/config"
+    assert endpoint.join("") == "http://10.0.0.1:8080"
+    assert repr(endpoint) == (
+        "Endpoint(url='http://10.0.0.1:8080', outstanding=0, latency=0.000000)"
+    )
+
+
+def test_endpoint_peak_ewma_latency():
+    endpoint = Endpoint(URLS[0])
+    endpoint.observe(0.1, 100.0, 10.0)
+    assert endpoint.latency == 0.1
+    # A higher latency is taken at once.
+    endpoint.observe(0.5, 101.0, 10.0)
+    assert endpoint.latency == 0.5
+    # A lower latency decays the average with the elapsed time.
+    endpoint.observe(0.1, 111.0, 10.0)
+    weight = math.exp(-1.0)
+    assert endpoint.latency == pytest.approx(0.5 * weight + 0.1 * (1 - weight))
+    endpoint.outstanding = 3
+    assert endpoint.cost == pytest.approx(endpoint.latency * 4)
+
+
+def test_round_robin_skips_excluded_endpoints():
+    balancer = LoadBalancer(URLS, strategy=BalancingStrategy.ROUND_ROBIN)
+    first, second, third = balancer.endpoints
+    assert [balancer.pick() for _ in range(4)] == [first, second, third, first]
+    assert balancer.pick(exclude=[first, second]) is third
+    # Every endpoint is excluded, so all of them are candidates again.
+    assert balancer.pick(exclude=balancer.endpoints) in balancer.endpoints
+
+
+def test_least_outstanding():
+    balancer = LoadBalancer(URLS, strategy=BalancingStrategy.LEAST_OUTSTANDING)
+    first, second, third = balancer.endpoints
+    first.outstanding, second.outstanding, third.outstanding = 2, 1, 1
+    second.requests = 5
+    assert balancer.pick() is third
+    assert balancer.pick(exclude=[third]) is second
+
+
+def test_power_of_two_choices_prefers_the_cheaper_endpoint():
+    balancer = LoadBalancer(URLS)
+    first, second, third = balancer.endpoints
+    first.latency, second.latency, third.latency = 0.1, 0.3, 0.01
+    first.outstanding = 3
+    with patch("hcc.balancer.random.sample", return_value=[first, second]):
+        assert balancer.pick() is second
+    with patch("hcc.balancer.random.sample", side_effect=lambda c, k: c[:k]):
+        assert balancer.pick(exclude=[second]) is third
+    assert repr(balancer).startswith("LoadBalancer(strategy=POWER_OF_TWO_CHOICES")
+
+
+def test_single_endpoint():
+    balancer = LoadBalancer(URLS[:1])
+    assert balancer.pick(exclude=balancer.endpoints) is balancer.endpoints[0]
+
+
+def test_call_tracks_outstanding_attempts_and_latency():
+    balancer = LoadBalancer(URLS, strategy=BalancingStrategy.ROUND_ROBIN)
+    tried = []
+
+    def send(url):
+        assert balancer.endpoints[0].outstanding == 1
+        return url
+
+    assert balancer.call("/config", send, tried) == "http://10.0.0.1:8080/config"
+    with pytest.raises(ValueError):
+        balancer.call("/config", Mock(side_effect=ValueError), tried)
+    first, _, third = balancer.endpoints
+    assert tried == [first, third]
+    assert [e.outstanding for e in balancer.endpoints] == [0, 0, 0]
+    assert [e.requests for e in balancer.endpoints] == [1, 0, 1]
+    assert balancer.endpoints[0].latency > 0
+
+
+def test_async_call_tracks_outstanding_attempts():
+    balancer = LoadBalancer(URLS, strategy=BalancingStrategy.LEAST_OUTSTANDING)
+
+    async def send(url):
+        await asyncio.sleep(0.01)
+        return url
+
+    async def call():
+        return await asyncio.gather(
+            *(balancer.async_call("/config", send, []) for _ in range(3))
+        )
+
+    assert sorted(asyncio.run(call())) == [f"{url.rstrip('/')}/config" for url in URLS]
+    assert [e.outstanding for e in balancer.endpoints] == [0, 0, 0]
+
+
+def test_channel_retries_on_another_endpoint():
+    balancer = LoadBalancer(URLS)
+    with patch(
+        "hcc.channel.requests.Session.request",
+        side_effect=[requests.ConnectionError(), make_response(503), make_response()],
+    ) as mock_request:
+        with Channel(url="/config", balancer=balancer, pool_connections=2) as channel:
+            assert channel.get().status_code == 200
+            adapter = channel.session.get_adapter("http://10.0.0.1:8080")
+            assert adapter._pool_connections == 3  # pylint: disable=protected-access
+    urls = [c.args[1] for c in mock_request.call_args_list]
+    assert sorted(urls) == [f"{url.rstrip('/')}/config" for url in URLS]
+    assert sum(e.requests for e in balancer.endpoints) == 3
+
+
+def test_async_channel_retries_on_another_endpoint():
+    balancer = LoadBalancer(URLS[:2], strategy=BalancingStrategy.ROUND_ROBIN)
+    transport = Mock()
+    transport.request = AsyncMock(side_effect=[make_response(503), make_response()])
+
+    async def call():
+        channel = AsyncChannel(url="config", balancer=balancer, transport=transport)
+        return await channel.get()
+
+    assert asyncio.run(call()).status_code == 200
+    urls = [c.args[1] for c in transport.request.call_args_list]
+    assert urls == ["http://10.0.0.1:8080/config", "http://10.0.0.2:8080/config"]
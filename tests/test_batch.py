@@ -0,0 +1,168 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Dict, List
+from unittest.mock import patch, AsyncMock, Mock
+import pytest
+import requests
+from hcc import AsyncChannel, BatchResult, Channel, RequestSpec, batch
+
+URL = "https://mockserver.com/batch"
+
+
+def slow_response(delays: Dict[str, float]) -> Any:
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def request(method: str, url: str, **kwargs: Any) -> Mock:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        body = json.loads(kwargs["data"]) if kwargs.get("data") else {}
+        key = (kwargs.get("params") or {}).get("id") or body.get("id")
+        time.sleep(delays.get(key, 0))
+        with lock:
+            in_flight -= 1
+        if key == "error":
+            raise requests.exceptions.ConnectionError("refused")
+        return Mock(status_code=200, key=key, method=method, url=url)
+
+    return request, lambda: max_in_flight
+
+
+def test_request_spec_arguments():
+    assert RequestSpec(params={"a": "b"}).arguments() == {
+        "params": {"a": "b"},
+        "headers": None,
+    }
+    assert RequestSpec(method="delete", headers={"h": "v"}).arguments() == {
+        "headers": {"h": "v"}
+    }
+    assert RequestSpec(method="POST", json={"a": 1}).arguments() == {
+        "data": None,
+        "json": {"a": 1},
+        "headers": None,
+    }
+
+
+def test_channel_map_ordered_with_bounded_parallelism():
+    request, max_in_flight = slow_response({"0": 0.1, "1": 0.05})
+    specs = [RequestSpec(params={"id": str(i)}) for i in range(8)]
+    with patch("hcc.channel.requests.Session.request", side_effect=request):
+        channel = Channel(url=URL, pool_maxsize=3)
+        results = list(channel.map(iter(specs)))
+    assert [result.index for result in results] == list(range(8))
+    assert [result.response.key for result in results] == [str(i) for i in range(8)]  # type: ignore[union-attr]
+    assert all(result.ok for result in results)
+    assert max_in_flight() == 3
+
+
+def test_channel_map_completion_order_and_captured_errors():
+    request, max_in_flight = slow_response({"slow": 0.2})
+    specs = [
+        RequestSpec(method="POST", json={"id": "slow"}),
+        RequestSpec(method="POST", json={"id": "error"}),
+        RequestSpec(method="POST", json={"id": "fast"}),
+    ]
+    with patch("hcc.channel.requests.Session.request", side_effect=request):
+        channel = Channel(url=URL, max_retry_count=2)
+        results = list(channel.map(specs, max_workers=5, ordered=False))
+    assert [result.index for result in results][-1] == 0
+    assert max_in_flight() == 3
+    failed = [result for result in results if not result.ok]
+    assert len(failed) == 1
+    assert failed[0].index == 1
+    assert isinstance(failed[0].exception, requests.exceptions.ConnectionError)
+    assert failed[0].response is None
+
+
+def test_channel_map_rejects_foreign_url():
+    with patch("hcc.channel.requests.Session.request") as mock_request:
+        results = list(Channel(url=URL).map([RequestSpec(url="https://other.com")]))
+    assert isinstance(results[0].exception, AssertionError)
+    assert mock_request.call_count == 0
+
+
+def test_channel_map_stops_when_closed_early():
+    request, _ = slow_response({"1": 0.2})
+    specs = (RequestSpec(params={"id": str(i)}) for i in range(1000))
+    with patch("hcc.channel.requests.Session.request", side_effect=request):
+        results = Channel(url=URL, pool_maxsize=2).map(specs)
+        first = next(results)
+        results.close()  # type: ignore[attr-defined]
+    assert first.index == 0
+    assert next(specs).params is not None
+
+
+def test_batch_one_shot_uses_the_url_of_each_spec():
+    request, _ = slow_response({})
+    specs = [
+        RequestSpec(url="https://a.example.com", params={"id": "a"}),
+        RequestSpec(method="DELETE", url="https://b.example.com"),
+        RequestSpec(params={"id": "no-url"}),
+    ]
+    with patch("hcc.channel.requests.Session.request", side_effect=request):
+        results: List[BatchResult] = list(batch(specs, max_workers=2))
+    assert results[0].response.url == "https://a.example.com"  # type: ignore[union-attr]
+    assert results[1].response.method == "DELETE"  # type: ignore[union-attr]
+    assert isinstance(results[2].exception, AssertionError)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_async_channel_map(ordered: bool):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def request(method: str, url: str, **kwargs: Any) -> Mock:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        key = kwargs["params"]["id"]
+        await asyncio.sleep(0.05 if key == "0" else 0.01)
+        in_flight -= 1
+        if key == "3":
+            raise requests.exceptions.ConnectionError("refused")
+        return Mock(status_code=200, key=key)
+
+    transport = Mock()
+    transport.request = AsyncMock(side_effect=request)
+    specs = [RequestSpec(params={"id": str(i)}) for i in range(6)]
+
+    async def run() -> List[BatchResult]:
+        channel = AsyncChannel(url=URL, max_retry_count=1, transport=transport)
+        return [
+            result
+            async for result in channel.map(specs, max_concurrency=2, ordered=ordered)
+        ]
+
+    results = asyncio.run(run())
+    indices = [result.index for result in results]
+    assert sorted(indices) == list(range(6))
+    assert (indices == list(range(6))) is ordered
+    assert max_in_flight == 2
+    assert not results[indices.index(3)].ok
+
+
+def test_async_channel_map_stops_when_closed_early():
+    async def request(method: str, url: str, **kwargs: Any) -> Mock:
+        await asyncio.sleep(0 if kwargs["params"]["id"] == "0" else 1)
+        return Mock(status_code=200)
+
+    transport = Mock()
+    transport.request = AsyncMock(side_effect=request)
+    specs = (RequestSpec(params={"id": str(i)}) for i in range(1000))
+
+    async def run() -> BatchResult:
+        results = AsyncChannel(url=URL, pool_maxsize=2, transport=transport).map(specs)
+        first = await anext(results)
+        await results.aclose()  # type: ignore[attr-defined]
+        return first
+
+    assert asyncio.run(run()).index == 0
+    assert transport.request.call_count < 10
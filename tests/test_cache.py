@@ -0,0 +1,303 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+from typing import Dict, Optional
+from unittest.mock import AsyncMock, Mock, patch
+import requests
+from requests.structures import CaseInsensitiveDict
+from hcc import AsyncChannel, CacheEntry, Channel, MemoryStorage, ResponseCache
+
+URL = "https://mockserver.com/config"
+NOW = 1_700_000_000.0
+
+
+def make_response(
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+    content: bytes = b'{"version": 1}',
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "OK"
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = content  # pylint: disable=protected-access
+    response.url = URL
+    return response
+
+
+def make_entry(content: bytes = b"body") -> CacheEntry:
+    return CacheEntry(
+        url=URL,
+        status_code=200,
+        reason="OK",
+        headers={},
+        content=content,
+        stored_at=NOW,
+        expires_at=NOW,
+    )
+
+
+def fetch(cache: ResponseCache, response: requests.Response, **kwargs):
+    lookup = cache.lookup(URL, **kwargs)
+    if lookup.response is not None:
+        return lookup, lookup.response
+    return lookup, cache.complete(lookup, response)
+
+
+def test_memory_storage_evicts_least_recently_used():
+    storage = MemoryStorage(max_entries=2, max_bytes=10)
+    storage.set("a", make_entry(b"1234"))
+    storage.set("b", make_entry(b"1234"))
+    assert storage.get("a") is not None
+    storage.set("c", make_entry(b"1234"))
+    assert storage.get("b") is None
+    assert len(storage) == 2
+    storage.set("d", make_entry(b"123456"))
+    assert storage.get("a") is None and storage.get("c") is not None
+    storage.set("d", make_entry(b"12345678901"))
+    assert storage.get("d") is None
+    storage.delete("c")
+    storage.delete("missing")
+    assert len(storage) == 0
+    storage.set("f", make_entry(b"1"))
+    storage.clear()
+    assert len(storage) == 0
+
+
+def test_cache_key_sorts_params():
+    assert ResponseCache.key(URL) == URL
+    assert ResponseCache.key(URL, {"b": "2", "a": "1"}) == f"{URL}?a=1&b=2"
+
+
+def test_cache_hit_within_max_age():
+    cache = ResponseCache()
+    with patch("hcc.cache.time.time", return_value=NOW):
+        _, response = fetch(
+            cache, make_response(headers={"Cache-Control": "max-age=60"})
+        )
+        lookup, cached = fetch(cache, make_response(content=b"new"))
+    assert lookup.response is cached
+    assert cached.content == b'{"version": 1}'
+    assert cached.json() == {"version": 1}
+    assert (cache.hits, cache.misses, cache.revalidations) == (1, 1, 0)
+    assert repr(cache) == "ResponseCache(entries=1, hits=1, misses=1, revalidations=0)"
+
+
+def test_cache_revalidates_stale_entries_with_etag():
+    cache = ResponseCache()
+    headers = {"Cache-Control": "max-age=10", "ETag": '"v1"', "Content-Type": "a/b"}
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(cache, make_response(headers=headers))
+    with patch("hcc.cache.time.time", return_value=NOW + 11):
+        lookup = cache.lookup(URL, headers={"Accept": "*/*"})
+        assert lookup.conditional
+        assert lookup.headers == {"Accept": "*/*", "If-None-Match": '"v1"'}
+        not_modified = make_response(304, {"Cache-Control": "max-age=30"}, b"")
+        response = cache.complete(lookup, not_modified)
+        assert response.status_code == 200
+        assert response.content == b'{"version": 1}'
+        assert response.headers["Content-Type"] == "a/b"
+    with patch("hcc.cache.time.time", return_value=NOW + 40):
+        assert cache.lookup(URL).response is not None
+    assert (cache.hits, cache.misses, cache.revalidations) == (1, 1, 1)
+
+
+def test_cache_matches_header_names_case_insensitively():
+    cache = ResponseCache()
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(
+            cache,
+            make_response(headers={"Etag": '"v1"', "cache-control": "max-age=0"}),
+        )
+        lookup = cache.lookup(URL)
+        assert lookup.headers == {"If-None-Match": '"v1"'}
+        not_modified = make_response(
+            304, {"ETag": '"v2"', "Cache-Control": "max-age=30"}, b""
+        )
+        response = cache.complete(lookup, not_modified)
+    assert response.headers["etag"] == '"v2"'
+    entry = cache.storage.get(URL)
+    assert entry is not None
+    assert sorted(entry.headers) == ["Cache-Control", "ETag"]
+    assert entry.validators == {"If-None-Match": '"v2"'}
+    assert entry.expires_at == NOW + 30
+
+
+def test_not_modified_without_cache_control_keeps_the_stored_max_age():
+    cache = ResponseCache()
+    headers = {"Cache-Control": "max-age=10", "ETag": '"v1"', "Content-Length": "14"}
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(cache, make_response(headers={**headers, "Age": "5"}))
+    with patch("hcc.cache.time.time", return_value=NOW + 11):
+        lookup = cache.lookup(URL)
+        assert lookup.conditional
+        not_modified = make_response(304, {"Content-Length": "0"}, b"")
+        response = cache.complete(lookup, not_modified)
+    assert response.headers["Content-Length"] == "14"
+    entry = cache.storage.get(URL)
+    assert entry is not None
+    assert entry.expires_at == NOW + 21
+    with patch("hcc.cache.time.time", return_value=NOW + 20):
+        assert cache.lookup(URL).response is not None
+    assert (cache.hits, cache.misses, cache.revalidations) == (1, 1, 1)
+
+
+def test_cache_does_not_share_responses_to_authorized_requests():
+    cache = ResponseCache()
+    first = {"Authorization": "Bearer first"}
+    second = {"Authorization": "Bearer second"}
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(
+            cache, make_response(headers={"Cache-Control": "max-age=60"}), headers=first
+        )
+        assert cache.lookup(URL, headers=second).response is None
+        fetch(cache, make_response(headers={"Cache-Control": "private, max-age=60"}))
+        assert len(cache.storage) == 0
+        fetch(
+            cache,
+            make_response(headers={"Cache-Control": "public, max-age=60"}),
+            headers=first,
+        )
+        assert cache.lookup(URL, headers=second).response is not None
+
+
+def test_cache_revalidates_with_last_modified():
+    cache = ResponseCache()
+    modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(cache, make_response(headers={"Last-Modified": modified}))
+        lookup = cache.lookup(URL)
+    assert lookup.headers == {"If-Modified-Since": modified}
+    _, response = fetch(cache, make_response(content=b"changed"))
+    assert response.content == b"changed"
+    assert cache.misses == 2
+
+
+def test_cache_does_not_store_uncacheable_responses():
+    cache = ResponseCache(default_ttl=60.0)
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(cache, make_response())
+        assert cache.lookup(URL).response is not None
+        fetch(
+            cache,
+            make_response(headers={"Cache-Control": "no-store"}),
+            headers={"Cache-Control": "no-cache"},
+        )
+        assert cache.lookup(URL).response is None
+        fetch(cache, make_response(404))
+        fetch(cache, make_response(headers={"Vary": "*"}))
+        assert len(cache.storage) == 0
+        fetch(cache, make_response(headers={"Cache-Control": "no-cache"}))
+        assert len(cache.storage) == 0
+        fetch(cache, make_response(), headers={"Cache-Control": "no-store"})
+        assert len(cache.storage) == 0
+
+
+def test_cache_without_freshness_or_validators():
+    cache = ResponseCache()
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(cache, make_response())
+        fetch(cache, make_response(headers={"Cache-Control": "no-cache, ETag"}))
+        assert len(cache.storage) == 0
+        fetch(cache, make_response(headers={"Cache-Control": "max-age=0", "ETag": "x"}))
+        # A stale entry without validators is fetched again.
+        cache.storage.set(URL, make_entry())
+        lookup, _ = fetch(cache, make_response())
+    assert not lookup.conditional
+    assert cache.hits == 0
+
+
+def test_cache_freshness_from_expires_and_age():
+    cache = ResponseCache()
+    date = "Wed, 21 Oct 2015 07:28:00 GMT"
+    expires = "Wed, 21 Oct 2015 07:29:00 GMT"
+    lifetimes = [
+        ({"Date": date, "Expires": expires}, 60.0),
+        ({"Date": date, "Expires": expires, "Age": "15"}, 45.0),
+        ({"Expires": "never"}, 0.0),
+        ({"Cache-Control": "max-age=100000000"}, 86400.0),
+        ({"Cache-Control": "max-age=20", "Age": "soon"}, 20.0),
+    ]
+    for headers, lifetime in lifetimes:
+        assert cache._lifetime(headers) == lifetime  # pylint: disable=protected-access
+
+
+def test_cache_drops_entries_after_max_ttl():
+    cache = ResponseCache(max_ttl=100.0)
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(cache, make_response(headers={"ETag": "x"}))
+    with patch("hcc.cache.time.time", return_value=NOW + 101):
+        assert not cache.lookup(URL).conditional
+    assert len(cache.storage) == 0
+    cache.clear()
+
+
+def test_cache_honors_request_cache_control():
+    cache = ResponseCache(default_ttl=60.0)
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(cache, make_response(headers={"ETag": "x"}))
+        lookup = cache.lookup(URL, headers={"Cache-Control": "no-cache"})
+    assert lookup.conditional
+    assert cache.hits == 0
+
+
+def test_cache_varies_on_request_headers():
+    cache = ResponseCache(default_ttl=60.0)
+    json = {"Accept": "application/json"}
+    with patch("hcc.cache.time.time", return_value=NOW):
+        fetch(cache, make_response(headers={"Vary": "Accept"}), headers=json)
+        assert cache.lookup(URL, headers={"accept": "application/json"}).response
+        assert cache.lookup(URL, headers={"Accept": "text/xml"}).response is None
+        assert cache.lookup(URL).response is None
+
+
+def test_channel_get_uses_the_cache():
+    cache = ResponseCache()
+    responses = [
+        make_response(headers={"Cache-Control": "max-age=0", "ETag": '"v1"'}),
+        make_response(304, {}, b""),
+    ]
+    with patch(
+        "hcc.channel.requests.Session.request", side_effect=responses
+    ) as mock_request:
+        with Channel(url=URL, cache=cache) as channel:
+            assert channel.get().json() == {"version": 1}
+            response = channel.get(params={}, headers={"Accept": "*/*"})
+    assert response.status_code == 200
+    assert response.json() == {"version": 1}
+    assert mock_request.call_count == 2
+    assert mock_request.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert cache.revalidations == 1
+
+
+def test_channel_get_returns_fresh_responses_without_request():
+    cache = ResponseCache(default_ttl=60.0)
+    with patch(
+        "hcc.channel.requests.Session.request", return_value=make_response()
+    ) as mock_request:
+        channel = Channel(url=URL, cache=cache)
+        for _ in range(3):
+            assert channel.get(params={"a": "1"}).status_code == 200
+    assert mock_request.call_count == 1
+    assert cache.hits == 2
+
+
+def test_async_channel_get_uses_the_cache():
+    cache = ResponseCache()
+    transport = Mock()
+    transport.request = AsyncMock(
+        side_effect=[
+            make_response(headers={"ETag": '"v1"'}),
+            make_response(304, {}, b""),
+            make_response(304, {"Cache-Control": "max-age=60"}, b""),
+        ]
+    )
+
+    async def call():
+        channel = AsyncChannel(url=URL, cache=cache, transport=transport)
+        return [(await channel.get()).json() for _ in range(4)]
+
+    assert asyncio.run(call()) == [{"version": 1}] * 4
+    assert transport.request.call_count == 3
+    assert (cache.hits, cache.misses, cache.revalidations) == (1, 1, 2)
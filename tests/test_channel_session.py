@@ -0,0 +1,50 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+from unittest.mock import patch, Mock
+import requests
+from hcc import Channel
+
+URL = "https://mockserver.com/success"
+
+
+def test_channel_mounts_pooled_adapter():
+    channel = Channel(url=URL, pool_connections=3, pool_maxsize=7, pool_block=True)
+    for prefix in ["http://", "https://"]:
+        adapter = channel.session.get_adapter(prefix)
+        assert adapter._pool_connections == 3  # type: ignore[attr-defined]
+        assert adapter._pool_maxsize == 7  # type: ignore[attr-defined]
+        assert adapter._pool_block is True  # type: ignore[attr-defined]
+    channel.close()
+
+
+def test_channel_reuses_session_across_requests_and_retries():
+    with patch("requests.Session.send") as mock_send:
+        mock_send.side_effect = [
+            Mock(spec=requests.Response, status_code=500),
+            Mock(spec=requests.Response, status_code=200),
+            Mock(spec=requests.Response, status_code=200),
+        ]
+        channel = Channel(url=URL)
+        session = channel.session
+        with patch("requests.Session", side_effect=AssertionError) as mock_session:
+            channel.get()
+            channel.get()
+        assert mock_send.call_count == 3
+        assert mock_session.call_count == 0
+        assert channel.session is session
+
+
+def test_channel_close():
+    channel = Channel(url=URL)
+    with patch.object(channel.session, "close") as mock_close:
+        channel.close()
+    assert mock_close.call_count == 1
+
+
+def test_channel_context_manager_closes_session():
+    with patch("requests.Session.close") as mock_close:
+        with Channel(url=URL) as channel:
+            assert isinstance(channel, Channel)
+            assert mock_close.call_count == 0
+    assert mock_close.call_count == 1
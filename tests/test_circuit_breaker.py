@@ -0,0 +1,166 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch, Mock
+import pytest
+from hcc import (
+    AsyncChannel,
+    Channel,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    retry_function,
+)
+
+URL = "https://mockserver.com/breaker"
+
+
+def test_circuit_breaker_opens_at_failure_rate_threshold():
+    with patch("hcc.circuit_breaker.time.monotonic", return_value=0.0):
+        breaker = CircuitBreaker(
+            failure_rate_threshold=0.5, window_size=4, minimum_calls=4
+        )
+        for _ in range(3):
+            breaker.acquire()
+            breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_success()
+        assert breaker.failure_rate == 0.75
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.acquire()
+        assert repr(breaker) == (
+            "CircuitBreaker(state=OPEN, failure_rate_threshold=0.5, cooldown=30.0)"
+        )
+    assert error.value.remaining == 30.0
+
+
+def test_circuit_breaker_half_open_probes():
+    with patch("hcc.circuit_breaker.time.monotonic", return_value=0.0) as clock:
+        breaker = CircuitBreaker(minimum_calls=1, cooldown=10.0, half_open_max_calls=2)
+        assert breaker.failure_rate == 0.0
+        breaker.record_failure()
+        clock.return_value = 9.0
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        clock.return_value = 10.0
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker.acquire()
+        breaker.acquire()
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.acquire()
+        assert error.value.remaining == 0.0
+        breaker.record_success()
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        clock.return_value = 20.0
+        breaker.acquire()
+        breaker.acquire()
+        breaker.record_success()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.failure_rate == 0.0
+
+
+def test_retry_function_stops_when_circuit_opens():
+    breaker = CircuitBreaker(minimum_calls=3, failure_rate_threshold=1.0)
+    func = Mock(side_effect=ConnectionError("refused"))
+    with pytest.raises(CircuitOpenError):
+        retry_function(
+            func=func,
+            is_retry_needed=lambda result: False,
+            max_retry_count=10,
+            retry_policy=None,
+            circuit_breaker=breaker,
+        )
+    assert func.call_count == 3
+
+
+def test_open_circuit_rejects_channel_requests_without_sending():
+    breaker = CircuitBreaker(minimum_calls=2, window_size=2)
+    with patch("hcc.channel.requests.Session.request") as mock_request:
+        mock_request.side_effect = [Mock(status_code=503), Mock(status_code=503)]
+        channel = Channel(url=URL, circuit_breaker=breaker)
+        with pytest.raises(CircuitOpenError):
+            channel.get()
+        start_time = time.perf_counter()
+        with pytest.raises(CircuitOpenError):
+            Channel(url=URL + "/other", circuit_breaker=breaker).post(json={})
+        assert time.perf_counter() - start_time < 0.01
+    assert mock_request.call_count == 2
+
+
+def test_async_channel_with_circuit_breaker():
+    breaker = CircuitBreaker(minimum_calls=1, cooldown=60.0)
+    transport = Mock()
+
+    async def request(*args, **kwargs):
+        return Mock(status_code=500)
+
+    transport.request = request
+
+    async def run():
+        channel = AsyncChannel(url=URL, transport=transport, circuit_breaker=breaker)
+        await channel.get()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(run())
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_retry_function_records_successes():
+    breaker = CircuitBreaker(minimum_calls=2)
+    result = retry_function(
+        func=Mock(side_effect=["error", "ok"]),
+        is_retry_needed=lambda result: result != "ok",
+        max_retry_count=5,
+        retry_policy=None,
+        circuit_breaker=breaker,
+    )
+    assert result == "ok"
+    assert breaker.failure_rate == 0.5
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_cancelled_probe_is_released():
+    breaker = CircuitBreaker(minimum_calls=1, window_size=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    transport = Mock()
+
+    async def slow_request(*args, **kwargs):
+        await asyncio.sleep(1.0)
+
+    async def run():
+        channel = AsyncChannel(url=URL, transport=transport, circuit_breaker=breaker)
+        transport.request = slow_request
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(channel.get(), timeout=0.01)
+        assert breaker.state == CircuitState.HALF_OPEN
+        transport.request = AsyncMock(return_value=Mock(status_code=200))
+        await channel.get()
+
+    asyncio.run(run())
+    assert breaker.state == CircuitState.CLOSED
+    # A release outside of the half-open state is ignored.
+    breaker.release_probe()
+    assert breaker.acquire() is False
+
+
+def test_interrupted_probe_is_released():
+    breaker = CircuitBreaker(minimum_calls=1, cooldown=0.0)
+    breaker.record_failure()
+    with pytest.raises(KeyboardInterrupt):
+        retry_function(
+            func=Mock(side_effect=KeyboardInterrupt),
+            is_retry_needed=lambda result: False,
+            circuit_breaker=breaker,
+        )
+    assert breaker.acquire() is True
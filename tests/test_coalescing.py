@@ -0,0 +1,204 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+from hcc import AsyncChannel, Channel, RequestCoalescer
+from .test_utilities import make_response
+
+URL = "https://mockserver.com/config"
+BODY = b'{"version": 1}'
+
+
+def test_key_uses_selected_headers_only():
+    coalescer = RequestCoalescer(headers=["Accept"])
+    key = coalescer.key("get", URL, {"b": "2", "a": "1"}, {"accept": "*/*"})
+    assert key == coalescer.key(
+        "GET", URL, {"a": "1", "b": "2"}, {"Accept": "*/*", "X-Trace": "1"}
+    )
+    assert key != coalescer.key("GET", URL, {"a": "1", "b": "2"}, {"Accept": "a/b"})
+    assert coalescer.key("GET", URL) == ("GET", URL, (), (None, None, None))
+
+
+def test_key_always_includes_credentials():
+    coalescer = RequestCoalescer()
+    assert coalescer.headers == ("authorization", "cookie")
+    key = coalescer.key("GET", URL, headers={"Authorization": "Bearer first"})
+    assert key != coalescer.key("GET", URL, headers={"Authorization": "Bearer second"})
+    assert coalescer.key("GET", URL, headers={"Cookie": "a=1"}) != coalescer.key(
+        "GET", URL, headers={"Cookie": "a=2"}
+    )
+    assert repr(coalescer) == "RequestCoalescer(calls=0, collapsed=0)"
+
+
+def test_concurrent_calls_share_one_result():
+    coalescer = RequestCoalescer()
+    started = threading.Event()
+    release = threading.Event()
+    result = object()
+
+    def func():
+        started.set()
+        release.wait(5)
+        return result
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(coalescer.call("k", func)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(coalescer.call("k", func)))
+        for _ in range(3)
+    ]
+    for follower in followers:
+        follower.start()
+    while coalescer.collapsed < 3:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+    assert results == [result] * 4
+    assert (coalescer.calls, coalescer.collapsed) == (1, 3)
+    # The flight is over, so the next call is made again.
+    assert coalescer.call("k", lambda: 1) == 1
+    assert coalescer.calls == 2
+
+
+def test_concurrent_calls_share_one_exception():
+    coalescer = RequestCoalescer()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def func():
+        started.set()
+        release.wait(5)
+        raise ConnectionError("down")
+
+    def call():
+        try:
+            coalescer.call("k", func)
+        except ConnectionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(5)
+    threads.append(threading.Thread(target=call))
+    threads[1].start()
+    while coalescer.collapsed < 1:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+
+def test_async_calls_share_one_task():
+    coalescer = RequestCoalescer()
+    func = AsyncMock(return_value="response")
+
+    async def call():
+        return await asyncio.gather(
+            *(coalescer.async_call("k", func) for _ in range(5))
+        )
+
+    assert asyncio.run(call()) == ["response"] * 5
+    assert func.await_count == 1
+    assert (coalescer.calls, coalescer.collapsed) == (1, 4)
+    assert not coalescer._tasks  # pylint: disable=protected-access
+
+
+def test_async_shared_call_survives_cancelled_leader():
+    coalescer = RequestCoalescer()
+
+    async def func():
+        await asyncio.sleep(0.01)
+        return "response"
+
+    async def call():
+        leader = asyncio.ensure_future(coalescer.async_call("k", func))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(coalescer.async_call("k", func))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(call()) == "response"
+    assert coalescer.calls == 1
+
+
+def test_channel_coalesces_identical_gets():
+    coalescer = RequestCoalescer()
+    started = threading.Event()
+    release = threading.Event()
+
+    def request(*_, **__):
+        started.set()
+        release.wait(5)
+        return make_response(body=BODY)
+
+    with patch(
+        "hcc.channel.requests.Session.request", side_effect=request
+    ) as mock_request:
+        with Channel(url=URL, coalescing=coalescer) as channel:
+            responses = []
+            threads = [
+                threading.Thread(target=lambda: responses.append(channel.get()))
+                for _ in range(3)
+            ]
+            threads[0].start()
+            started.wait(5)
+            for thread in threads[1:]:
+                thread.start()
+            while coalescer.collapsed < 2:
+                threading.Event().wait(0.001)
+            release.set()
+            for thread in threads:
+                thread.join()
+            channel.post(data={"a": 1})
+    assert mock_request.call_count == 2
+    assert len(responses) == 3 and all(r is responses[0] for r in responses)
+
+
+def test_async_channel_coalesces_identical_gets():
+    coalescer = RequestCoalescer()
+    transport = Mock()
+    transport.request = AsyncMock(return_value=make_response(body=BODY))
+
+    async def call():
+        channel = AsyncChannel(url=URL, coalescing=coalescer, transport=transport)
+        return await asyncio.gather(
+            channel.get(params={"a": "1"}),
+            channel.get(params={"a": "1"}),
+            channel.get(params={"a": "2"}),
+        )
+
+    responses = asyncio.run(call())
+    assert responses[0] is responses[1]
+    assert transport.request.call_count == 2
+    assert (coalescer.calls, coalescer.collapsed) == (2, 1)
+
+
+def test_calls_with_other_credentials_are_not_collapsed():
+    coalescer = RequestCoalescer()
+    transport = Mock()
+    transport.request = AsyncMock(side_effect=lambda *_, **__: make_response(body=BODY))
+
+    async def call():
+        channel = AsyncChannel(url=URL, coalescing=coalescer, transport=transport)
+        return await asyncio.gather(
+            channel.get(headers={"Authorization": "Bearer first"}),
+            channel.get(headers={"Authorization": "Bearer first"}),
+            channel.get(headers={"Authorization": "Bearer second"}),
+        )
+
+    responses = asyncio.run(call())
+    assert responses[0] is responses[1]
+    assert responses[2] is not responses[0]
+    assert transport.request.call_count == 2
+    assert (coalescer.calls, coalescer.collapsed) == (2, 1)
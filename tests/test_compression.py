@@ -0,0 +1,163 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import gzip
+import io
+import json
+import zlib
+from typing import Any, List
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+import requests
+import urllib3
+from hcc import AsyncChannel, Channel, Metrics, RequestCompression, StreamedResponse
+from hcc.compression import compress, decompress, received_sizes
+
+URL = "https://mockserver.com/events"
+EVENTS = [{"id": i, "type": "click", "target": "button"} for i in range(100)]
+
+
+def make_response(status_code: int = 200, body: bytes = b"") -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body  # pylint: disable=protected-access
+    response.headers["Content-Length"] = str(len(body))
+    return response
+
+
+def test_prepare_compresses_bodies_above_the_threshold():
+    compression = RequestCompression(min_size=100)
+    prepared = compression.prepare(None, EVENTS, {"Accept": "application/json"})
+    assert prepared is not None
+    assert prepared.headers == {
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "Content-Encoding": "gzip",
+    }
+    assert json.loads(gzip.decompress(prepared.data)) == EVENTS
+    assert prepared.size > 10 * len(prepared.data)
+    prepared = compression.prepare("x" * 100, None, None)
+    assert prepared is not None and prepared.headers == {"Content-Encoding": "gzip"}
+    assert gzip.decompress(prepared.data) == b"x" * 100
+
+
+def test_prepare_leaves_small_and_other_bodies_uncompressed():
+    compression = RequestCompression(encoding="deflate", level=9)
+    prepared = compression.prepare(b"small", None, None)
+    assert prepared is not None
+    assert (prepared.data, prepared.headers, prepared.size) == (b"small", {}, 5)
+    prepared = compression.prepare(None, {"a": 1}, {"content-type": "text/json"})
+    assert prepared is not None and prepared.headers == {"content-type": "text/json"}
+    assert compression.prepare({"key": "value"}, None, None) is None
+    assert compression.prepare(io.BytesIO(b"file"), None, None) is None
+    assert compression.prepare(None, None, None) is None
+    assert compression.prepare(b"x" * 2000, None, {"Content-Encoding": "br"}) is None
+    with pytest.raises(AssertionError):
+        RequestCompression(encoding="br")
+
+
+def test_compress_and_decompress():
+    data = b"payload" * 100
+    assert decompress(compress(data, "gzip"), "GZIP") == data
+    assert decompress(compress(data, "deflate", 1), "deflate") == data
+    raw = zlib.compressobj(wbits=-15)
+    assert decompress(raw.compress(data) + raw.flush(), "deflate") == data
+    assert decompress(data, "identity") == data
+
+
+def test_received_sizes():
+    assert received_sizes(make_response(body=b"body")) == (4, 4)
+    response = make_response(body=b"body")
+    del response.headers["Content-Length"]
+    assert received_sizes(response) is None
+    response.raw = io.BytesIO(b"\x1f\x8b")
+    response.raw.read()
+    assert received_sizes(response) == (2, 4)
+    assert received_sizes(requests.Response()) is None
+
+
+def test_channel_compresses_once_and_records_bytes():
+    bodies: List[Any] = []
+
+    def send(request: requests.PreparedRequest, **_: Any) -> requests.Response:
+        bodies.append((request.body, dict(request.headers)))
+        return make_response(503 if len(bodies) == 1 else 200, b"{}")
+
+    metrics = Metrics()
+    with (
+        patch("requests.Session.send", side_effect=send),
+        patch("hcc.compression.compress", wraps=compress) as mock_compress,
+    ):
+        with Channel(
+            url=URL, compression=RequestCompression(), metrics=metrics
+        ) as channel:
+            assert channel.post(json=EVENTS).status_code == 200
+            channel.get()
+    assert mock_compress.call_count == 1
+    assert bodies[0][0] == bodies[1][0]
+    assert json.loads(gzip.decompress(bodies[0][0])) == EVENTS
+    assert bodies[0][1]["Content-Encoding"] == "gzip"
+    assert bodies[0][1]["Content-Type"] == "application/json"
+    assert "Content-Encoding" not in bodies[2][1]
+    sizes = metrics.snapshot()["bytes"]
+    assert sizes["sent"] == {
+        "wire": 2 * len(bodies[0][0]),
+        "logical": 2 * len(json.dumps(EVENTS)),
+    }
+    assert sizes["received"] == {"wire": 6, "logical": 6}
+
+
+def test_streamed_response_is_decompressed_incrementally():
+    payload = b"line\n" * 10000
+    compressed = gzip.compress(payload)
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = urllib3.HTTPResponse(
+        body=io.BytesIO(compressed),
+        headers={"Content-Encoding": "gzip"},
+        preload_content=False,
+    )
+    metrics = Metrics()
+    with patch("hcc.channel.requests.Session.request", return_value=response):
+        with Channel(url=URL, metrics=metrics) as channel:
+            with channel.stream_get(max_body_size=len(payload)) as streamed:
+                chunks = list(streamed.iter_content(chunk_size=1024))
+            streamed.close()
+    assert b"".join(chunks) == payload
+    assert len(chunks) > 1
+    assert metrics.snapshot()["bytes"]["received"] == {
+        "wire": len(compressed),
+        "logical": len(payload),
+    }
+    # Without a byte count of the raw stream, the wire size is not known.
+    response = make_response(body=b"body")
+    response.raw = Mock(spec=["close"])
+    streamed = StreamedResponse(response, metrics=Metrics())
+    streamed.close()
+    assert streamed.metrics is not None
+    assert streamed.metrics.snapshot()["bytes"]["received"]["wire"] == 0
+
+
+def test_async_channel_compresses_and_records_bytes():
+    transport = Mock()
+    transport.request = AsyncMock(return_value=make_response(body=b"ok"))
+    metrics = Metrics()
+
+    async def call():
+        channel = AsyncChannel(
+            url=URL,
+            transport=transport,
+            compression=RequestCompression(min_size=10),
+            metrics=metrics,
+        )
+        await channel.put(data="x" * 100)
+
+    asyncio.run(call())
+    kwargs = transport.request.call_args.kwargs
+    assert gzip.decompress(kwargs["data"]) == b"x" * 100
+    assert kwargs["headers"] == {"Content-Encoding": "gzip"}
+    assert kwargs["json"] is None
+    sizes = metrics.snapshot()["bytes"]
+    assert sizes["sent"] == {"wire": len(kwargs["data"]), "logical": 100}
+    assert sizes["received"] == {"wire": 2, "logical": 2}
@@ -0,0 +1,282 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+import requests
+from hcc import (
+    AimdLimit,
+    AsyncChannel,
+    Channel,
+    CircuitBreaker,
+    CircuitState,
+    ConcurrencyLimiter,
+    ConcurrencyLimitExceededError,
+    GradientLimit,
+    HccError,
+    Metrics,
+    RetryBudget,
+    RetryPolicy,
+)
+from hcc.deadline import Deadline
+from .test_utilities import make_response
+
+URL = "https://mockserver.com/concurrency"
+
+
+def test_aimd_limit():
+    algorithm = AimdLimit(backoff_ratio=0.5, latency_threshold=1.0)
+    assert algorithm.update(10.0, 0.1, 5, False) == 11.0
+    # An underused limit does not grow.
+    assert algorithm.update(10.0, 0.1, 4, False) == 10.0
+    assert algorithm.update(10.0, 0.1, 10, True) == 5.0
+    assert algorithm.update(10.0, 2.0, 10, False) == 5.0
+
+
+def test_gradient_limit_grows_while_latency_is_stable():
+    algorithm = GradientLimit(smoothing=1.0)
+    assert algorithm.update(16.0, 0.1, 16, False) == pytest.approx(20.0)
+    assert algorithm.long_rtt == pytest.approx(0.1)
+    assert algorithm.update(16.0, 0.1, 7, False) == 16.0
+    assert algorithm.update(16.0, 0.1, 16, True) == pytest.approx(14.4)
+    assert repr(algorithm) == (
+        "GradientLimit(tolerance=1.5, smoothing=1.0, window=600, backoff_ratio=0.9)"
+    )
+
+
+def test_gradient_limit_shrinks_when_latency_grows():
+    algorithm = GradientLimit(smoothing=1.0, window=10)
+    algorithm.update(100.0, 0.1, 100, False)
+    # The long-term latency moves to 0.12, so the gradient is 1.5 * 0.12 / 0.3.
+    assert algorithm.update(100.0, 0.3, 100, False) == pytest.approx(70.0)
+    assert algorithm.long_rtt == pytest.approx(0.12)
+    # The long-term latency decays once the latency recovers.
+    algorithm.update(100.0, 0.05, 100, False)
+    assert algorithm.long_rtt == pytest.approx(0.113 * 0.95)
+    assert algorithm.update(100.0, 0.0, 100, False) == 100.0
+
+
+def test_limiter_rejects_beyond_the_limit():
+    limiter = ConcurrencyLimiter(initial_limit=2, timeout=0.0)
+    starts = [limiter.acquire(), limiter.acquire()]
+    with pytest.raises(ConcurrencyLimitExceededError) as exc_info:
+        limiter.acquire()
+    assert isinstance(exc_info.value, HccError)
+    assert exc_info.value.limit == 2
+    assert repr(limiter) == "ConcurrencyLimiter(limit=2, inflight=2, rejected=1)"
+    for start in starts:
+        limiter.release(start, dropped=False, sample=False)
+    assert limiter.inflight == 0
+
+
+def test_limiter_adapts_within_bounds():
+    limiter = ConcurrencyLimiter(
+        algorithm=AimdLimit(backoff_ratio=0.1), initial_limit=2, max_limit=3
+    )
+    for _ in range(3):
+        start = limiter.acquire()
+        limiter.release(start, dropped=False)
+    assert limiter.limit == 3
+    start = limiter.acquire()
+    limiter.release(start, dropped=True)
+    assert limiter.limit == 1
+
+
+def test_limiter_queues_threads_until_a_slot_is_free():
+    limiter = ConcurrencyLimiter(initial_limit=1, timeout=5.0)
+    start = limiter.acquire()
+    acquired = threading.Event()
+
+    def wait():
+        limiter.release(limiter.acquire(), dropped=False, sample=False)
+        acquired.set()
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release(start, dropped=False, sample=False)
+    thread.join()
+    assert acquired.is_set()
+    start = limiter.acquire()
+    with pytest.raises(ConcurrencyLimitExceededError):
+        limiter.acquire(timeout=0.01)
+    limiter.release(start, dropped=False, sample=False)
+
+
+def test_limiter_without_timeout_waits_as_long_as_needed():
+    limiter = ConcurrencyLimiter(initial_limit=1)
+    start = limiter.acquire()
+    timer = threading.Timer(
+        0.05, lambda: limiter.release(start, dropped=False, sample=False)
+    )
+    timer.start()
+    limiter.acquire()
+    timer.join()
+    assert limiter.inflight == 1
+
+
+def test_limiter_queues_tasks_until_a_slot_is_free():
+    limiter = ConcurrencyLimiter(initial_limit=1)
+
+    async def call():
+        start = await limiter.async_acquire()
+        waiter = asyncio.ensure_future(limiter.async_acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        limiter.release(start, dropped=False, sample=False)
+        start = await waiter
+        with pytest.raises(ConcurrencyLimitExceededError):
+            await limiter.async_acquire(timeout=0.01)
+        with pytest.raises(ConcurrencyLimitExceededError):
+            await limiter.async_acquire(timeout=0.0)
+        cancelled = asyncio.ensure_future(limiter.async_acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        limiter.release(start, dropped=False, sample=False)
+
+    asyncio.run(call())
+    assert limiter.rejected == 2
+    assert not limiter._waiters  # pylint: disable=protected-access
+
+
+def test_cancelled_task_passes_its_slot_on():
+    limiter = ConcurrencyLimiter(initial_limit=1, timeout=5.0)
+
+    async def call():
+        start = await limiter.async_acquire()
+        first = asyncio.ensure_future(limiter.async_acquire())
+        second = asyncio.ensure_future(limiter.async_acquire())
+        await asyncio.sleep(0.01)
+        limiter.release(start, dropped=False, sample=False)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await second
+        return limiter.inflight
+
+    assert asyncio.run(call()) == 1
+
+
+def test_call_classifies_the_outcome():
+    limiter = ConcurrencyLimiter(
+        algorithm=AimdLimit(backoff_ratio=0.5), initial_limit=8
+    )
+    assert limiter.call(Mock(return_value=make_response(503))).status_code == 503
+    assert limiter.limit == 4
+    with pytest.raises(requests.Timeout):
+        limiter.call(Mock(side_effect=requests.Timeout))
+    assert limiter.limit == 2
+    with pytest.raises(KeyboardInterrupt):
+        limiter.call(Mock(side_effect=KeyboardInterrupt))
+    assert limiter.limit == 2
+    limiter.call(Mock(return_value=make_response()), Deadline(1.0))
+    assert (limiter.limit, limiter.inflight) == (3, 0)
+
+
+def test_async_call_classifies_the_outcome():
+    limiter = ConcurrencyLimiter(
+        algorithm=AimdLimit(backoff_ratio=0.5), initial_limit=8
+    )
+
+    async def call():
+        await limiter.async_call(AsyncMock(return_value=make_response(429)))
+        with pytest.raises(requests.ConnectionError):
+            await limiter.async_call(AsyncMock(side_effect=requests.ConnectionError))
+        with pytest.raises(asyncio.CancelledError):
+            await limiter.async_call(AsyncMock(side_effect=asyncio.CancelledError))
+        await limiter.async_call(AsyncMock(return_value=make_response()))
+
+    asyncio.run(call())
+    assert (limiter.limit, limiter.inflight) == (3, 0)
+
+
+def test_channel_attempts_go_through_the_limiter():
+    limiter = ConcurrencyLimiter(algorithm=AimdLimit(), initial_limit=1, timeout=0.0)
+    seen = []
+
+    def request(*_, **__):
+        seen.append(limiter.inflight)
+        return make_response()
+
+    with patch("hcc.channel.requests.Session.request", side_effect=request):
+        with Channel(url=URL, concurrency_limiter=limiter, deadline=5.0) as channel:
+            channel.get()
+            channel.post(data={"a": 1})
+    assert seen == [1, 1]
+    assert (limiter.limit, limiter.inflight) == (3, 0)
+
+
+def test_local_rejection_is_not_a_backend_failure():
+    limiter = ConcurrencyLimiter(initial_limit=1, timeout=0.0)
+    breaker = CircuitBreaker(minimum_calls=1, window_size=1)
+    budget = RetryBudget(min_retries_per_second=0.0)
+    start = limiter.acquire()
+    with patch("hcc.channel.requests.Session.request") as mock_request:
+        with Channel(
+            url=URL,
+            concurrency_limiter=limiter,
+            circuit_breaker=breaker,
+            retry_budget=budget,
+            retry_policy=RetryPolicy.IMMEDIATE,
+        ) as channel:
+            for _ in range(3):
+                with pytest.raises(ConcurrencyLimitExceededError):
+                    channel.get()
+    limiter.release(start, dropped=False, sample=False)
+    assert mock_request.call_count == 0
+    assert limiter.rejected == 3
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_rate == 0.0
+    assert budget.tokens == 1.0
+
+
+def test_async_channel_attempts_go_through_the_limiter():
+    limiter = ConcurrencyLimiter(initial_limit=2)
+    transport = Mock()
+    transport.request = AsyncMock(return_value=make_response())
+
+    async def call():
+        channel = AsyncChannel(
+            url=URL, concurrency_limiter=limiter, transport=transport
+        )
+        await asyncio.gather(*(channel.get() for _ in range(5)))
+
+    asyncio.run(call())
+    assert transport.request.call_count == 5
+    assert limiter.inflight == 0
+
+
+def test_channels_expose_the_limiter_as_gauges():
+    limiter = ConcurrencyLimiter(initial_limit=4)
+    metrics = Metrics()
+    seen = []
+
+    def request(*_, **__):
+        seen.append(metrics.snapshot()["gauges"]["concurrency_inflight"])
+        return make_response()
+
+    transport = Mock()
+    transport.request = AsyncMock(return_value=make_response())
+
+    async def close(channel: AsyncChannel):
+        await channel.close()
+
+    with patch("hcc.channel.requests.Session.request", side_effect=request):
+        with Channel(url=URL, concurrency_limiter=limiter, metrics=metrics) as channel:
+            gauges = metrics.snapshot()["gauges"]
+            assert (gauges["concurrency_limit"], gauges["concurrency_inflight"]) == (
+                4,
+                0,
+            )
+            channel.get()
+    assert seen == [1]
+    async_channel = AsyncChannel(
+        url=URL, concurrency_limiter=limiter, metrics=metrics, transport=transport
+    )
+    assert metrics.snapshot()["gauges"]["concurrency_limit"] == 4
+    asyncio.run(close(async_channel))
+    assert metrics.snapshot()["gauges"]["concurrency_limit"] == 0
@@ -0,0 +1,219 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+from requests.structures import CaseInsensitiveDict
+from hcc import (
+    AsyncChannel,
+    Channel,
+    Deadline,
+    DeadlineExceededError,
+    HccError,
+    RetryPolicy,
+    async_retry_function,
+    retry_function,
+)
+from hcc.deadline import attempt_arguments
+
+URL = "https://mockserver.com/deadline"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_deadline():
+    clock = Clock()
+    with patch("hcc.deadline.time.monotonic", side_effect=clock.monotonic):
+        deadline = Deadline(1.0)
+        assert deadline.remaining() == 1.0
+        assert deadline.timeout(2.0) == 1.0
+        assert deadline.timeout(0.5) == 0.5
+        assert repr(deadline) == "Deadline(remaining=1.000)"
+        clock.sleep(1.5)
+        assert deadline.remaining() == 0.0
+        assert deadline.expired
+
+
+def test_attempt_arguments():
+    assert attempt_arguments({"params": None}, timeout=2.0, deadline=None) == {
+        "timeout": 2.0,
+        "params": None,
+    }
+    with patch("hcc.deadline.time.monotonic", return_value=0.0):
+        deadline = Deadline(0.5)
+        arguments = attempt_arguments(
+            {"headers": {"Accept": "text/plain"}},
+            timeout=2.0,
+            deadline=deadline,
+            header="X-Deadline-Ms",
+        )
+        assert arguments == {
+            "timeout": 0.5,
+            "headers": {"Accept": "text/plain", "X-Deadline-Ms": "500"},
+        }
+        assert attempt_arguments(
+            {"headers": None}, timeout=0.2, deadline=deadline, header="X-Deadline-Ms"
+        ) == {"timeout": 0.2, "headers": {"X-Deadline-Ms": "500"}}
+
+
+def test_attempt_arguments_raise_once_the_deadline_has_passed():
+    clock = Clock()
+    with patch("hcc.deadline.time.monotonic", side_effect=clock.monotonic):
+        deadline = Deadline(1.0)
+        clock.sleep(1.0)
+        with pytest.raises(DeadlineExceededError):
+            attempt_arguments({}, timeout=2.0, deadline=deadline)
+        with pytest.raises(DeadlineExceededError):
+            deadline.timeout(2.0)
+
+
+def test_deadline_passing_during_an_attempt_is_not_retried():
+    clock = Clock()
+    calls = []
+
+    def func():
+        calls.append(clock.now)
+        clock.sleep(1.0)
+        return attempt_arguments({}, timeout=2.0, deadline=deadline)
+
+    with patch("hcc.deadline.time.monotonic", side_effect=clock.monotonic):
+        deadline = Deadline(1.0)
+        with pytest.raises(DeadlineExceededError):
+            retry_function(func, is_retry_needed=lambda _: False, deadline=deadline)
+    assert len(calls) == 1
+
+
+def run_retry(func: Mock, deadline_seconds: float, **kwargs) -> Mock:
+    clock = Clock()
+    with (
+        patch("hcc.deadline.time.monotonic", side_effect=clock.monotonic),
+        patch("hcc.retry.time.sleep", side_effect=clock.sleep),
+    ):
+        return retry_function(
+            func,
+            is_retry_needed=lambda r: r.status_code != 200,
+            max_retry_count=10,
+            retry_policy=RetryPolicy.LINEAR,
+            base_delay=300,
+            deadline=Deadline(deadline_seconds),
+            **kwargs,
+        )
+
+
+def test_retry_stops_when_the_delay_exceeds_the_deadline():
+    func = Mock(return_value=Mock(status_code=500))
+    assert run_retry(func, 1.0).status_code == 500
+    assert func.call_count == 4
+
+
+def test_retry_raises_when_the_delay_exceeds_the_deadline():
+    func = Mock(side_effect=ConnectionError("refused"))
+    with pytest.raises(ConnectionError):
+        run_retry(func, 0.5)
+    assert func.call_count == 2
+
+
+def test_retry_stops_when_retry_after_exceeds_the_deadline():
+    headers = CaseInsensitiveDict({"Retry-After": "30"})
+    func = Mock(return_value=Mock(status_code=503, headers=headers))
+    response = run_retry(
+        func, 10.0, retry_after=lambda r: float(r.headers["Retry-After"])
+    )
+    assert response.status_code == 503
+    assert func.call_count == 1
+
+
+def test_retry_raises_when_the_deadline_has_passed():
+    func = Mock()
+    with patch("hcc.deadline.time.monotonic", return_value=0.0):
+        deadline = Deadline(0.0)
+        with pytest.raises(DeadlineExceededError) as exc_info:
+            retry_function(func, is_retry_needed=lambda _: False, deadline=deadline)
+    assert isinstance(exc_info.value, HccError)
+    assert isinstance(exc_info.value, TimeoutError)
+    func.assert_not_called()
+
+
+def test_async_retry_stops_when_the_delay_exceeds_the_deadline():
+    clock = Clock()
+    func = AsyncMock(return_value=Mock(status_code=500))
+    with (
+        patch("hcc.deadline.time.monotonic", side_effect=clock.monotonic),
+        patch("hcc.retry.asyncio.sleep", side_effect=clock.async_sleep),
+    ):
+        response = asyncio.run(
+            async_retry_function(
+                func,
+                is_retry_needed=lambda r: r.status_code != 200,
+                retry_policy=RetryPolicy.LINEAR,
+                base_delay=300,
+                deadline=Deadline(1.0),
+            )
+        )
+    assert response.status_code == 500
+    assert func.await_count == 4
+
+
+def test_channel_shrinks_the_timeouts_to_the_deadline():
+    clock = Clock()
+    with (
+        patch("hcc.deadline.time.monotonic", side_effect=clock.monotonic),
+        patch("hcc.retry.time.sleep", side_effect=clock.sleep),
+        patch(
+            "hcc.channel.requests.Session.request",
+            return_value=Mock(status_code=500),
+        ) as mock_request,
+    ):
+        with Channel(
+            url=URL,
+            max_retry_count=None,
+            retry_policy=RetryPolicy.LINEAR,
+            base_delay=250,
+            deadline=1.0,
+            deadline_header="X-Deadline-Ms",
+        ) as channel:
+            assert channel.get(headers={"Accept": "*/*"}).status_code == 500
+    calls = mock_request.call_args_list
+    assert [c.kwargs["timeout"] for c in calls] == [1.0, 0.75, 0.5, 0.25]
+    assert [c.kwargs["headers"]["X-Deadline-Ms"] for c in calls] == [
+        "1000",
+        "750",
+        "500",
+        "250",
+    ]
+    assert calls[0].kwargs["headers"]["Accept"] == "*/*"
+
+
+def test_async_channel_shrinks_the_timeouts_to_the_deadline():
+    clock = Clock()
+    transport = Mock()
+    transport.request = AsyncMock(return_value=Mock(status_code=500))
+    with (
+        patch("hcc.deadline.time.monotonic", side_effect=clock.monotonic),
+        patch("hcc.retry.asyncio.sleep", side_effect=clock.async_sleep),
+    ):
+        channel = AsyncChannel(
+            url=URL,
+            timeout=0.6,
+            retry_policy=RetryPolicy.LINEAR,
+            base_delay=250,
+            deadline=1.0,
+            transport=transport,
+        )
+        assert asyncio.run(channel.delete()).status_code == 500
+    calls = transport.request.call_args_list
+    assert [c.kwargs["timeout"] for c in calls] == [0.6, 0.6, 0.5, 0.25]
+    assert "X-Deadline-Ms" not in (calls[0].kwargs["headers"] or {})
@@ -0,0 +1,270 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+from hcc import AsyncChannel, Channel, HedgePolicy, LatencyTracker
+
+URL = "https://mockserver.com/hedging"
+
+Behaviour = Tuple[float, Any]
+
+
+def copies(behaviours: List[Behaviour]) -> Callable[[], Any]:
+    """Return a function whose n-th call sleeps, then returns or raises the n-th outcome."""
+    counter = itertools.count()
+
+    def func(*_: Any, **__: Any) -> Any:
+        delay, outcome = behaviours[next(counter)]
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return func
+
+
+def async_copies(behaviours: List[Behaviour]) -> Callable[[], Any]:
+    counter = itertools.count()
+
+    async def func(*_: Any, **__: Any) -> Any:
+        delay, outcome = behaviours[next(counter)]
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return func
+
+
+def run_call(policy: HedgePolicy, behaviours: List[Behaviour]) -> Any:
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        return policy.call(copies(behaviours), executor)
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window_size=100)
+    assert tracker.percentile(95) is None
+    for latency in range(200, 0, -1):
+        tracker.record(latency / 100)
+    assert len(tracker) == 100
+    assert tracker.percentile(95) == 0.95
+    assert tracker.percentile(0) == 0.01
+    assert tracker.percentile(100) == 1.0
+
+
+def test_latency_tracker_sorts_every_refresh_interval():
+    tracker = LatencyTracker(refresh_interval=2)
+    tracker.record(0.3)
+    assert tracker.percentile(100) == 0.3
+    tracker.record(0.5)
+    assert tracker.percentile(100) == 0.3
+    tracker.record(0.4)
+    assert tracker.percentile(100) == 0.5
+    assert tracker.percentile(50) == 0.4
+
+
+def test_hedge_policy_delay():
+    assert HedgePolicy(delay=0.1).hedge_delay() == 0.1
+    policy = HedgePolicy(percentile=50.0, min_samples=3)
+    policy.latencies.record(0.1)
+    policy.latencies.record(0.3)
+    assert policy.hedge_delay() is None
+    policy.latencies.record(0.2)
+    assert policy.hedge_delay() == 0.2
+
+
+def test_hedge_policy_methods():
+    policy = HedgePolicy(methods=["get", "head"])
+    assert policy.applies_to("GET")
+    assert not policy.applies_to("DELETE")
+    assert "HedgePolicy(delay=None" in repr(policy)
+    with pytest.raises(AssertionError):
+        HedgePolicy(methods=["GET", "POST"])
+
+
+def test_hedge_not_sent_for_fast_primary():
+    policy = HedgePolicy(delay=0.2)
+    assert run_call(policy, [(0, "primary")]) == "primary"
+    assert policy.hedge_count == 0
+    assert len(policy.latencies) == 1
+
+
+def test_hedge_not_sent_before_warm_up():
+    policy = HedgePolicy(min_samples=5)
+    assert run_call(policy, [(0.1, "primary"), (0, "hedge")]) == "primary"
+    assert policy.hedge_count == 0
+
+
+def test_unhedgeable_call_runs_inline():
+    executor = Mock()
+    policy = HedgePolicy(min_samples=5)
+    assert policy.call(copies([(0, "primary")]), executor) == "primary"
+    with patch("hcc.retry_budget.time.monotonic", return_value=0.0):
+        empty = HedgePolicy(delay=0.01, max_hedge_ratio=0.0)
+        empty._budget.try_acquire()  # pylint: disable=protected-access
+        assert empty.call(copies([(0, "primary")]), executor) == "primary"
+    executor.submit.assert_not_called()
+    assert len(policy.latencies) == len(empty.latencies) == 1
+
+
+def test_hedge_wins_and_loser_is_closed():
+    policy = HedgePolicy(delay=0.05)
+    primary = Mock()
+    assert run_call(policy, [(0.3, primary), (0, "hedge")]) == "hedge"
+    assert policy.hedge_count == 1
+    assert policy.hedge_wins == 1
+    primary.close.assert_called_once()
+
+
+def test_hedge_loses_to_primary():
+    policy = HedgePolicy(delay=0.05)
+    hedge = Mock()
+    assert run_call(policy, [(0.1, "primary"), (0.3, hedge)]) == "primary"
+    assert policy.hedge_count == 1
+    assert policy.hedge_wins == 0
+    hedge.close.assert_called_once()
+
+
+def test_hedge_answers_after_primary_fails():
+    policy = HedgePolicy(delay=0.05)
+    behaviours: List[Behaviour] = [(0.1, ConnectionError("reset")), (0.2, "hedge")]
+    assert run_call(policy, behaviours) == "hedge"
+    assert policy.hedge_wins == 1
+
+
+def test_hedge_raises_when_both_copies_fail():
+    policy = HedgePolicy(delay=0.05)
+    behaviours: List[Behaviour] = [
+        (0.1, ConnectionError("primary")),
+        (0.2, TimeoutError("hedge")),
+    ]
+    with pytest.raises(TimeoutError, match="hedge"):
+        run_call(policy, behaviours)
+    assert policy.hedge_wins == 0
+
+
+def test_hedge_budget_limits_hedges():
+    with patch("hcc.retry_budget.time.monotonic", return_value=0.0):
+        policy = HedgePolicy(delay=0.01, max_hedge_ratio=0.0)
+        assert run_call(policy, [(0.1, "primary"), (0, "hedge")]) == "hedge"
+        assert run_call(policy, [(0.1, "primary"), (0, "hedge")]) == "primary"
+    assert policy.hedge_count == 1
+
+
+def test_async_hedge_wins_and_primary_is_cancelled():
+    policy = HedgePolicy(delay=0.05)
+    cancelled = []
+    sequence = itertools.count()
+
+    async def func():
+        if next(sequence):
+            return "hedge"
+        try:
+            await asyncio.sleep(0.5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "primary"  # pragma: no cover
+
+    async def call():
+        result = await policy.async_call(func)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(call()) == "hedge"
+    assert policy.hedge_wins == 1
+    assert cancelled == [True]
+
+
+def test_cancelled_caller_cancels_the_primary():
+    policy = HedgePolicy(delay=0.5)
+    cancelled = []
+
+    async def func():
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def call():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(policy.async_call(func), timeout=0.01)
+        await asyncio.sleep(0)
+        # The primary is cancelled with the caller, not only at the shutdown of the loop.
+        assert cancelled == [True]
+
+    asyncio.run(call())
+    assert policy.hedge_count == 0
+
+
+def test_async_hedge_not_sent():
+    policy = HedgePolicy(delay=0.2)
+    fast = asyncio.run(policy.async_call(async_copies([(0, "primary")])))
+    assert fast == "primary"
+    warming = HedgePolicy(min_samples=5)
+    slow = asyncio.run(
+        warming.async_call(async_copies([(0.1, "primary"), (0, "hedge")]))
+    )
+    assert slow == "primary"
+    assert policy.hedge_count == warming.hedge_count == 0
+    assert len(policy.latencies) == 1
+
+
+def test_async_hedge_answers_after_primary_fails():
+    policy = HedgePolicy(delay=0.05)
+    behaviours: List[Behaviour] = [(0.1, ConnectionError("reset")), (0.2, "hedge")]
+    assert asyncio.run(policy.async_call(async_copies(behaviours))) == "hedge"
+    assert policy.hedge_wins == 1
+
+
+def test_async_hedge_raises_when_both_copies_fail():
+    policy = HedgePolicy(delay=0.05)
+    behaviours: List[Behaviour] = [
+        (0.1, ConnectionError("primary")),
+        (0.2, TimeoutError("hedge")),
+    ]
+    with pytest.raises(TimeoutError, match="hedge"):
+        asyncio.run(policy.async_call(async_copies(behaviours)))
+
+
+def test_channel_hedges_idempotent_methods():
+    responses = copies(
+        [(0.3, Mock(status_code=500)), (0, Mock(status_code=200))]
+        + [(0.3, Mock(status_code=201))]
+    )
+    with patch(
+        "hcc.channel.requests.Session.request", side_effect=responses
+    ) as mock_request:
+        with Channel(url=URL, hedging=HedgePolicy(delay=0.05)) as channel:
+            assert channel.get().status_code == 200
+            assert channel.post(data={}).status_code == 201
+    assert mock_request.call_count == 3
+    assert channel.hedging is not None and channel.hedging.hedge_wins == 1
+
+
+def test_async_channel_hedges_idempotent_methods():
+    transport = Mock()
+    transport.request = AsyncMock(
+        side_effect=async_copies(
+            [(0.3, Mock(status_code=500)), (0, Mock(status_code=200))]
+            + [(0.3, Mock(status_code=201))]
+        )
+    )
+
+    async def call():
+        channel = AsyncChannel(
+            url=URL, hedging=HedgePolicy(delay=0.05), transport=transport
+        )
+        return (await channel.delete()).status_code, (
+            await channel.patch(data={})
+        ).status_code
+
+    assert asyncio.run(call()) == (200, 201)
+    assert transport.request.call_count == 3
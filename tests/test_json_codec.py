@@ -0,0 +1,159 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import json
+import math
+import sys
+import types
+from typing import Any, List
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+import requests
+from hcc import (
+    AsyncChannel,
+    Channel,
+    MsgspecCodec,
+    OrjsonCodec,
+    RequestCompression,
+    StdlibJsonCodec,
+    decode_json,
+    fastest_json_codec,
+)
+from .test_utilities import make_response
+
+URL = "https://mockserver.com/json"
+DATA = {"name": "día", "values": [1, 2.5, None, True]}
+
+
+def fake_orjson() -> types.ModuleType:
+    module = types.ModuleType("orjson")
+    module.OPT_NON_STR_KEYS = 4  # type: ignore[attr-defined]
+    module.dumps = Mock(  # type: ignore[attr-defined]
+        side_effect=lambda obj, option=0: json.dumps(
+            obj, separators=(",", ":")
+        ).encode()
+    )
+    module.loads = json.loads  # type: ignore[attr-defined]
+    return module
+
+
+def fake_msgspec() -> types.ModuleType:
+    module = types.ModuleType("msgspec.json")
+    encoder = Mock()
+    encoder.encode.side_effect = lambda obj: json.dumps(obj).encode()
+    decoder = Mock()
+    decoder.decode.side_effect = json.loads
+    module.Encoder = Mock(return_value=encoder)  # type: ignore[attr-defined]
+    module.Decoder = Mock(return_value=decoder)  # type: ignore[attr-defined]
+    return module
+
+
+def test_stdlib_codec_matches_requests():
+    codec = StdlibJsonCodec()
+    prepared = requests.Request("POST", URL, json=DATA).prepare()
+    assert codec.encode(DATA) == prepared.body
+    assert codec.decode(codec.encode(DATA)) == DATA
+    with pytest.raises(ValueError):
+        codec.encode({"value": math.nan})
+    assert repr(codec) == "StdlibJsonCodec()"
+
+
+def test_optional_codecs():
+    orjson = fake_orjson()
+    with patch.dict(sys.modules, {"orjson": orjson}):
+        codec = OrjsonCodec()
+        assert codec.encode([1, 2]) == b"[1,2]"
+        assert orjson.dumps.call_args.kwargs == {"option": orjson.OPT_NON_STR_KEYS}
+        assert codec.decode(b"[1,2]") == [1, 2]
+        assert isinstance(fastest_json_codec(), OrjsonCodec)
+    with patch.dict(sys.modules, {"orjson": None, "msgspec.json": fake_msgspec()}):
+        codec = fastest_json_codec()
+        assert isinstance(codec, MsgspecCodec)
+        assert codec.decode(codec.encode(DATA)) == DATA
+    with patch.dict(sys.modules, {"orjson": None, "msgspec": None}):
+        assert isinstance(fastest_json_codec(), StdlibJsonCodec)
+        with pytest.raises(ImportError):
+            MsgspecCodec()
+
+
+def test_channel_serializes_json_once_per_call():
+    bodies: List[Any] = []
+
+    def send(request: requests.PreparedRequest, **_: Any) -> requests.Response:
+        bodies.append((request.body, dict(request.headers)))
+        return make_response(503 if len(bodies) < 3 else 200, b'{"id": 7}')
+
+    codec = StdlibJsonCodec()
+    with (
+        patch("requests.Session.send", side_effect=send),
+        patch.object(codec, "encode", wraps=codec.encode) as mock_encode,
+    ):
+        with Channel(url=URL, json_codec=codec) as channel:
+            response = channel.put(json=DATA, headers={"X-Request-Id": "1"})
+            assert channel.decode_json(response) == {"id": 7}
+            channel.patch(json=DATA, headers={"Content-Type": "application/merge+json"})
+    assert mock_encode.call_count == 2
+    assert bodies[0] == bodies[2]
+    assert json.loads(bodies[0][0]) == DATA
+    assert bodies[0][1]["Content-Type"] == "application/json"
+    assert bodies[0][1]["X-Request-Id"] == "1"
+    assert bodies[3][1]["Content-Type"] == "application/merge+json"
+
+
+def test_channel_without_codec_serializes_json_once_with_the_standard_library():
+    responses = [make_response(503), make_response(body=b"{}")]
+    with (
+        patch(
+            "hcc.channel.requests.Session.request", side_effect=responses
+        ) as mock_request,
+        patch("hcc.request_preparation.DEFAULT_JSON_CODEC") as mock_codec,
+    ):
+        mock_codec.encode.side_effect = StdlibJsonCodec().encode
+        with Channel(url=URL, base_delay=0) as channel:
+            response = channel.post(json=DATA)
+            assert channel.decode_json(response) == {}
+    assert mock_codec.encode.call_count == 1
+    assert mock_request.call_count == 2
+    kwargs = mock_request.call_args.kwargs
+    assert kwargs["json"] is None
+    assert kwargs["data"] == requests.Request("POST", URL, json=DATA).prepare().body
+    assert kwargs["headers"] == {"Content-Type": "application/json"}
+
+
+def test_codec_is_applied_before_compression():
+    with patch(
+        "hcc.channel.requests.Session.request", return_value=make_response(body=b"{}")
+    ) as mock_request:
+        with Channel(
+            url=URL,
+            json_codec=StdlibJsonCodec(),
+            compression=RequestCompression(min_size=1),
+        ) as channel:
+            channel.post(json=DATA)
+    kwargs = mock_request.call_args.kwargs
+    assert kwargs["headers"] == {
+        "Content-Type": "application/json",
+        "Content-Encoding": "gzip",
+    }
+    assert kwargs["json"] is None
+
+
+def test_async_channel_serializes_json_once():
+    transport = Mock()
+    transport.request = AsyncMock(
+        side_effect=[make_response(500, b"{}"), make_response(body=b"[1]")]
+    )
+
+    async def call():
+        channel = AsyncChannel(
+            url=URL, transport=transport, json_codec=StdlibJsonCodec()
+        )
+        response = await channel.post(json=DATA)
+        return channel.decode_json(response)
+
+    assert asyncio.run(call()) == [1]
+    first, second = transport.request.call_args_list
+    assert first.kwargs["data"] is second.kwargs["data"]
+    assert first.kwargs["json"] is None
+    assert decode_json(make_response(body=b"[2]"), StdlibJsonCodec()) == [2]
@@ -0,0 +1,113 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import logging
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+from hcc import AsyncChannel, BodyLogMode, Channel, LogPolicy
+
+URL = "https://mockserver.com/logging"
+
+
+class Probe(dict):
+    """A JSON body which counts how many times it is rendered."""
+
+    renders = 0
+
+    def __repr__(self) -> str:
+        Probe.renders += 1
+        return super().__repr__()
+
+    __str__ = __repr__
+
+
+def test_log_policy_redacts_headers():
+    policy = LogPolicy()
+    headers = {"Accept": "*/*", "Authorization": "Bearer secret", "X-API-Key": "key"}
+    assert policy.headers(headers) == {
+        "Accept": "*/*",
+        "Authorization": "[REDACTED]",
+        "X-API-Key": "[REDACTED]",
+    }
+    plain = {"Accept": "*/*"}
+    assert policy.headers(plain) is plain
+    assert policy.headers(None) is None
+    custom = LogPolicy(redacted_headers=frozenset({"X-Tenant"}))
+    assert custom.headers({"x-tenant": "a", "Cookie": "b"}) == {
+        "x-tenant": "[REDACTED]",
+        "Cookie": "b",
+    }
+
+
+@pytest.mark.parametrize(
+    "mode, body, expected",
+    [
+        (BodyLogMode.FULL, {"key": "value"}, {"key": "value"}),
+        (BodyLogMode.OMIT, "secret", "<omitted>"),
+        (BodyLogMode.PREVIEW, "x" * 100, "'xxxxxxxxxxxx...xxxxxxxxxxxxx' (100 chars)"),
+        (BodyLogMode.PREVIEW, b"abc", "b'abc' (3 bytes)"),
+        (BodyLogMode.PREVIEW, {"a": 1, "b": 2}, "{'a': 1, 'b': 2} (2 items)"),
+        (BodyLogMode.PREVIEW, 42, "42"),
+        (
+            BodyLogMode.DIGEST,
+            "abc",
+            "<3 bytes, sha256:ba7816bf8f01cfea>",
+        ),
+        (
+            BodyLogMode.DIGEST,
+            b"abc",
+            "<3 bytes, sha256:ba7816bf8f01cfea>",
+        ),
+        (BodyLogMode.DIGEST, {"b": 1, "a": 2}, "<16 bytes, sha256:21501dbaf73f5223>"),
+        (BodyLogMode.DIGEST, iter([b"chunk"]), "<list_iterator>"),
+    ],
+)
+def test_log_policy_renders_bodies(mode, body, expected):
+    policy = LogPolicy(body_mode=mode, preview_length=30)
+    assert policy.body(body) == expected
+    assert policy.body(None) is None
+
+
+def test_channel_logs_with_policy(caplog: pytest.LogCaptureFixture):
+    policy = LogPolicy(body_mode=BodyLogMode.DIGEST)
+    with patch("requests.Session.send", return_value=Mock(status_code=200)):
+        channel = Channel(url=URL, log_policy=policy)
+        with caplog.at_level(logging.INFO, logger="hcc.request"):
+            channel.put(data="abc", headers={"Authorization": "Bearer secret"})
+    assert caplog.messages[0] == (
+        f"PUT request: channel: {id(channel)}, "
+        "data: <3 bytes, sha256:ba7816bf8f01cfea>, json: None, "
+        "headers: {'Authorization': '[REDACTED]'}"
+    )
+
+
+def test_disabled_logging_does_not_render_bodies(caplog: pytest.LogCaptureFixture):
+    body = Probe(key="value")
+    Probe.renders = 0
+    with patch("requests.Session.send", return_value=Mock(status_code=200)):
+        channel = Channel(url=URL)
+        with patch.object(logging.getLogger("hcc.request"), "level", logging.WARNING):
+            channel.post(json=body)
+        assert Probe.renders == 0
+        with caplog.at_level(logging.INFO, logger="hcc.request"):
+            channel.post(json=body)
+    assert Probe.renders > 0
+    assert caplog.messages[0].startswith("POST request")
+
+
+@pytest.mark.parametrize("method", ["get", "post", "put", "delete", "patch"])
+def test_async_channel_logs_requests(method: str, caplog: pytest.LogCaptureFixture):
+    transport = Mock()
+    transport.request = AsyncMock(return_value=Mock(status_code=200))
+    channel = AsyncChannel(
+        url=URL,
+        transport=transport,
+        log_policy=LogPolicy(body_mode=BodyLogMode.OMIT),
+    )
+    arguments = {} if method in ("get", "delete") else {"data": "secret"}
+    with caplog.at_level(logging.INFO, logger="hcc.request"):
+        asyncio.run(getattr(channel, method)(headers={"Cookie": "c"}, **arguments))
+    assert caplog.messages[0].startswith(f"{method.upper()} request")
+    assert "'Cookie': '[REDACTED]'" in caplog.messages[0]
+    assert "secret" not in caplog.messages[0]
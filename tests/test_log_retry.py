@@ -86,3 +86,23 @@ class TestLogRetry(TestCase):
             expected_log = "INFO:hcc.retry:Attempt 1/1 returning with: Error"
             self.assertEqual(len(context.output), 1)
             self.assertEqual(context.output[0], expected_log)
+
+    def test_logging_on_retry_function_without_max_retry_count(self):
+        mock_func = Mock()
+        mock_func.side_effect = ["Error", "Success"]
+
+        with self.assertLogs("hcc.retry", level="INFO") as context:
+            _ = retry_function(
+                func=mock_func,
+                is_retry_needed=lambda x: x != "Success",
+                max_retry_count=None,
+                retry_policy=None,
+            )
+
+            self.assertEqual(
+                context.output,
+                [
+                    "INFO:hcc.retry:Attempt 1/inf failed with error result: Error",
+                    "INFO:hcc.retry:Attempt 2/inf returning with: Success",
+                ],
+            )
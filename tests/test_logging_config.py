@@ -0,0 +1,74 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+from hcc import configure_logging
+
+PACKAGE_ROOT = str(Path(__file__).resolve().parents[1])
+# Budget of the cumulative import time of the package, including requests and asyncio.
+IMPORT_TIME_BUDGET_US = 1_000_000
+
+
+def run_python(code: str, cwd: Path, *options: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": PACKAGE_ROOT}
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_does_not_configure_logging(tmp_path: Path):
+    code = (
+        "import logging, sys\n"
+        "handlers = list(logging.getLogger().handlers)\n"
+        "import hcc\n"
+        "assert 'yaml' not in sys.modules, 'yaml imported'\n"
+        "assert logging.getLogger().handlers == handlers, 'root logger changed'\n"
+    )
+    run_python(code, tmp_path)
+
+
+def test_import_time_budget(tmp_path: Path):
+    result = run_python("import hcc", tmp_path, "-X", "importtime")
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        _, total, name = line.split("|")
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total)
+    assert cumulative["hcc"] < IMPORT_TIME_BUDGET_US
+
+
+def test_configure_logging_with_default_config():
+    with patch("hcc.logging_config.logging.config.dictConfig") as dict_config:
+        configure_logging()
+    config = dict_config.call_args.args[0]
+    assert config["disable_existing_loggers"] is False
+    assert {"hcc", "hcc.request", "hcc.retry"} <= set(config["loggers"])
+
+
+def test_configure_logging_with_custom_config(tmp_path: Path):
+    path = tmp_path / "logging.yaml"
+    path.write_text(
+        "version: 1\n"
+        "disable_existing_loggers: False\n"
+        "loggers:\n"
+        "  hcc.pool:\n"
+        "    level: ERROR\n",
+        encoding="utf-8",
+    )
+    logger = logging.getLogger("hcc.pool")
+    level = logger.level
+    try:
+        configure_logging(str(path))
+        assert logger.level == logging.ERROR
+    finally:
+        logger.setLevel(level)
@@ -0,0 +1,296 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import json
+import logging
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from hcc import (
+    AsyncChannel,
+    Channel,
+    Histogram,
+    Metrics,
+    RateLimiter,
+    RetryBudget,
+    RetryBudgetExhaustedError,
+    RetryPolicy,
+    StreamTransport,
+    async_retry_function,
+    retry_function,
+)
+from hcc.deadline import Deadline
+from hcc.metrics import error_class
+from hcc.session_pool import connection_usage, create_session
+from .test_utilities import make_response
+
+URL = "https://mockserver.com/metrics"
+
+
+def is_retry_needed(response: requests.Response) -> bool:
+    return response.status_code != 200
+
+
+def test_histogram_percentiles():
+    histogram = Histogram([0.001, 0.01, 0.1])
+    assert histogram.percentile(0.5) == 0.0
+    assert histogram.snapshot()["min"] == 0.0
+    for value in [0.0005] * 50 + [0.005] * 40 + [0.05] * 9 + [2.0]:
+        histogram.record(value)
+    assert histogram.percentile(0.5) == 0.001
+    assert histogram.percentile(0.9) == 0.01
+    assert histogram.percentile(0.99) == 0.1
+    # The overflow bucket is capped by the maximum.
+    assert histogram.percentile(1.0) == 2.0
+    assert histogram.percentile(0.0) == 0.001
+    snapshot = histogram.snapshot()
+    assert (snapshot["count"], snapshot["min"], snapshot["max"]) == (100, 0.0005, 2.0)
+    assert snapshot["sum"] == pytest.approx(2.675)
+    assert snapshot["p999"] == 2.0
+    assert repr(histogram) == "Histogram(count=100, p50=0.001000)"
+
+
+def test_histogram_percentile_is_capped_by_the_maximum():
+    histogram = Histogram()
+    histogram.record(0.0123)
+    assert histogram.percentile(0.5) == 0.0123
+    assert 0.0123 <= histogram.bounds[histogram.counts.index(1)] < 0.0123 * 1.2
+
+
+def test_error_class():
+    assert error_class(requests.ConnectionError()) == "ConnectionError"
+    assert error_class(None, make_response(503)) == "status 503"
+    assert error_class(None, "error") == "result"
+
+
+def test_retry_loop_records_attempts_retries_and_sleeps():
+    metrics = Metrics()
+    func = Mock(
+        side_effect=[requests.ConnectionError(), make_response(503), make_response()]
+    )
+    with patch("hcc.retry.time.sleep") as mock_sleep:
+        retry_function(
+            func=func,
+            is_retry_needed=is_retry_needed,
+            retry_policy=RetryPolicy.LINEAR,
+            base_delay=100,
+            rate_limiter=RateLimiter(rate=1000.0),
+            metrics=metrics,
+        )
+    snapshot = metrics.snapshot()
+    assert snapshot["attempts"] == 3
+    assert snapshot["attempts_inflight"] == 0
+    assert snapshot["retries"] == {"exception": 1, "result": 1}
+    assert snapshot["errors"] == {"ConnectionError": 1, "status 503": 1}
+    assert snapshot["sleep_seconds"]["backoff"] == pytest.approx(0.2)
+    assert 0 < snapshot["sleep_seconds"]["rate_limit"] <= 0.003
+    assert snapshot["attempt_latency"]["count"] == 3
+    assert mock_sleep.call_count == 4
+    assert json.loads(json.dumps(snapshot)) == snapshot
+
+
+def test_retry_loop_records_attempts_which_are_not_retried():
+    metrics = Metrics()
+    with pytest.raises(requests.Timeout):
+        retry_function(
+            func=Mock(side_effect=requests.Timeout),
+            is_retry_needed=is_retry_needed,
+            max_retry_count=1,
+            metrics=metrics,
+        )
+    retry_function(
+        func=Mock(return_value=make_response(500)),
+        is_retry_needed=is_retry_needed,
+        max_retry_count=1,
+        metrics=metrics,
+    )
+    budget = RetryBudget(ratio=0.0, min_retries_per_second=0.0)
+    assert budget.try_acquire()
+    for func in (
+        Mock(return_value=make_response(502)),
+        Mock(side_effect=requests.ConnectionError),
+    ):
+        with pytest.raises(RetryBudgetExhaustedError):
+            retry_function(
+                func=func,
+                is_retry_needed=is_retry_needed,
+                retry_policy=None,
+                retry_budget=budget,
+                metrics=metrics,
+            )
+    # The delay of the retry does not fit in the deadline.
+    retry_function(
+        func=Mock(return_value=make_response(504)),
+        is_retry_needed=is_retry_needed,
+        retry_policy=RetryPolicy.LINEAR,
+        base_delay=1000,
+        deadline=Deadline(0.5),
+        metrics=metrics,
+    )
+    with pytest.raises(requests.ReadTimeout):
+        retry_function(
+            func=Mock(side_effect=requests.ReadTimeout),
+            is_retry_needed=is_retry_needed,
+            retry_policy=RetryPolicy.LINEAR,
+            base_delay=1000,
+            deadline=Deadline(0.5),
+            metrics=metrics,
+        )
+    with pytest.raises(KeyboardInterrupt):
+        retry_function(
+            func=Mock(side_effect=KeyboardInterrupt),
+            is_retry_needed=is_retry_needed,
+            metrics=metrics,
+        )
+    snapshot = metrics.snapshot()
+    assert snapshot["retries"] == {"exception": 0, "result": 0}
+    assert snapshot["attempts_inflight"] == 0
+    assert snapshot["errors"] == {
+        "Timeout": 1,
+        "status 500": 1,
+        "status 502": 1,
+        "ConnectionError": 1,
+        "status 504": 1,
+        "ReadTimeout": 1,
+        "KeyboardInterrupt": 1,
+    }
+
+
+def test_metrics_call_records_calls():
+    metrics = Metrics()
+    assert metrics.call(make_response, is_retry_needed).status_code == 200
+    metrics.call(Mock(return_value=make_response(503)), is_retry_needed)
+    with pytest.raises(ValueError):
+        metrics.call(Mock(side_effect=ValueError), is_retry_needed)
+
+    async def call():
+        await metrics.async_call(
+            AsyncMock(return_value=make_response()), is_retry_needed
+        )
+        with pytest.raises(asyncio.CancelledError):
+            await metrics.async_call(
+                AsyncMock(side_effect=asyncio.CancelledError), is_retry_needed
+            )
+
+    asyncio.run(call())
+    snapshot = metrics.snapshot()
+    assert (
+        snapshot["calls"],
+        snapshot["calls_failed"],
+        snapshot["calls_inflight"],
+    ) == (
+        5,
+        3,
+        0,
+    )
+    assert snapshot["call_latency"]["count"] == 5
+    assert repr(metrics) == "Metrics(calls=5, attempts=0)"
+    metrics.reset()
+    assert metrics.snapshot()["calls"] == 0
+
+
+def test_metrics_are_exported_once_per_interval(caplog):
+    exported = []
+    clock = Mock(return_value=100.0)
+    with patch("hcc.metrics.time.monotonic", clock):
+        metrics = Metrics(exporter=exported.append, export_interval=10.0)
+        metrics.call(make_response, is_retry_needed)
+        clock.return_value = 110.0
+        metrics.call(make_response, is_retry_needed)
+        metrics.call(make_response, is_retry_needed)
+    assert [snapshot["calls"] for snapshot in exported] == [2]
+    metrics.exporter = Mock(side_effect=OSError("down"))
+    with caplog.at_level(logging.ERROR, logger="hcc.metrics"):
+        metrics.export()
+    assert "Metrics export failed" in caplog.text
+    Metrics().export()
+
+
+def test_gauges_are_summed_and_removed():
+    metrics = Metrics()
+    first, second = Mock(return_value=2), Mock(return_value=3)
+    metrics.add_gauge("pool_in_use", first)
+    metrics.add_gauge("pool_in_use", second)
+    assert metrics.snapshot()["gauges"] == {"pool_in_use": 5}
+    metrics.remove_gauge("pool_in_use", first)
+    metrics.remove_gauge("pool_in_use", first)
+    metrics.remove_gauge("missing", first)
+    assert metrics.snapshot()["gauges"] == {"pool_in_use": 3}
+
+
+def test_connection_usage():
+    session = create_session(pool_maxsize=4)
+    assert connection_usage(session) == (0, 0)
+    pool = session.get_adapter("http://localhost").poolmanager.connection_from_url(
+        "http://localhost:1"
+    )
+    connection = pool._get_conn()  # pylint: disable=protected-access
+    assert connection_usage(session) == (1, 4)
+    pool._put_conn(connection)  # pylint: disable=protected-access
+    assert connection_usage(session) == (0, 4)
+    pool.close()
+    assert connection_usage(session) == (0, 0)
+    session.mount("mock://", Mock(spec=BaseAdapter))
+    assert connection_usage(session) == (0, 0)
+    session.close()
+
+
+def test_channel_records_calls_and_pool_gauges():
+    metrics = Metrics()
+    with patch(
+        "hcc.channel.requests.Session.request",
+        side_effect=[make_response(503), make_response()],
+    ):
+        with Channel(url=URL, metrics=metrics) as channel:
+            assert channel.get().status_code == 200
+            snapshot = metrics.snapshot()
+    assert snapshot["gauges"] == {"pool_in_use": 0, "pool_capacity": 0}
+    assert (snapshot["calls"], snapshot["attempts"]) == (1, 2)
+    assert snapshot["retries"]["result"] == 1
+    assert metrics.snapshot()["gauges"] == {"pool_in_use": 0, "pool_capacity": 0}
+    assert not any(metrics._gauges.values())  # pylint: disable=protected-access
+
+
+def test_async_channel_records_calls_and_pool_gauges():
+    metrics = Metrics()
+    transport = Mock()
+    transport.request = AsyncMock(return_value=make_response(404))
+    stream_transport = StreamTransport()
+
+    async def call():
+        channel = AsyncChannel(
+            url=URL, metrics=metrics, transport=transport, max_retry_count=2
+        )
+        other = AsyncChannel(url=URL, metrics=metrics, transport=stream_transport)
+        await channel.get()
+        snapshot = metrics.snapshot()
+        await channel.close()
+        await other.close()
+        return snapshot
+
+    snapshot = asyncio.run(call())
+    assert snapshot["gauges"] == {"pool_idle": 0}
+    assert (snapshot["calls"], snapshot["calls_failed"], snapshot["attempts"]) == (
+        1,
+        1,
+        2,
+    )
+    assert snapshot["errors"] == {"status 404": 2}
+    assert stream_transport.idle_connections == 0
+
+
+def test_async_retry_loop_records_interrupted_attempts():
+    metrics = Metrics()
+
+    async def call():
+        with pytest.raises(asyncio.CancelledError):
+            await async_retry_function(
+                func=AsyncMock(side_effect=asyncio.CancelledError),
+                is_retry_needed=is_retry_needed,
+                metrics=metrics,
+            )
+
+    asyncio.run(call())
+    assert metrics.snapshot()["errors"] == {"CancelledError": 1}
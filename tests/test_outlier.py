@@ -0,0 +1,189 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+import requests
+from hcc import (
+    AsyncChannel,
+    BalancingStrategy,
+    Channel,
+    LoadBalancer,
+    OutlierDetector,
+)
+from hcc.outlier import is_failure
+from .test_utilities import make_response
+
+URLS = ["http://10.0.0.1", "http://10.0.0.2", "http://10.0.0.3", "http://10.0.0.4"]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def fixture_clock():
+    clock = Clock()
+    with patch("hcc.balancer.time.monotonic", side_effect=clock.monotonic):
+        yield clock
+
+
+def make_balancer(**kwargs) -> LoadBalancer:
+    return LoadBalancer(
+        URLS,
+        strategy=BalancingStrategy.ROUND_ROBIN,
+        outlier_detector=OutlierDetector(**kwargs),
+    )
+
+
+def send_to(balancer: LoadBalancer, url: str, status_code: int = 200) -> None:
+    endpoint = next(e for e in balancer.endpoints if e.url == url)
+    balancer.call(
+        "",
+        Mock(return_value=make_response(status_code)),
+        [e for e in balancer.endpoints if e is not endpoint],
+    )
+
+
+def test_is_failure():
+    assert is_failure(make_response(503))
+    assert not is_failure(make_response(404))
+    assert not is_failure(None)
+    assert repr(OutlierDetector()) == (
+        "OutlierDetector(consecutive_failures=5, failure_rate_threshold=0.5, "
+        "latency_factor=3.0)"
+    )
+
+
+def test_consecutive_failures_eject_with_exponential_time(clock: Clock):
+    balancer = make_balancer(
+        consecutive_failures=2, base_ejection_time=10.0, max_ejection_time=25.0
+    )
+    sick = balancer.endpoints[0]
+    send_to(balancer, sick.url, 500)
+    send_to(balancer, sick.url, 200)
+    send_to(balancer, sick.url, 500)
+    assert not sick.is_ejected(clock.now)
+    send_to(balancer, sick.url, 500)
+    assert sick.ejected_until == 1010.0
+    assert sick not in {balancer.pick() for _ in range(6)}
+    clock.now = 1010.0
+    for expected in (1030.0, 1055.0):
+        send_to(balancer, sick.url, 500)
+        send_to(balancer, sick.url, 500)
+        assert sick.ejected_until == expected
+        clock.now = expected
+    # The ejection time is reset once the endpoint has stayed in rotation for the cap.
+    clock.now += 25.0
+    send_to(balancer, sick.url, 500)
+    send_to(balancer, sick.url, 500)
+    assert (sick.ejections, sick.ejected_until) == (1, clock.now + 10.0)
+
+
+def test_failure_rate_ejects(clock: Clock):
+    balancer = make_balancer(minimum_requests=4, window_size=4, latency_factor=None)
+    sick = balancer.endpoints[1]
+    for status_code in (500, 200, 200, 200, 500):
+        send_to(balancer, sick.url, status_code)
+    assert not sick.is_ejected(clock.now)
+    send_to(balancer, sick.url, 500)
+    assert sick.is_ejected(clock.now)
+    assert len(sick.outcomes) == 0
+
+
+def test_latency_outlier_ejects(clock: Clock):
+    balancer = make_balancer(minimum_requests=2, window_size=2)
+    for endpoint, latency in zip(balancer.endpoints, (0.1, 0.12, 0.5, 0.0)):
+        endpoint.latency = latency
+    endpoint = balancer.endpoints[2]
+    endpoint.outcomes.extend([False, False])
+    balancer.outlier_detector.record(  # type: ignore[union-attr]
+        endpoint, balancer.endpoints, False, clock.now
+    )
+    assert endpoint.is_ejected(clock.now)
+    fast = balancer.endpoints[0]
+    fast.outcomes.extend([False, False])
+    balancer.outlier_detector.record(  # type: ignore[union-attr]
+        fast, balancer.endpoints, False, clock.now
+    )
+    assert not fast.is_ejected(clock.now)
+
+
+def test_max_ejection_percent_keeps_endpoints_in_rotation(clock: Clock):
+    balancer = make_balancer(consecutive_failures=1, max_ejection_percent=50.0)
+    for endpoint in balancer.endpoints:
+        send_to(balancer, endpoint.url, 500)
+    ejected = [e for e in balancer.endpoints if e.is_ejected(clock.now)]
+    assert ejected == balancer.endpoints[:2]
+    assert {balancer.pick() for _ in range(4)} == set(balancer.endpoints[2:])
+
+
+def test_all_ejected_endpoints_stay_in_rotation(clock: Clock):
+    balancer = make_balancer(consecutive_failures=1, max_ejection_percent=100.0)
+    for endpoint in balancer.endpoints:
+        send_to(balancer, endpoint.url, 503)
+    assert all(e.is_ejected(clock.now) for e in balancer.endpoints)
+    assert {balancer.pick() for _ in range(4)} == set(balancer.endpoints)
+    # An attempt finishing on an ejected endpoint does not extend its ejection.
+    send_to(balancer, URLS[0], 503)
+    assert balancer.endpoints[0].ejected_until == clock.now + 30.0
+
+
+def test_exceptions_fail_and_cancellations_do_not_count(clock: Clock):
+    balancer = make_balancer(consecutive_failures=2)
+    sick = balancer.endpoints[0]
+
+    async def call(error):
+        await balancer.async_call("", AsyncMock(side_effect=error), [])
+
+    with pytest.raises(requests.Timeout):
+        asyncio.run(call(requests.Timeout))
+    with pytest.raises(KeyboardInterrupt):
+        balancer.call("", Mock(side_effect=KeyboardInterrupt), balancer.endpoints[1:])
+    assert sick.consecutive_failures == 1
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(call(asyncio.CancelledError))
+    assert [e.outstanding for e in balancer.endpoints] == [0, 0, 0, 0]
+    assert sick.consecutive_failures == 1 and not sick.is_ejected(clock.now)
+
+
+def test_channel_stops_hitting_the_sick_replica(clock: Clock):
+    balancer = make_balancer(consecutive_failures=1)
+    responses = {url: make_response(200) for url in URLS}
+    responses[URLS[0] + "/config"] = make_response(503)
+
+    def request(_, url, **__):
+        return responses.get(url, make_response(200))
+
+    with patch(
+        "hcc.channel.requests.Session.request", side_effect=request
+    ) as mock_request:
+        with Channel(url="/config", balancer=balancer) as channel:
+            for _ in range(8):
+                assert channel.get().status_code == 200
+    urls = [c.args[1] for c in mock_request.call_args_list]
+    assert urls.count(URLS[0] + "/config") == 1
+    assert len(urls) == 9
+
+
+def test_async_channel_stops_hitting_the_sick_replica(clock: Clock):
+    balancer = make_balancer(consecutive_failures=1)
+    transport = Mock()
+    transport.request = AsyncMock(
+        side_effect=[requests.ConnectionError()] + [make_response()] * 4
+    )
+
+    async def call():
+        channel = AsyncChannel(url="/config", balancer=balancer, transport=transport)
+        for _ in range(4):
+            await channel.get()
+
+    asyncio.run(call())
+    urls = [c.args[1] for c in transport.request.call_args_list]
+    assert urls.count(URLS[0] + "/config") == 1
+    assert balancer.endpoints[0].is_ejected(clock.now)
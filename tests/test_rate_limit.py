@@ -0,0 +1,221 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+from hcc import (
+    AsyncChannel,
+    Channel,
+    CircuitBreaker,
+    CircuitState,
+    HccError,
+    RateLimiter,
+    RateLimitExceededError,
+    retry_function,
+)
+from hcc.deadline import Deadline
+from .test_utilities import make_response
+
+URL = "https://mockserver.com/rate"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture(name="clock")
+def fixture_clock():
+    clock = Clock()
+    with (
+        patch("hcc.rate_limit.time.monotonic", side_effect=clock.monotonic),
+        patch("hcc.deadline.time.monotonic", side_effect=clock.monotonic),
+        patch("hcc.rate_limit.time.sleep", side_effect=clock.sleep),
+        patch("hcc.retry.time.sleep", side_effect=clock.sleep),
+        patch("hcc.rate_limit.asyncio.sleep", side_effect=clock.async_sleep),
+        patch("hcc.retry.asyncio.sleep", side_effect=clock.async_sleep),
+    ):
+        yield clock
+
+
+def test_reserve_spaces_requests_at_the_rate(clock: Clock):
+    limiter = RateLimiter(rate=10.0)
+    assert [limiter.reserve() for _ in range(3)] == pytest.approx([0.0, 0.1, 0.2])
+    clock.sleep(1.0)
+    assert limiter.reserve() == 0.0
+    assert limiter.throttled == 2
+    assert repr(limiter) == "RateLimiter(rate=10.0, burst=1, throttled=2, rejected=0)"
+
+
+def test_burst_is_allowed_after_idle_period(clock: Clock):
+    limiter = RateLimiter(rate=10.0, burst=3)
+    assert all(limiter.try_acquire() for _ in range(3))
+    assert not limiter.try_acquire()
+    clock.sleep(0.1)
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    # An idle period refills the burst, but not beyond it.
+    clock.sleep(10.0)
+    assert sum(limiter.try_acquire() for _ in range(5)) == 3
+    assert limiter.rejected == 4
+
+
+def test_acquire_waits_for_the_slot(clock: Clock):
+    limiter = RateLimiter(rate=4.0, timeout=0.3)
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.now == pytest.approx(100.5)
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        limiter.reserve(0.0)
+    assert isinstance(exc_info.value, HccError)
+    assert exc_info.value.retry_after == pytest.approx(0.25)
+    # A rejected request does not take a slot.
+    assert limiter.reserve() == pytest.approx(0.25)
+
+
+def test_async_acquire_waits_for_the_slot(clock: Clock):
+    limiter = RateLimiter(rate=4.0)
+
+    async def call():
+        for _ in range(3):
+            await limiter.async_acquire()
+
+    asyncio.run(call())
+    assert clock.now == pytest.approx(100.5)
+    with pytest.raises(RateLimitExceededError):
+        asyncio.run(limiter.async_acquire(timeout=0.1))
+
+
+def test_limiter_is_precise_under_contention():
+    limiter = RateLimiter(rate=20000.0, burst=1)
+    start = time.monotonic()
+
+    def worker():
+        for _ in range(250):
+            limiter.acquire()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 2000 requests at 20000/s take 0.1 seconds at least.
+    assert time.monotonic() - start >= 1999 / 20000.0
+    assert limiter.throttled >= 1000
+
+
+def test_retries_wait_for_the_limiter(clock: Clock):
+    limiter = RateLimiter(rate=2.0)
+    func = Mock(side_effect=[make_response(503), make_response(200)])
+    response = retry_function(
+        func=func,
+        is_retry_needed=lambda response: response.status_code != 200,
+        max_retry_count=3,
+        retry_policy=None,
+        rate_limiter=limiter,
+    )
+    assert response.status_code == 200
+    assert clock.now == pytest.approx(100.5)
+
+
+def test_deadline_bounds_the_wait(clock: Clock):
+    limiter = RateLimiter(rate=1.0)
+    limiter.reserve()
+    with pytest.raises(RateLimitExceededError):
+        retry_function(
+            func=Mock(),
+            is_retry_needed=lambda response: False,
+            rate_limiter=limiter,
+            deadline=Deadline(0.5),
+        )
+    limiter = RateLimiter(rate=1.0, timeout=2.0)
+    limiter.reserve()
+    retry_function(
+        func=Mock(),
+        is_retry_needed=lambda response: False,
+        rate_limiter=limiter,
+        deadline=Deadline(1.5),
+    )
+    assert clock.now == pytest.approx(101.0)
+
+
+def test_wait_leaves_time_for_the_request(clock: Clock):
+    limiter = RateLimiter(rate=1.0)
+    limiter.reserve()
+    func = Mock()
+    with pytest.raises(RateLimitExceededError):
+        retry_function(
+            func=func,
+            is_retry_needed=lambda response: False,
+            rate_limiter=limiter,
+            deadline=Deadline(1.0),
+        )
+    func.assert_not_called()
+    assert clock.now == 100.0
+
+
+def test_channels_share_the_limiter(clock: Clock):
+    limiter = RateLimiter(rate=10.0, burst=2, timeout=0.0)
+    with patch(
+        "hcc.channel.requests.Session.request", return_value=make_response()
+    ) as mock_request:
+        first = Channel(url=URL, rate_limiter=limiter)
+        second = Channel(url=URL + "/other", rate_limiter=limiter)
+        first.get()
+        second.post(data={"a": 1})
+        with pytest.raises(RateLimitExceededError):
+            first.get()
+    assert mock_request.call_count == 2
+    assert clock.now == 100.0
+
+
+def test_async_channel_waits_for_the_limiter(clock: Clock):
+    limiter = RateLimiter(rate=5.0)
+    transport = Mock()
+    transport.request = AsyncMock(return_value=make_response())
+
+    async def call():
+        channel = AsyncChannel(url=URL, rate_limiter=limiter, transport=transport)
+        for _ in range(3):
+            await channel.get()
+
+    asyncio.run(call())
+    assert transport.request.call_count == 3
+    assert clock.now == pytest.approx(100.4)
+
+
+def test_rejected_attempt_releases_the_half_open_probe(clock: Clock):
+    breaker = CircuitBreaker(minimum_calls=1, cooldown=0.0)
+    breaker.record_failure()
+    limiter = RateLimiter(rate=1.0, timeout=0.0)
+    limiter.reserve()
+    func = Mock(return_value=make_response())
+    for _ in range(2):
+        with pytest.raises(RateLimitExceededError):
+            retry_function(
+                func=func,
+                is_retry_needed=lambda response: False,
+                circuit_breaker=breaker,
+                rate_limiter=limiter,
+            )
+    clock.sleep(1.0)
+    retry_function(
+        func=func,
+        is_retry_needed=lambda response: False,
+        circuit_breaker=breaker,
+        rate_limiter=limiter,
+    )
+    assert func.call_count == 1
+    assert breaker.state == CircuitState.CLOSED
@@ -0,0 +1,175 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+from functools import partial
+import io
+import mmap
+import os
+from typing import Any, Iterator, List
+from unittest.mock import AsyncMock, Mock, patch
+import requests
+from hcc import AsyncChannel, Channel, HedgePolicy
+from hcc.request_body import RequestBody, is_streamed
+from .test_utilities import make_response
+
+URL = "https://mockserver.com/upload"
+
+
+def generate() -> Iterator[bytes]:
+    yield b"first,"
+    yield b"second"
+
+
+class Recorder:
+    """Read the body of every sent request like the adapter would."""
+
+    def __init__(self, *status_codes: int):
+        self.status_codes = list(status_codes)
+        self.bodies: List[bytes] = []
+        self.headers: List[Any] = []
+
+    def send(self, request: requests.PreparedRequest, **_: Any) -> requests.Response:
+        body: Any = request.body
+        if hasattr(body, "read"):
+            body = body.read()
+        elif body is not None and not isinstance(body, bytes):
+            body = b"".join(body)
+        self.bodies.append(body)
+        self.headers.append(request.headers)
+        return make_response(self.status_codes.pop(0))
+
+
+def test_is_streamed():
+    assert is_streamed(io.BytesIO())
+    assert is_streamed(generate())
+    assert not is_streamed(b"body")
+    assert not is_streamed([b"first", b"second"])
+    assert not is_streamed({"key": "value"})
+    assert not is_streamed(None)
+
+
+def test_seekable_file_is_rewound_before_every_attempt():
+    data = io.BytesIO(b"header|payload")
+    data.seek(7)
+    recorder = Recorder(503, 503, 200)
+    with patch("requests.Session.send", side_effect=recorder.send):
+        with Channel(url=URL) as channel:
+            assert channel.post(data=data).status_code == 200
+    assert recorder.bodies == [b"payload"] * 3
+    assert recorder.headers[0]["Content-Length"] == "7"
+
+
+def test_mmap_is_sent_and_rewound():
+    with mmap.mmap(-1, 8) as data:
+        data.write(b"12345678")
+        data.seek(0)
+        recorder = Recorder(500, 200)
+        with patch("requests.Session.send", side_effect=recorder.send):
+            with Channel(url=URL) as channel:
+                channel.put(data=data)
+    assert recorder.bodies == [b"12345678"] * 2
+    assert recorder.headers[1]["Content-Length"] == "8"
+
+
+def test_generator_is_spooled_when_it_can_be_retried():
+    recorder = Recorder(503, 201)
+    with patch("requests.Session.send", side_effect=recorder.send):
+        with Channel(url=URL) as channel:
+            assert channel.patch(data=generate()).status_code == 201
+    assert recorder.bodies == [b"first,second"] * 2
+    assert recorder.headers[0]["Content-Length"] == "12"
+
+
+def test_generator_is_streamed_when_it_cannot_be_retried():
+    recorder = Recorder(503)
+    with patch("requests.Session.send", side_effect=recorder.send):
+        with Channel(url=URL, max_retry_count=1) as channel:
+            assert channel.post(data=generate()).status_code == 503
+    assert recorder.bodies == [b"first,second"]
+    assert recorder.headers[0]["Transfer-Encoding"] == "chunked"
+
+
+def test_spool_rolls_over_to_a_temporary_file():
+    body = RequestBody(
+        (chunk for chunk in ["día,", "noche"]), replay=True, spool_memory_size=4
+    )
+    assert body.spooled and not isinstance(body.data, io.BytesIO)
+    assert body.data.read() == "día,noche".encode()
+    body.rewind()
+    assert body.data.read(3) == b"d\xc3\xad"
+    assert repr(body) == "RequestBody(streamed=True, spooled=True)"
+    body.close()
+    assert body.data.closed
+
+
+def test_source_beyond_the_max_spool_size_is_sent_once():
+    body = RequestBody(
+        (chunk for chunk in [b"1234", "5678", b"90"]), replay=True, max_spool_size=6
+    )
+    assert body.streamed and not body.replayable
+    assert b"".join(body.data) == b"1234567890"
+    body.close()
+    assert RequestBody(generate(), replay=True).replayable
+    assert not RequestBody(generate(), replay=False).replayable
+
+
+def test_channel_does_not_retry_a_body_beyond_the_max_spool_size():
+    recorder = Recorder(503, 200)
+    with (
+        patch("requests.Session.send", side_effect=recorder.send),
+        patch(
+            "hcc.request_preparation.RequestBody",
+            partial(RequestBody, max_spool_size=4),
+        ),
+    ):
+        with Channel(url=URL) as channel:
+            assert channel.post(data=generate()).status_code == 503
+    assert recorder.bodies == [b"first,second"]
+    assert recorder.headers[0]["Transfer-Encoding"] == "chunked"
+
+
+def test_pipe_is_spooled():
+    read_end, write_end = os.pipe()
+    os.write(write_end, b"piped")
+    os.close(write_end)
+    with open(read_end, "rb", buffering=0) as pipe:
+        body = RequestBody(pipe, replay=True)
+        assert body.spooled
+        assert body.data.read() == b"piped"
+    body.rewind()
+    assert body.data.read() == b"piped"
+    body.close()
+    body = RequestBody(b"body", replay=True)
+    body.rewind()
+    body.close()
+    assert body.data == b"body"
+    assert repr(body) == "RequestBody(streamed=False, spooled=False)"
+
+
+def test_file_bodies_are_not_hedged():
+    recorder = Recorder(200)
+    with patch("requests.Session.send", side_effect=recorder.send) as mock_send:
+        with Channel(url=URL, hedging=HedgePolicy(delay=0.0)) as channel:
+            channel.put(data=io.BytesIO(b"body"))
+    assert mock_send.call_count == 1
+
+
+def test_async_channel_replays_streamed_bodies():
+    bodies = []
+
+    async def request(*_: Any, data: Any = None, **__: Any) -> requests.Response:
+        bodies.append(data.read())
+        return make_response(503 if len(bodies) == 1 else 200)
+
+    transport = Mock()
+    transport.request = AsyncMock(side_effect=request)
+    hedging = HedgePolicy(delay=0.0, methods=["PUT"])
+
+    async def call():
+        channel = AsyncChannel(url=URL, transport=transport, hedging=hedging)
+        await channel.post(data=generate())
+        await channel.put(data=io.BytesIO(b"file"))
+
+    asyncio.run(call())
+    assert bodies == [b"first,second", b"first,second", b"file"]
@@ -0,0 +1,54 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import gzip
+import io
+import json
+from typing import Any, Dict
+from hcc import Metrics, RequestCompression, StdlibJsonCodec
+from hcc.request_preparation import prepare_body, record_bytes
+
+
+def test_prepare_body_encodes_and_compresses_json_once() -> None:
+    kwargs: Dict[str, Any] = {"json": {"key": "x" * 64}, "headers": {"X-Id": "1"}}
+    prepared, body = prepare_body(
+        kwargs,
+        json_codec=StdlibJsonCodec(),
+        compression=RequestCompression(min_size=16),
+        replay=True,
+    )
+    assert prepared is not None
+    assert kwargs["json"] is None
+    assert kwargs["data"] is prepared.data
+    assert json.loads(gzip.decompress(kwargs["data"])) == {"key": "x" * 64}
+    assert kwargs["headers"]["Content-Encoding"] == "gzip"
+    assert kwargs["headers"]["Content-Type"] == "application/json"
+    assert kwargs["headers"]["X-Id"] == "1"
+    assert not body.streamed
+
+
+def test_prepare_body_wraps_a_streamed_body() -> None:
+    file = io.BytesIO(b"payload")
+    kwargs: Dict[str, Any] = {"data": file}
+    prepared, body = prepare_body(
+        kwargs, json_codec=None, compression=None, replay=True
+    )
+    assert prepared is None
+    assert body.streamed
+    assert kwargs["data"] is body.data
+    body.close()
+
+
+def test_record_bytes() -> None:
+    kwargs: Dict[str, Any] = {"data": b"x" * 64}
+    prepared, _ = prepare_body(
+        kwargs,
+        json_codec=None,
+        compression=RequestCompression(min_size=16),
+        replay=False,
+    )
+    metrics = Metrics()
+    record_bytes(metrics, prepared, None)
+    assert metrics.bytes["sent"] == {"wire": len(kwargs["data"]), "logical": 64}
+    assert metrics.bytes["received"] == {"wire": 0, "logical": 0}
+    record_bytes(None, prepared, None)
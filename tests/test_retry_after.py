@@ -0,0 +1,163 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+from requests.structures import CaseInsensitiveDict
+from hcc import (
+    AsyncChannel,
+    Channel,
+    async_retry_function,
+    parse_retry_after,
+    retry_after_hint,
+    retry_function,
+    RetryPolicy,
+)
+
+URL = "https://mockserver.com/throttled"
+DATE = "Wed, 21 Oct 2015 07:28:00 GMT"
+NOW = datetime(2015, 10, 21, 7, 27, 30, tzinfo=timezone.utc).timestamp()
+
+
+def response(status_code: int, headers: Optional[Dict[str, str]] = None) -> Mock:
+    return Mock(status_code=status_code, headers=CaseInsensitiveDict(headers or {}))
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("120", 120.0),
+        (" 1.5 ", 1.5),
+        ("-5", 0.0),
+        (DATE, 30.0),
+        ("Wed, 21 Oct 2015 07:28:00", 30.0),
+        ("Wed, 21 Oct 2015 07:00:00 GMT", 0.0),
+        ("soon", None),
+        ("nan", None),
+        ("inf", None),
+        ("1e400", None),
+    ],
+)
+def test_parse_retry_after(value: str, expected: Optional[float]):
+    assert parse_retry_after(value, now=NOW) == expected
+
+
+def test_parse_retry_after_uses_the_clock():
+    with patch("hcc.retry_after.time.time", return_value=NOW):
+        assert parse_retry_after(DATE) == 30.0
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, None),
+        ({"Retry-After": "7", "RateLimit-Remaining": "0", "RateLimit-Reset": "3"}, 7.0),
+        ({"RateLimit-Remaining": "0", "RateLimit-Reset": "3"}, 3.0),
+        ({"RateLimit-Remaining": "5", "RateLimit-Reset": "3"}, None),
+        ({"RateLimit-Remaining": "0"}, None),
+        ({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "4"}, 4.0),
+        ({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(NOW + 9)}, 9.0),
+        ({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "later"}, None),
+    ],
+)
+def test_retry_after_hint(headers: Dict[str, str], expected: Optional[float]):
+    assert retry_after_hint(response(429, headers), now=NOW) == expected
+
+
+def test_retry_after_hint_without_headers():
+    assert retry_after_hint(Mock(status_code=503)) is None
+    assert retry_after_hint(None) is None
+    with patch("hcc.retry_after.time.time", return_value=NOW):
+        headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(NOW + 2)}
+        assert retry_after_hint(response(429, headers)) == 2.0
+
+
+def run_retry(*responses: Mock, max_retry_after: Optional[float] = None):
+    func = Mock(side_effect=responses)
+    with patch("hcc.retry.time.sleep") as sleep:
+        result = retry_function(
+            func,
+            is_retry_needed=lambda r: r.status_code != 200,
+            max_retry_count=5,
+            retry_policy=RetryPolicy.LINEAR,
+            base_delay=200,
+            retry_after=retry_after_hint,
+            max_retry_after=max_retry_after,
+        )
+    return result, [c.args[0] for c in sleep.call_args_list]
+
+
+def test_retry_after_overrides_the_retry_policy():
+    result, sleeps = run_retry(
+        response(429, {"Retry-After": "3"}), response(500), response(200)
+    )
+    assert result.status_code == 200
+    assert sleeps == [3.0, 0.2]
+
+
+def test_retry_after_is_clamped():
+    _, sleeps = run_retry(
+        response(503, {"Retry-After": "3600"}), response(200), max_retry_after=5.0
+    )
+    assert sleeps == [5.0]
+
+
+def test_non_finite_retry_after_is_no_hint():
+    result, sleeps = run_retry(response(503, {"Retry-After": "inf"}), response(200))
+    assert result.status_code == 200
+    assert sleeps == [0.2]
+
+
+def test_huge_retry_after_is_capped_at_one_day():
+    _, sleeps = run_retry(response(503, {"Retry-After": "1e300"}), response(200))
+    assert sleeps == [86400.0]
+
+
+def test_retry_after_is_ignored_on_success():
+    hint = Mock(return_value=10.0)
+    result = retry_function(
+        lambda: response(200, {"Retry-After": "10"}),
+        is_retry_needed=lambda r: r.status_code != 200,
+        retry_after=hint,
+    )
+    assert result.status_code == 200
+    hint.assert_not_called()
+
+
+def test_async_retry_after_overrides_the_retry_policy():
+    func = AsyncMock(side_effect=[response(429, {"Retry-After": "2"}), response(200)])
+    with patch("hcc.retry.asyncio.sleep", new_callable=AsyncMock) as sleep:
+        result = asyncio.run(
+            async_retry_function(
+                func,
+                is_retry_needed=lambda r: r.status_code != 200,
+                retry_after=retry_after_hint,
+            )
+        )
+    assert result.status_code == 200
+    sleep.assert_awaited_once_with(2.0)
+
+
+def test_channel_honors_retry_after():
+    responses = [response(429, {"Retry-After": "120"}), response(200)]
+    with (
+        patch("hcc.channel.requests.Session.request", side_effect=responses),
+        patch("hcc.retry.time.sleep") as sleep,
+    ):
+        with Channel(url=URL, max_retry_after=1.5) as channel:
+            assert channel.get().status_code == 200
+    sleep.assert_called_once_with(1.5)
+
+
+def test_async_channel_honors_retry_after():
+    transport = Mock()
+    transport.request = AsyncMock(
+        side_effect=[response(503, {"Retry-After": "0.5"}), response(201)]
+    )
+    with patch("hcc.retry.asyncio.sleep", new_callable=AsyncMock) as sleep:
+        channel = AsyncChannel(url=URL, transport=transport)
+        assert asyncio.run(channel.get()).status_code == 201
+    sleep.assert_awaited_once_with(0.5)
@@ -0,0 +1,159 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import asyncio
+from unittest.mock import patch, Mock
+import pytest
+from hcc import (
+    AsyncChannel,
+    Channel,
+    RetryBudget,
+    RetryBudgetExhaustedError,
+    RetryPolicy,
+    async_retry_function,
+    retry_function,
+)
+from .test_utilities import Counter
+
+
+def setup_function():
+    Counter.reset()
+
+
+def frozen_budget(**kwargs) -> RetryBudget:
+    with patch("hcc.retry_budget.time.monotonic", return_value=0.0):
+        return RetryBudget(**kwargs)
+
+
+def test_retry_budget_deposits_ratio_of_successes():
+    with patch("hcc.retry_budget.time.monotonic", return_value=0.0):
+        budget = RetryBudget(ratio=0.5, min_retries_per_second=0.0, capacity=2.0)
+        assert budget.tokens == 1.0
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        budget.record_success()
+        assert not budget.try_acquire()
+        budget.record_success()
+        assert budget.try_acquire()
+        for _ in range(10):
+            budget.record_success()
+        assert budget.tokens == 2.0
+
+
+def test_retry_budget_refills_min_retries_per_second():
+    with patch(
+        "hcc.retry_budget.time.monotonic", side_effect=[0.0, 0.0, 0.0, 0.0, 0.5]
+    ):
+        budget = RetryBudget(ratio=0.0, min_retries_per_second=2.0)
+        assert budget.try_acquire()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        assert budget.try_acquire()
+    assert budget.capacity == 20.0
+    assert repr(budget) == (
+        "RetryBudget(ratio=0.0, min_retries_per_second=2.0, capacity=20.0)"
+    )
+
+
+def test_retry_function_fails_fast_when_budget_is_exhausted():
+    budget = frozen_budget(ratio=0.0, min_retries_per_second=0.0)
+    with (
+        patch("hcc.retry_budget.time.monotonic", return_value=0.0),
+        pytest.raises(RetryBudgetExhaustedError) as error,
+    ):
+        retry_function(
+            func=Counter.next,
+            is_retry_needed=lambda result: True,
+            max_retry_count=None,
+            retry_policy=RetryPolicy.IMMEDIATE,
+            retry_budget=budget,
+        )
+    assert Counter.count == 2
+    assert error.value.last_result == 2
+    assert error.value.__cause__ is None
+    assert "Retry budget exhausted after attempt 2" in str(error.value)
+
+
+def test_retry_function_budget_chains_the_last_exception():
+    budget = frozen_budget(ratio=0.0, min_retries_per_second=0.0)
+
+    def always_fail():
+        raise ConnectionError("refused")
+
+    with (
+        patch("hcc.retry_budget.time.monotonic", return_value=0.0),
+        pytest.raises(RetryBudgetExhaustedError) as error,
+    ):
+        retry_function(
+            func=always_fail,
+            is_retry_needed=lambda result: False,
+            max_retry_count=5,
+            retry_policy=None,
+            retry_budget=budget,
+        )
+    assert error.value.last_result is None
+    assert isinstance(error.value.__cause__, ConnectionError)
+
+
+def test_successes_refill_the_budget_of_a_shared_channel():
+    budget = frozen_budget(ratio=1.0, min_retries_per_second=0.0, capacity=5.0)
+    with (
+        patch("hcc.retry_budget.time.monotonic", return_value=0.0),
+        patch("hcc.channel.requests.Session.request") as mock_request,
+    ):
+        mock_request.side_effect = [
+            Mock(status_code=500),
+            Mock(status_code=200),
+            Mock(status_code=200),
+            Mock(status_code=500),
+            Mock(status_code=500),
+            Mock(status_code=500),
+        ]
+        first = Channel(url="https://a.example.com", retry_budget=budget)
+        second = Channel(url="https://b.example.com", retry_budget=budget)
+        assert first.get().status_code == 200
+        assert second.get().status_code == 200
+        assert budget.tokens == 2.0
+        with pytest.raises(RetryBudgetExhaustedError):
+            second.get()
+    assert mock_request.call_count == 6
+
+
+def test_async_channel_fails_fast_when_budget_is_exhausted():
+    budget = frozen_budget(ratio=0.0, min_retries_per_second=0.0)
+    transport = Mock()
+
+    async def request(*args, **kwargs):
+        return Mock(status_code=503)
+
+    transport.request = request
+
+    async def run():
+        channel = AsyncChannel(
+            url="https://a.example.com", retry_budget=budget, transport=transport
+        )
+        await channel.get()
+
+    with (
+        patch("hcc.retry_budget.time.monotonic", return_value=0.0),
+        pytest.raises(RetryBudgetExhaustedError),
+    ):
+        asyncio.run(run())
+
+
+def test_async_retry_function_with_budget():
+    budget = frozen_budget(ratio=0.0, min_retries_per_second=0.0, capacity=3.0)
+
+    async def next_count():
+        return Counter.next()
+
+    with patch("hcc.retry_budget.time.monotonic", return_value=0.0):
+        result = asyncio.run(
+            async_retry_function(
+                func=next_count,
+                is_retry_needed=lambda result: result < 2,
+                retry_policy=None,
+                retry_budget=budget,
+            )
+        )
+    assert result == 2
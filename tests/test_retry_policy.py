@@ -3,8 +3,10 @@
 # pylint: disable=C0116
 # ruff: noqa: E731
 import time
-from typing import Callable
-from hcc import retry_function, RetryPolicy
+from typing import Callable, List, Tuple
+from unittest.mock import patch
+import pytest
+from hcc import retry_function, BackoffStrategy, RetryPolicy
 from .test_utilities import Counter, assert_runtime, assert_runtime_interval
 
 BASE_DELAY = 100
@@ -114,3 +116,63 @@ def test_retry_function_fail_jitter():
         expected_runtime_middle * 1.5,
         end_time - start_time,
     )
+
+
+def run_with_sleeps(**kwargs) -> Tuple[int, List[float]]:
+    """Run a failing retry loop without sleeping, and return the delays it slept."""
+    with patch("hcc.retry.time.sleep") as mock_sleep:
+        response = retry_function(
+            func=Counter.next,
+            is_retry_needed=RETRY_NEEDED_FAIL,
+            max_retry_count=MAX_RETRIES,
+            **kwargs,
+        )
+    return response, [call.args[0] for call in mock_sleep.call_args_list]
+
+
+def test_retry_function_fail_exponential():
+    response, delays = run_with_sleeps(
+        retry_policy=RetryPolicy.EXPONENTIAL,
+        base_delay=BASE_DELAY // 2,
+        max_delay=BASE_DELAY * 2,
+    )
+    assert response == MAX_RETRIES
+    assert delays == pytest.approx([0.05, 0.1, 0.2, 0.2])
+
+
+def test_retry_function_fail_full_jitter():
+    with patch("hcc.backoff.random.uniform", side_effect=lambda a, b: b):
+        response, delays = run_with_sleeps(
+            retry_policy=RetryPolicy.FULL_JITTER,
+            base_delay=BASE_DELAY // 2,
+            multiplier=1.5,
+        )
+    assert response == MAX_RETRIES
+    assert delays == pytest.approx([0.05, 0.075, 0.1125, 0.16875])
+
+
+def test_retry_function_fail_decorrelated_jitter():
+    with patch("hcc.backoff.random.uniform", side_effect=lambda a, b: b):
+        response, delays = run_with_sleeps(
+            retry_policy=RetryPolicy.DECORRELATED_JITTER,
+            base_delay=BASE_DELAY // 2,
+            max_delay=BASE_DELAY,
+        )
+    assert response == MAX_RETRIES
+    assert delays == pytest.approx([0.05, 0.1, 0.1, 0.1])
+
+
+def test_retry_function_with_custom_strategy():
+    class Schedule(BackoffStrategy):
+        def __init__(self):
+            self.calls: list[tuple[int, float]] = []
+
+        def delay(self, attempt: int, previous_delay: float) -> float:
+            self.calls.append((attempt, previous_delay))
+            return attempt / 20
+
+    schedule = Schedule()
+    response, delays = run_with_sleeps(retry_policy=schedule)
+    assert response == MAX_RETRIES
+    assert schedule.calls == [(1, 0.0), (2, 0.05), (3, 0.1), (4, 0.15)]
+    assert delays == [0.05, 0.1, 0.15, 0.2]
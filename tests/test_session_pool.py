@@ -0,0 +1,89 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+from unittest.mock import patch, Mock
+import requests
+from hcc import Channel, SessionPool, default_pool, get
+
+
+def test_session_pool_key():
+    assert SessionPool.key("https://Example.com/a?b=c") == (
+        "https",
+        "example.com",
+        443,
+        True,
+        None,
+    )
+    assert SessionPool.key("http://example.com:8080/a", verify=False) == (
+        "http",
+        "example.com",
+        8080,
+        False,
+        None,
+    )
+
+
+def test_session_pool_reuses_session_per_origin():
+    pool = SessionPool()
+    first = pool.session("https://example.com/a")
+    second = pool.session("https://example.com/b?c=d")
+    other_port = pool.session("https://example.com:8443/a")
+    other_tls = pool.session("https://example.com/a", verify=False, cert="client.pem")
+    assert first is second
+    assert first is not other_port
+    assert first is not other_tls
+    assert other_tls.verify is False
+    assert other_tls.cert == "client.pem"
+    assert len(pool) == 3
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_session_pool_evicts_least_recently_used():
+    pool = SessionPool(max_size=2)
+    first = pool.session("https://a.example.com")
+    second = pool.session("https://b.example.com")
+    assert pool.session("https://a.example.com") is first
+    with patch.object(second, "close") as mock_close:
+        pool.session("https://c.example.com")
+    assert mock_close.call_count == 1
+    assert len(pool) == 2
+    assert pool.session("https://a.example.com") is first
+
+
+def test_session_pool_reaps_idle_sessions():
+    pool = SessionPool(idle_timeout=10.0)
+    with patch("hcc.session_pool.time.monotonic", side_effect=[0.0, 5.0, 14.0]):
+        first = pool.session("https://a.example.com")
+        second = pool.session("https://b.example.com")
+        with patch.object(first, "close") as mock_close:
+            assert pool.session("https://b.example.com") is second
+    assert mock_close.call_count == 1
+    assert len(pool) == 1
+
+
+def test_session_pool_without_idle_timeout():
+    pool = SessionPool(idle_timeout=None)
+    with patch("hcc.session_pool.time.monotonic", side_effect=[0.0, 1000.0]):
+        first = pool.session("https://a.example.com")
+        assert pool.session("https://a.example.com") is first
+
+
+def test_channel_with_shared_session_leaves_it_open():
+    session = requests.Session()
+    channel = Channel(url="https://example.com", session=session)
+    assert channel.session is session
+    with patch.object(session, "close") as mock_close:
+        channel.close()
+    assert mock_close.call_count == 0
+
+
+def test_single_request_reuses_default_pool_session():
+    url = "https://pooled.example.com/success"
+    with patch("requests.Session.send") as mock_send:
+        mock_send.return_value = Mock(spec=requests.Response, status_code=200)
+        get(url=url)
+        session = default_pool.session(url)
+        with patch("hcc.single_request.Channel", wraps=Channel) as mock_channel:
+            get(url=url)
+    assert mock_channel.call_args.kwargs["session"] is session
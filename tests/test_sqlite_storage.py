@@ -0,0 +1,138 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import itertools
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+from hcc import CacheEntry, Channel, ResponseCache, SqliteStorage
+
+URL = "https://mockserver.com/config"
+PACKAGE_ROOT = str(Path(__file__).resolve().parents[1])
+
+
+def make_entry(content: bytes = b"body", **kwargs) -> CacheEntry:
+    return CacheEntry(
+        url=URL,
+        status_code=200,
+        reason="OK",
+        headers={"ETag": '"v1"', "Content-Type": "application/json"},
+        content=content,
+        stored_at=1.5,
+        expires_at=61.5,
+        **kwargs,
+    )
+
+
+@pytest.fixture(name="path")
+def fixture_path(tmp_path: Path) -> Path:
+    return tmp_path / "cache.sqlite"
+
+
+def test_sqlite_storage_round_trip(path: Path):
+    storage = SqliteStorage(path)
+    entry = make_entry(vary={"Accept": "application/json", "X-Missing": None})
+    storage.set("key", entry)
+    assert storage.get("key") == entry
+    assert storage.get("missing") is None
+    assert len(storage) == 1
+    assert repr(storage) == f"SqliteStorage(path={str(path)!r}, max_entries=10000)"
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    connection.close()
+    storage.close()
+
+
+def test_sqlite_storage_persists_entries(path: Path):
+    storage = SqliteStorage(path)
+    storage.set("key", make_entry())
+    storage.close()
+    reopened = SqliteStorage(path)
+    assert reopened.get("key") == make_entry()
+    reopened.delete("key")
+    assert len(reopened) == 0
+    reopened.set("key", make_entry())
+    reopened.clear()
+    assert reopened.get("key") is None
+    reopened.close()
+
+
+def test_sqlite_storage_evicts_least_recently_used(path: Path):
+    clock = itertools.count(1000.0, 10.0)
+    with patch("hcc.sqlite_storage.time.time", side_effect=lambda: next(clock)):
+        storage = SqliteStorage(path, max_entries=2, max_bytes=10)
+        storage.set("a", make_entry(b"1234"))
+        storage.set("b", make_entry(b"1234"))
+        assert storage.get("a") is not None
+        storage.set("c", make_entry(b"1234"))
+        assert storage.get("b") is None
+        assert storage.get("a") is not None
+        storage.set("d", make_entry(b"123456"))
+        assert storage.get("c") is None and storage.get("a") is not None
+        assert storage.get("d") is not None
+        storage.set("d", make_entry(b"12345678901"))
+        assert storage.get("d") is None
+    storage.close()
+
+
+def test_sqlite_storage_rolls_back_failed_writes(path: Path):
+    storage = SqliteStorage(path)
+    storage.max_entries = object()  # type: ignore[assignment]
+    with pytest.raises(sqlite3.Error):
+        storage.set("key", make_entry())
+    assert storage.get("key") is None
+    storage.close()
+
+
+def test_sqlite_storage_is_shared_by_threads_and_processes(path: Path):
+    storage = SqliteStorage(path)
+    threads = [
+        threading.Thread(target=storage.set, args=(f"thread{i}", make_entry()))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    code = (
+        "import sys\n"
+        "from hcc import CacheEntry, SqliteStorage\n"
+        "storage = SqliteStorage(sys.argv[1])\n"
+        "assert storage.get('thread0') is not None\n"
+        "storage.set('process', CacheEntry(url='u', status_code=200, reason='OK', "
+        "headers={}, content=b'from process', stored_at=0.0, expires_at=0.0))\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code, str(path)],
+        env={**os.environ, "PYTHONPATH": PACKAGE_ROOT},
+        check=True,
+    )
+    entry = storage.get("process")
+    assert entry is not None and entry.content == b"from process"
+    assert len(storage) == 5
+    storage.close()
+
+
+def test_response_cache_survives_restarts(path: Path):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict({"Cache-Control": "max-age=60"})
+    response._content = b'{"version": 1}'  # pylint: disable=protected-access
+    with patch(
+        "hcc.channel.requests.Session.request", return_value=response
+    ) as mock_request:
+        for _ in range(2):
+            storage = SqliteStorage(path)
+            cache = ResponseCache(storage=storage)
+            with Channel(url=URL, cache=cache) as channel:
+                assert channel.get().json() == {"version": 1}
+            storage.close()
+    assert mock_request.call_count == 1
+    assert cache.hits == 1
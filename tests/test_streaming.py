@@ -0,0 +1,140 @@
+# pylint: disable=C0114
+# pylint: disable=C0115
+# pylint: disable=C0116
+import io
+import logging
+from typing import Optional
+from unittest.mock import Mock, patch
+import pytest
+import requests
+from hcc import (
+    Channel,
+    HedgePolicy,
+    ResponseTooLargeError,
+    RetryBudget,
+    RetryBudgetExhaustedError,
+    StreamedResponse,
+)
+
+URL = "https://mockserver.com/export"
+
+
+class BrokenStream(io.BytesIO):
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if self.tell() >= 4:
+            raise requests.exceptions.ChunkedEncodingError("Connection broken")
+        return super().read(size)
+
+
+def make_response(
+    status_code: int = 200, body: bytes = b"", content_length: bool = True
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = URL
+    response.encoding = "utf-8"
+    response.raw = io.BytesIO(body)
+    if content_length:
+        response.headers["Content-Length"] = str(len(body))
+    return response
+
+
+def test_stream_get_iterates_lines_and_closes_the_response(caplog):
+    failed = make_response(503, b"overloaded")
+    response = make_response(body=b"first\nsecond\r\nthird")
+    response.close = Mock(wraps=response.close)  # type: ignore[method-assign]
+    caplog.set_level(logging.INFO, logger="hcc.request")
+    with patch(
+        "hcc.channel.requests.Session.request", side_effect=[failed, response]
+    ) as mock_request:
+        with Channel(url=URL) as channel:
+            with channel.stream_get(params={"since": "1"}) as streamed:
+                assert failed.raw.closed
+                response.close.assert_not_called()
+                assert streamed.status_code == 200
+                assert streamed.headers["Content-Length"] == "19"
+                assert streamed.url == URL
+                lines = list(streamed.iter_lines(chunk_size=4))
+    assert lines == [b"first", b"second", b"third"]
+    response.close.assert_called_once()
+    assert "GET stream request" in caplog.text
+    assert repr(streamed) == "StreamedResponse(status_code=200, bytes_read=19)"
+    mock_request.assert_called_with(
+        "GET", URL, timeout=2.0, params={"since": "1"}, headers={}, stream=True
+    )
+
+
+def test_iter_content_and_read():
+    streamed = StreamedResponse(make_response(body="día;noche;".encode()))
+    chunks = list(streamed.iter_content(chunk_size=2, decode_unicode=True))
+    assert chunks[:2] == ["d", "ía"]
+    assert "".join(chunks) == "día;noche;"
+    streamed = StreamedResponse(make_response(body=b"a;b;c"))
+    assert list(streamed.iter_lines(chunk_size=3, delimiter=b";")) == [
+        b"a",
+        b"b",
+        b"c",
+    ]
+    streamed = StreamedResponse(make_response(body=b"a\n"))
+    assert list(streamed.iter_lines()) == [b"a"]
+    assert StreamedResponse(make_response(body=b"body")).read() == b"body"
+
+
+def test_content_length_over_the_max_body_size_aborts_before_reading():
+    response = make_response(body=b"x" * 100)
+    with patch("hcc.channel.requests.Session.request", return_value=response):
+        with Channel(url=URL) as channel:
+            with pytest.raises(ResponseTooLargeError) as error:
+                with channel.stream_get(max_body_size=99):
+                    pass  # pragma: no cover
+    assert error.value.limit == 99
+    assert response.raw.closed
+
+
+def test_body_over_the_max_body_size_aborts_while_reading():
+    streamed = StreamedResponse(
+        make_response(body=b"x" * 100, content_length=False), max_body_size=50
+    )
+    chunks = []
+    with pytest.raises(ResponseTooLargeError):
+        for chunk in streamed.iter_content(chunk_size=20):
+            chunks.append(chunk)
+    assert len(chunks) == 2
+    assert streamed.response.raw.closed
+    streamed = StreamedResponse(make_response(body=b"x" * 50), max_body_size=50)
+    assert len(streamed.read()) == 50
+
+
+def test_broken_stream_is_not_retried():
+    response = make_response(body=b"12345678", content_length=False)
+    response.raw = BrokenStream(b"12345678")
+    with patch(
+        "hcc.channel.requests.Session.request", return_value=response
+    ) as mock_request:
+        with Channel(url=URL) as channel:
+            with pytest.raises(requests.exceptions.ChunkedEncodingError):
+                with channel.stream_get() as streamed:
+                    streamed.read()
+    assert mock_request.call_count == 1
+    assert response.raw.closed
+
+
+def test_failed_responses_are_closed_when_the_retries_give_up():
+    responses = [make_response(503), make_response(503)]
+    budget = RetryBudget(ratio=0.0, min_retries_per_second=0.0)
+    with patch("hcc.channel.requests.Session.request", side_effect=responses):
+        with Channel(url=URL, retry_budget=budget) as channel:
+            with pytest.raises(RetryBudgetExhaustedError):
+                with channel.stream_get():
+                    pass  # pragma: no cover
+    assert all(response.raw.closed for response in responses)
+
+
+def test_streamed_requests_are_not_hedged():
+    with patch(
+        "hcc.channel.requests.Session.request", return_value=make_response()
+    ) as mock_request:
+        with Channel(url=URL, hedging=HedgePolicy(delay=0.0)) as channel:
+            with channel.stream_get() as streamed:
+                assert streamed.read() == b""
+    assert mock_request.call_count == 1
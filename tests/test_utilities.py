@@ -1,6 +1,22 @@
 # pylint: disable=C0114
 # pylint: disable=C0115
 # pylint: disable=C0116
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import requests
+
+
+def make_response(
+    status_code: int = 200, body: Optional[bytes] = None
+) -> requests.Response:
+    """Return a response of a status code, with a body if one is given."""
+    response = requests.Response()
+    response.status_code = status_code
+    if body is not None:
+        response._content = body  # pylint: disable=protected-access
+    return response
+
+
 class Counter:
     count = 0
 
@@ -52,3 +68,68 @@ def assert_runtime_interval(
         <= actual_runtime
         <= max_expected_runtime * (1 + tolerance)
     )
+
+
+class AsyncHttpStandIn:
+    """A minimal asyncio HTTP/1.1 server answering requests with raw canned responses.
+
+    Args:
+        handler: The coroutine function that receives the method, the target, the headers and
+            the body of a request and returns the raw response bytes, or None to close the
+            connection without a response. Responses with a `Connection: close` header close
+            the connection after they are sent.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[
+            [str, str, Dict[str, str], bytes], Awaitable[Optional[bytes]]
+        ],
+    ):
+        self.handler = handler
+        self.connection_count = 0
+        self.requests: List[Tuple[str, str, Dict[str, str], bytes]] = []
+        self.url = ""
+        self._server: Optional[asyncio.Server] = None
+
+    async def __aenter__(self) -> "AsyncHttpStandIn":
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        assert self._server is not None
+        self._server.close()
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connection_count += 1
+        try:
+            while request_line := await reader.readline():
+                method, target, _ = request_line.decode().split(" ", 2)
+                headers: Dict[str, str] = {}
+                while line := (await reader.readline()).rstrip(b"\r\n"):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.lower()] = value.strip()
+                if headers.get("transfer-encoding") == "chunked":
+                    body = b""
+                    while size := int((await reader.readline()).strip(), 16):
+                        body += await reader.readexactly(size + 2)
+                        body = body[:-2]
+                    await reader.readline()
+                else:
+                    body = await reader.readexactly(
+                        int(headers.get("content-length", 0))
+                    )
+                self.requests.append((method, target, headers, body))
+                response = await self.handler(method, target, headers, body)
+                if response is None:
+                    break
+                writer.write(response)
+                await writer.drain()
+                if b"Connection: close" in response:
+                    break
+        finally:
+            writer.close()